@@ -31,6 +31,15 @@ class Settings:
     app_port: int = getenv_int("APP_PORT", 8000)
 
     voice_provider: Literal["twilio", "vonage", "solapi", "mock"] = getenv("VOICE_PROVIDER", "mock")  # type: ignore[assignment]
+    # 발신 실패 시 순서대로 넘겨볼 예비 프로바이더, 예: solapi,vonage (비우면 VOICE_PROVIDER만 사용)
+    voice_failover: str = getenv("VOICE_FAILOVER", "")
+    # 프로바이더 상태 판단: 최근 N건(최대 N초 이내) 결과 중 실패(또는 느린 발신) 비율이 기준 이상이면 회로 차단
+    provider_health_window: int = getenv_int("PROVIDER_HEALTH_WINDOW", 20)
+    provider_health_window_seconds: int = getenv_int("PROVIDER_HEALTH_WINDOW_SECONDS", 120)
+    provider_breaker_min_calls: int = getenv_int("PROVIDER_BREAKER_MIN_CALLS", 3)
+    provider_breaker_error_percent: int = getenv_int("PROVIDER_BREAKER_ERROR_PERCENT", 50)
+    provider_breaker_cooldown_seconds: int = getenv_int("PROVIDER_BREAKER_COOLDOWN_SECONDS", 30)
+    provider_slow_call_ms: int = getenv_int("PROVIDER_SLOW_CALL_MS", 5000)
 
     public_base_url: str = getenv("PUBLIC_BASE_URL", "http://localhost:8000")
 
@@ -39,6 +48,88 @@ class Settings:
 
     call_timeout_seconds: int = getenv_int("CALL_TIMEOUT_SECONDS", 40)
     max_attempts: int = getenv_int("MAX_ATTEMPTS", 12)
+    max_concurrent_dials: int = getenv_int("MAX_CONCURRENT_DIALS", 200)
+
+    # 저장소 (SQLite 파일 또는 postgresql+psycopg://...)
+    database_url: str = getenv("DATABASE_URL", "sqlite:///./orchestrator.db")
+    db_pool_size: int = getenv_int("DB_POOL_SIZE", 10)
+    db_max_overflow: int = getenv_int("DB_MAX_OVERFLOW", 20)
+    db_pool_timeout_seconds: int = getenv_int("DB_POOL_TIMEOUT_SECONDS", 30)
+    db_pool_recycle_seconds: int = getenv_int("DB_POOL_RECYCLE_SECONDS", 1800)
+    sqlite_busy_timeout_ms: int = getenv_int("SQLITE_BUSY_TIMEOUT_MS", 5000)
+    sqlite_synchronous: str = getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    sqlite_mmap_size: int = getenv_int("SQLITE_MMAP_SIZE", 268435456)
+
+    # 에스컬레이션 정책 캐시 (다른 워커의 변경이 반영되기까지 최대 시간)
+    policy_cache_ttl_seconds: int = getenv_int("POLICY_CACHE_TTL_SECONDS", 60)
+
+    # 알림 중복 제거 (같은 fingerprint 알림을 열린 인시던트로 묶는 시간, 0이면 비활성)
+    dedup_window_seconds: int = getenv_int("DEDUP_WINDOW_SECONDS", 300)
+    dedup_index_size: int = getenv_int("DEDUP_INDEX_SIZE", 10000)
+
+    # 관리자 API 응답 캐시 (쓰기 시 즉시 무효화, 다른 워커의 변경은 TTL 이내 반영)
+    admin_cache_ttl_seconds: int = getenv_int("ADMIN_CACHE_TTL_SECONDS", 15)
+    # 관리자 SSE (/admin/events) 클라이언트별 최대 대기 이벤트 수
+    admin_events_queue_size: int = getenv_int("ADMIN_EVENTS_QUEUE_SIZE", 100)
+
+    # TwiML 렌더링 캐시 (인시던트 문구/완성된 TwiML 항목 수)
+    twiml_cache_size: int = getenv_int("TWIML_CACHE_SIZE", 1000)
+
+    # 호전환/SMS 기록 조회 캐시 항목 수 (원본은 TransferLog 테이블)
+    transfer_log_cache_size: int = getenv_int("TRANSFER_LOG_CACHE_SIZE", 1000)
+
+    # 웹훅/콜백 멱등성 키 (최근 키 메모리 캐시 항목 수, DB 보관 기간,
+    # 처리 중 리스: 이 시간 안에 끝나지 않으면 재전송이 처리를 이어받음)
+    idempotency_cache_size: int = getenv_int("IDEMPOTENCY_CACHE_SIZE", 10000)
+    idempotency_ttl_seconds: int = getenv_int("IDEMPOTENCY_TTL_SECONDS", 86400)
+    idempotency_lease_seconds: int = getenv_int("IDEMPOTENCY_LEASE_SECONDS", 60)
+
+    # /webhook/start-batch 한 트랜잭션에 기록할 최대 알림 수
+    ingest_batch_size: int = getenv_int("INGEST_BATCH_SIZE", 500)
+
+    # 프로바이더 REST API 주소 (부하 테스트 시 bench/fake_provider.py 로 교체)
+    twilio_api_base_url: str = getenv("TWILIO_API_BASE_URL", "https://api.twilio.com")
+    solapi_api_base_url: str = getenv("SOLAPI_API_BASE_URL", "https://api.solapi.com")
+
+    # Provider HTTP connection pool
+    http_max_connections: int = getenv_int("HTTP_MAX_CONNECTIONS", 100)
+    http_max_keepalive_connections: int = getenv_int("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20)
+    http_keepalive_expiry_seconds: int = getenv_int("HTTP_KEEPALIVE_EXPIRY_SECONDS", 60)
+    http_timeout_seconds: int = getenv_int("HTTP_TIMEOUT_SECONDS", 10)
+
+    # 로그 (JSON 한 줄씩, 큐 기반 비동기 출력)
+    log_level: str = getenv("LOG_LEVEL", "INFO")
+    # 모듈별 레벨, 예: app.providers=DEBUG,app.routers.simulator=WARNING
+    log_levels: str = getenv("LOG_LEVELS", "")
+    # DEBUG 로그는 로거별로 N건 중 1건만 출력 (1이면 전부)
+    log_debug_sample_every: int = getenv_int("LOG_DEBUG_SAMPLE_EVERY", 10)
+    # 출력 대기 큐 크기 (가득 차면 새 로그를 버리고 요청 처리를 막지 않음)
+    log_queue_size: int = getenv_int("LOG_QUEUE_SIZE", 10000)
+
+    # 트레이싱: none | file (JSON 한 줄에 span 하나) | otlp (OTLP/HTTP 수집기)
+    trace_exporter: str = getenv("TRACE_EXPORTER", "none")
+    trace_file: str = getenv("TRACE_FILE", "traces.jsonl")
+    trace_otlp_endpoint: str = getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    trace_service_name: str = getenv("TRACE_SERVICE_NAME", "call-orchestrator")
+
+    # 블로킹 작업(동기 DB 세션/프로바이더 SDK) 전용 스레드 풀 크기 (asyncio.to_thread)
+    blocking_workers: int = getenv_int("BLOCKING_WORKERS", 32)
+    # 이벤트 루프 지연 측정 주기 / 경고 기준 (ms)
+    loop_lag_interval_ms: int = getenv_int("LOOP_LAG_INTERVAL_MS", 500)
+    loop_lag_warn_ms: int = getenv_int("LOOP_LAG_WARN_MS", 100)
+
+    # 인시던트별 에스컬레이션 임대 시간 (이 시간 안에 끝나지 않으면 다른 워커가 이어받음)
+    incident_lease_seconds: int = getenv_int("INCIDENT_LEASE_SECONDS", 30)
+    # 다른 워커가 임대 중일 때 기다리는 최대 시간 (초과하면 콜백에 503을 돌려 재전송을 받음)
+    incident_lease_wait_seconds: int = getenv_int("INCIDENT_LEASE_WAIT_SECONDS", 5)
+
+    # Call attempt queue (임대는 발신 직전에 갱신되므로 visibility timeout은 페일오버를
+    # 포함한 한 번의 발신 시간(프로바이더 수 x HTTP 타임아웃)보다 길어야 함)
+    queue_workers: int = getenv_int("QUEUE_WORKERS", 4)
+    queue_poll_interval_seconds: int = getenv_int("QUEUE_POLL_INTERVAL_SECONDS", 1)
+    queue_visibility_timeout_seconds: int = getenv_int("QUEUE_VISIBILITY_TIMEOUT_SECONDS", 60)
+    queue_max_tries: int = getenv_int("QUEUE_MAX_TRIES", 5)
+    queue_retry_delay_seconds: int = getenv_int("QUEUE_RETRY_DELAY_SECONDS", 5)
 
     # Twilio
     twilio_account_sid: str = getenv("TWILIO_ACCOUNT_SID", "ACxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx")
@@ -1,72 +1,457 @@
-from datetime import datetime
-from typing import Optional
+import json
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
 
-from sqlmodel import Field, Session, SQLModel, create_engine, select
+from sqlalchemy import Index, case, delete, event, exists, func, inspect
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.schema import CreateColumn
+from sqlmodel import Field, Session, SQLModel, create_engine, or_, and_, select, update, text
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
 
 
 class Incident(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     summary: str
     tts_text: str
-    status: str = Field(default="new")  # new|ack|closed
+    status: str = Field(default="new", index=True)  # new|ack|closed
     attempts: int = Field(default=0)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     acknowledged_at: Optional[datetime] = None
+    strategy: str = Field(default="sequential", sa_column_kwargs={"server_default": "sequential"})
+    stagger_seconds: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    policy_id: Optional[int] = None  # None이면 설정의 기본 정/부 정책
+    # 에스컬레이션 판단(다음 단계 진행) 임대: 여러 워커/노드 중 한 곳만 진행
+    lease_owner: Optional[str] = None
+    leased_until: Optional[datetime] = None
 
 
 class CallAttempt(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_callattempt_incident_id_created_at", "incident_id", "created_at"),
+        Index("ix_callattempt_provider_result", "provider", "result"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     incident_id: int
     callee: str
     provider: str
-    result: str  # initiated|answered|no_answer|failed|ack
-    dtmf: Optional[str] = None
+    result: str = Field(index=True)  # initiated|answered|no_answer|failed|ack
+    dtmf: Optional[str] = Field(default=None, index=True)
     duration_sec: Optional[int] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+
+class CallJob(SQLModel, table=True):
+    """Durable queue entry for one call attempt (at-least-once delivery)."""
+
+    __table_args__ = (
+        Index("ix_calljob_status_available_at", "status", "available_at"),
+        Index("ix_calljob_incident_id_status", "incident_id", "status"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    incident_id: int
+    callee: str
+    tts_text: str
+    status: str = Field(default="pending")  # pending|leased|done|ended|failed|canceled
+    tries: int = Field(default=0)
+    available_at: datetime = Field(default_factory=datetime.utcnow)
+    leased_until: Optional[datetime] = None
+    lease_owner: Optional[str] = None
+    call_id: Optional[str] = Field(default=None, index=True)
+    provider: Optional[str] = None  # 실제로 발신한 프로바이더 (페일오버 시 VOICE_PROVIDER와 다를 수 있음)
+    ring_timeout_seconds: Optional[int] = None
+    last_error: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
-engine = create_engine("sqlite:///./orchestrator.db")
+class AlertGroup(SQLModel, table=True):
+    """Open incident that alerts with the same fingerprint are grouped into."""
+
+    fingerprint: str = Field(primary_key=True)  # unique: one group per fingerprint
+    incident_id: int
+    duplicate_count: int = Field(default=0)
+    first_seen_at: datetime = Field(default_factory=datetime.utcnow)
+    last_seen_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class SchemaMigration(SQLModel, table=True):
+    """Migrations already applied to this database (see MIGRATIONS)."""
+
+    version: int = Field(primary_key=True)
+    description: str
+    applied_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class StatCounter(SQLModel, table=True):
+    """Running totals behind /admin/stats, bumped in the same transaction as the rows they count."""
+
+    name: str = Field(primary_key=True)  # e.g. calls, provider:twilio:successful, incidents:2025-10-17
+    value: int = Field(default=0)
+
+
+class TrafficRollup(SQLModel, table=True):
+    """Per-hour and per-KST-day traffic totals, maintained on write like StatCounter."""
+
+    granularity: str = Field(primary_key=True)  # hour|day
+    bucket_start: datetime = Field(primary_key=True)  # UTC; day buckets start at KST midnight
+    metric: str = Field(primary_key=True)  # incidents, calls, acks, ack_seconds, result:<r>, provider:<p>
+    value: int = Field(default=0)
+
+
+class TransferLog(SQLModel, table=True):
+    """DTMF 메뉴 처리 결과 (1: 호전환, 2: 장애 문자) per call, shared by all workers."""
+
+    call_sid: str = Field(primary_key=True)
+    incident_id: Optional[int] = Field(default=None, index=True)
+    action: str  # call_transfer|sms_send
+    transferred: bool = Field(default=False)
+    sms_sent: bool = Field(default=False)
+    to_number: Optional[str] = None
+    message_sid: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class IdempotencyKey(SQLModel, table=True):
+    """Webhook/provider callback already processed; the unique key stops retried deliveries from running twice."""
+
+    key: str = Field(primary_key=True)  # twilio:<CallSid>:<CallStatus>, vonage:<uuid>:<status>, start:<Idempotency-Key> ...
+    response: Optional[str] = None  # JSON body replayed to a retried request
+    leased_until: Optional[datetime] = None  # 처리 중인 동안만 설정; 지나면 재전송이 처리를 이어받음
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+
+class EscalationPolicy(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str = Field(unique=True)  # 팀 이름
+    repeat: int = Field(default=1)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class PolicyTier(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    policy_id: int = Field(index=True)
+    position: int
+    contacts: str  # JSON list of {"name", "phone", "role"}
+    timeout_seconds: int = Field(default=40)
+    repeat: int = Field(default=1)
+    delay_seconds: int = Field(default=0)
+
+
+SQLITE_SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    Per-connection SQLite tuning.
+
+    WAL lets readers run alongside the single writer, synchronous=NORMAL
+    fsyncs at checkpoints instead of on every commit (safe under WAL), and
+    busy_timeout makes concurrent writers wait for the lock instead of
+    failing with "database is locked".
+    """
+    synchronous = settings.sqlite_synchronous.upper()
+    if synchronous not in SQLITE_SYNCHRONOUS_MODES:
+        raise RuntimeError(f"Invalid SQLITE_SYNCHRONOUS: {settings.sqlite_synchronous}")
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={synchronous}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    cursor.close()
+
+
+def create_db_engine(url: str) -> Engine:
+    """Engine for settings.database_url: tuned SQLite file, or any pooled server database."""
+    pool_options = dict(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+    )
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        return create_engine(url, pool_pre_ping=True, pool_recycle=settings.db_pool_recycle_seconds, **pool_options)
+    if parsed.database in (None, "", ":memory:"):
+        # 메모리 DB는 연결마다 별개이므로 모든 스레드(to_thread, BLOCKING_WORKERS)가 연결 하나를 공유
+        db_engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        event.listen(db_engine, "connect", _sqlite_pragmas)
+        return db_engine
+    db_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False, "timeout": settings.sqlite_busy_timeout_ms / 1000},
+        **pool_options,
+    )
+    event.listen(db_engine, "connect", _sqlite_pragmas)
+    return db_engine
+
+
+engine = create_db_engine(settings.database_url)
 
 
 def init_db() -> None:
     SQLModel.metadata.create_all(engine)
+    _migrate()
+
+
+def _add_missing_columns(conn: Connection) -> None:
+    """Add model columns that an existing database predates (additive upgrades only)."""
+    inspector = inspect(conn)
+    for table in SQLModel.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                ddl = CreateColumn(column).compile(dialect=conn.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+
+
+def _create_missing_indexes(conn: Connection) -> None:
+    """create_all skips tables that already exist, so build their new indexes here."""
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+# (version, description, upgrade) — append only; each upgrade must be idempotent
+# because a fresh database already has the current schema from create_all.
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "add columns missing from older databases", _add_missing_columns),
+    (2, "indexes for admin, dedup and call queue queries", _create_missing_indexes),
+    (3, "backfill admin stat counters", lambda conn: rebuild_counters(conn)),
+    (4, "backfill hourly/daily traffic rollups", lambda conn: rebuild_rollups(conn)),
+    (5, "incident escalation lease columns", _add_missing_columns),
+    (6, "call job provider column", _add_missing_columns),
+    (7, "idempotency key lease column", _add_missing_columns),
+]
+
+
+def _migrate() -> None:
+    with engine.begin() as conn:
+        applied = set(conn.execute(select(SchemaMigration.version)).scalars())
+    for version, description, upgrade in MIGRATIONS:
+        if version in applied:
+            continue
+        with engine.begin() as conn:
+            upgrade(conn)
+            conn.execute(SchemaMigration.__table__.insert().values(version=version, description=description))
+        logger.info("Applied migration %s: %s", version, description)
 
 
 def get_session() -> Session:
     return Session(engine)
 
 
-def create_incident(session: Session, summary: str, tts_text: str) -> Incident:
-    incident = Incident(summary=summary, tts_text=tts_text)
+# 데이터 변경 알림 (관리자 응답 캐시 무효화, 관리자 SSE 등). 커밋된 뒤에만 호출됨
+_change_listeners: List[Callable[[List[dict]], None]] = []
+
+
+def on_data_change(callback: Callable[[List[dict]], None]) -> None:
+    """
+    Call callback(events) after a transaction that wrote incidents or call attempts commits.
+
+    events are dicts with a "type" of incident_created, incident_updated,
+    attempt_logged or incident_acknowledged.
+    """
+    _change_listeners.append(callback)
+
+
+def _data_changed(session: Session, kind: str, obj: SQLModel) -> None:
+    session.info.setdefault("changes", []).append((kind, obj))
+
+
+def _change_event(kind: str, obj: SQLModel) -> dict:
+    if kind == "incident_created":
+        return {
+            "type": kind,
+            "incident_id": obj.id,
+            "summary": obj.summary,
+            "tts_text": obj.tts_text,
+            "created_at": obj.created_at.isoformat(),
+        }
+    if kind == "incident_updated":
+        return {"type": kind, "incident_id": obj.id, "attempts": obj.attempts}
+    if kind == "incident_acknowledged":
+        return {
+            "type": kind,
+            "incident_id": obj.id,
+            "created_at": obj.created_at.isoformat(),
+            "acknowledged_at": obj.acknowledged_at.isoformat(),
+        }
+    return {
+        "type": kind,
+        "incident_id": obj.incident_id,
+        "callee": obj.callee,
+        "provider": obj.provider,
+        "result": obj.result,
+        "dtmf": obj.dtmf,
+        "created_at": obj.created_at.isoformat(),
+    }
+
+
+@event.listens_for(Session, "before_commit")
+def _render_change_events(session: Session) -> None:
+    # 커밋 후에는 객체가 만료되므로 id가 정해진 시점(flush 후)에 이벤트를 만들어 둠
+    changes = session.info.pop("changes", None)
+    if changes:
+        session.flush()
+        session.info["change_events"] = [_change_event(kind, obj) for kind, obj in changes]
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_data_change(session: Session) -> None:
+    events = session.info.pop("change_events", None)
+    if events:
+        for callback in _change_listeners:
+            callback(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_data_change(session: Session) -> None:
+    session.info.pop("changes", None)
+    session.info.pop("change_events", None)
+
+
+def create_incident(
+    session: Session,
+    summary: str,
+    tts_text: str,
+    strategy: str = "sequential",
+    stagger_seconds: int = 0,
+    policy_id: Optional[int] = None,
+    commit: bool = True,
+) -> Incident:
+    incident = Incident(
+        summary=summary,
+        tts_text=tts_text,
+        strategy=strategy,
+        stagger_seconds=stagger_seconds,
+        policy_id=policy_id,
+    )
     session.add(incident)
-    session.commit()
-    session.refresh(incident)
+    bump_counters(session, _incident_counter_deltas([incident]))
+    _data_changed(session, "incident_created", incident)
+    bump_rollups(session, [(incident.created_at, {"incidents": 1})])
+    if commit:
+        session.commit()
+        session.refresh(incident)
     return incident
 
 
+def create_incidents(session: Session, incident_fields: List[dict]) -> List[Incident]:
+    """Bulk insert incidents (flush only, no commit)."""
+    incidents = [Incident(**fields) for fields in incident_fields]
+    session.add_all(incidents)
+    session.flush()
+    bump_counters(session, _incident_counter_deltas(incidents))
+    for incident in incidents:
+        _data_changed(session, "incident_created", incident)
+    bump_rollups(session, [(incident.created_at, {"incidents": 1}) for incident in incidents])
+    return incidents
+
+
 def get_incident(session: Session, incident_id: int) -> Optional[Incident]:
     return session.get(Incident, incident_id)
 
 
-def increment_attempt(session: Session, incident_id: int) -> None:
+def increment_attempt(session: Session, incident_id: int, commit: bool = True) -> None:
+    """Atomically add one attempt (single UPDATE, no read-modify-write)."""
+    _bump_attempts(session, update(Incident).where(Incident.id == incident_id), incident_id, 1)
+    if commit:
+        session.commit()
+
+
+def advance_attempts(session: Session, incident_id: int, expected: int, count: int, commit: bool = True) -> bool:
+    """
+    Reserve count attempts only if the incident is still at expected attempts and not acknowledged.
+
+    Compare-and-set: of several workers planning the same escalation step,
+    exactly one gets True; the others must drop their plan.
+    """
+    stmt = (
+        update(Incident)
+        .where(Incident.id == incident_id)
+        .where(Incident.attempts == expected)
+        .where(Incident.status != "ack")
+    )
+    if not _bump_attempts(session, stmt, incident_id, count):
+        return False
+    if commit:
+        session.commit()
+    return True
+
+
+def _bump_attempts(session: Session, stmt, incident_id: int, count: int) -> bool:
+    result = session.exec(
+        stmt.values(attempts=Incident.attempts + count).execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return False
     incident = session.get(Incident, incident_id)
-    if incident is None:
-        return
-    incident.attempts += 1
-    session.add(incident)
+    session.refresh(incident, attribute_names=["attempts"])
+    _data_changed(session, "incident_updated", incident)
+    return True
+
+
+def acquire_incident_lease(session: Session, incident_id: int, owner: str, lease_seconds: int) -> bool:
+    """Take (or extend) the incident's escalation lease; False while another owner holds an unexpired one."""
+    now = datetime.utcnow()
+    result = session.exec(
+        update(Incident)
+        .where(Incident.id == incident_id)
+        .where(or_(Incident.leased_until.is_(None), Incident.leased_until < now, Incident.lease_owner == owner))
+        .values(lease_owner=owner, leased_until=now + timedelta(seconds=lease_seconds))
+        .execution_options(synchronize_session=False)
+    )
     session.commit()
+    return result.rowcount == 1
 
 
-def mark_acknowledged(session: Session, incident_id: int) -> None:
-    incident = session.get(Incident, incident_id)
-    if incident is None:
-        return
-    incident.status = "ack"
-    incident.acknowledged_at = datetime.utcnow()
-    session.add(incident)
+def release_incident_lease(session: Session, incident_id: int, owner: str) -> None:
+    session.exec(
+        update(Incident)
+        .where(Incident.id == incident_id)
+        .where(Incident.lease_owner == owner)
+        .values(lease_owner=None, leased_until=None)
+        .execution_options(synchronize_session=False)
+    )
     session.commit()
 
 
+def mark_acknowledged(session: Session, incident_id: int, commit: bool = True) -> bool:
+    """
+    Acknowledge the incident; True only for the call that made the transition.
+
+    Conditional UPDATE (status != 'ack'), so when two workers acknowledge the
+    same incident at once the ack counter and rollup are bumped exactly once.
+    """
+    acknowledged_at = datetime.utcnow()
+    result = session.exec(
+        update(Incident)
+        .where(Incident.id == incident_id)
+        .where(Incident.status != "ack")
+        .values(status="ack", acknowledged_at=acknowledged_at)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return False
+    incident = session.get(Incident, incident_id)
+    session.refresh(incident, attribute_names=["status", "acknowledged_at"])
+    bump_counters(session, {"incidents:ack": 1})
+    _data_changed(session, "incident_acknowledged", incident)
+    bump_rollups(session, [(acknowledged_at, _ack_rollup_deltas(incident))])
+    if commit:
+        session.commit()
+    return True
+
+
 def log_call_attempt(
     session: Session,
     incident_id: int,
@@ -75,6 +460,7 @@ def log_call_attempt(
     result: str,
     dtmf: Optional[str] = None,
     duration_sec: Optional[int] = None,
+    commit: bool = True,
 ) -> CallAttempt:
     entry = CallAttempt(
         incident_id=incident_id,
@@ -85,8 +471,637 @@ def log_call_attempt(
         duration_sec=duration_sec,
     )
     session.add(entry)
+    bump_counters(session, _call_counter_deltas(entry))
+    _data_changed(session, "attempt_logged", entry)
+    bump_rollups(session, [(entry.created_at, _call_rollup_deltas(entry))])
+    if commit:
+        session.commit()
+        session.refresh(entry)
+    return entry
+
+
+def enqueue_call_job(
+    session: Session,
+    incident_id: int,
+    callee: str,
+    tts_text: str,
+    delay_seconds: int = 0,
+    ring_timeout_seconds: Optional[int] = None,
+    commit: bool = True,
+) -> CallJob:
+    job = CallJob(
+        incident_id=incident_id,
+        callee=callee,
+        tts_text=tts_text,
+        available_at=datetime.utcnow() + timedelta(seconds=delay_seconds),
+        ring_timeout_seconds=ring_timeout_seconds,
+    )
+    session.add(job)
+    if commit:
+        session.commit()
+        session.refresh(job)
+    return job
+
+
+def _claimable(now: datetime):
+    return or_(
+        and_(CallJob.status == "pending", CallJob.available_at <= now),
+        and_(CallJob.status == "leased", CallJob.leased_until < now),
+    )
+
+
+def claim_call_job(
+    session: Session,
+    owner: str,
+    visibility_timeout: int,
+    job_id: Optional[int] = None,
+) -> Optional[CallJob]:
+    """
+    Lease the next runnable job (or a specific one) for visibility_timeout seconds.
+
+    Jobs whose lease expired without completion become claimable again, so a
+    crashed worker's attempt is retried by another one.
+    """
+    now = datetime.utcnow()
+    if job_id is None:
+        candidates = session.exec(
+            select(CallJob.id).where(_claimable(now)).order_by(CallJob.available_at).limit(5)
+        ).all()
+    else:
+        candidates = [job_id]
+    for candidate in candidates:
+        result = session.exec(
+            update(CallJob)
+            .where(CallJob.id == candidate)
+            .where(_claimable(now))
+            .values(
+                status="leased",
+                leased_until=now + timedelta(seconds=visibility_timeout),
+                lease_owner=owner,
+                tries=CallJob.tries + 1,
+            )
+        )
+        session.commit()
+        if result.rowcount == 1:
+            return session.get(CallJob, candidate)
+    return None
+
+
+def _lease_held(job_id: int, owner: str, tries: int):
+    # tries는 claim마다 증가하므로 같은 프로세스의 다른 워커가 다시 claim한 경우도 구분됨
+    return and_(CallJob.id == job_id, CallJob.status == "leased", CallJob.lease_owner == owner, CallJob.tries == tries)
+
+
+def extend_call_job_lease(session: Session, job_id: int, owner: str, tries: int, visibility_timeout: int) -> bool:
+    """
+    Renew the lease right before dialing; False if it already expired.
+
+    An expired lease may be claimed by another worker at any moment, so the
+    caller must not dial then (the job is retried by whoever claims it).
+    """
+    now = datetime.utcnow()
+    result = session.exec(
+        update(CallJob)
+        .where(_lease_held(job_id, owner, tries))
+        .where(CallJob.leased_until >= now)
+        .values(leased_until=now + timedelta(seconds=visibility_timeout))
+        .execution_options(synchronize_session=False)
+    )
     session.commit()
-    session.refresh(entry)
+    return result.rowcount == 1
+
+
+def complete_call_job(
+    session: Session,
+    job_id: int,
+    owner: str,
+    tries: int,
+    call_id: Optional[str],
+    provider: Optional[str] = None,
+    commit: bool = True,
+) -> bool:
+    """Mark the job dialed; False (nothing written) if this lease was lost to another claim."""
+    result = session.exec(
+        update(CallJob)
+        .where(_lease_held(job_id, owner, tries))
+        .values(status="done", call_id=call_id, provider=provider, leased_until=None)
+        .execution_options(synchronize_session=False)
+    )
+    if commit:
+        session.commit()
+    return result.rowcount == 1
+
+
+def fail_call_job(
+    session: Session, job_id: int, owner: str, tries: int, error: str, max_tries: int, retry_delay: int
+) -> bool:
+    """
+    Release a failed job for retry; returns True once it has exhausted max_tries.
+
+    A worker whose lease was lost to another claim leaves the job alone
+    (returns False).
+    """
+    now = datetime.utcnow()
+    gave_up = tries >= max_tries
+    values = dict(last_error=error[:500], leased_until=None)
+    if gave_up:
+        values["status"] = "failed"
+    else:
+        values.update(status="pending", available_at=now + timedelta(seconds=retry_delay * tries))
+    result = session.exec(
+        update(CallJob)
+        .where(_lease_held(job_id, owner, tries))
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    session.commit()
+    return gave_up and result.rowcount == 1
+
+
+def cancel_pending_call_jobs(session: Session, incident_id: int, commit: bool = True) -> List[str]:
+    """
+    Drop not-yet-dialed jobs of an incident and return call ids still ringing.
+
+    Used once someone answers so parallel/staggered calls stop.
+    """
+    session.exec(
+        update(CallJob)
+        .where(CallJob.incident_id == incident_id)
+        .where(CallJob.status == "pending")
+        .values(status="canceled")
+    )
+    if commit:
+        session.commit()
+    return list(
+        session.exec(
+            select(CallJob.call_id)
+            .where(CallJob.incident_id == incident_id)
+            .where(CallJob.status == "done")
+            .where(CallJob.call_id.isnot(None))
+        ).all()
+    )
+
+
+def mark_call_job_ended(session: Session, call_id: str, commit: bool = True) -> bool:
+    """
+    Mark the job of a finished call ended.
+
+    Returns False if it already was, i.e. this is a repeated callback for
+    the same call that must not advance the escalation again. Calls without
+    a queue job return True.
+    """
+    result = session.exec(
+        update(CallJob)
+        .where(CallJob.call_id == call_id)
+        .where(CallJob.status != "ended")
+        .values(status="ended")
+        .execution_options(synchronize_session=False)
+    )
+    ended = result.rowcount > 0 or session.exec(select(CallJob.id).where(CallJob.call_id == call_id)).first() is None
+    if commit:
+        session.commit()
+    return ended
+
+
+def get_call_job_provider(session: Session, call_id: str) -> Optional[str]:
+    return session.exec(select(CallJob.provider).where(CallJob.call_id == call_id)).first()
+
+
+def get_call_job_incident(session: Session, call_id: str) -> Optional[int]:
+    return session.exec(select(CallJob.incident_id).where(CallJob.call_id == call_id)).first()
+
+
+def has_active_call_jobs(session: Session, incident_id: int, ringing_since: datetime) -> bool:
+    """
+    True while any attempt of the incident is queued, dialing or still ringing.
+
+    Dialed jobs older than ringing_since count as finished even if their
+    final status callback was lost.
+    """
+    return session.exec(
+        select(CallJob.id)
+        .where(CallJob.incident_id == incident_id)
+        .where(
+            or_(
+                CallJob.status.in_(["pending", "leased"]),
+                and_(CallJob.status == "done", CallJob.available_at >= ringing_since),
+            )
+        )
+    ).first() is not None
+
+
+def save_transfer_log(session: Session, call_sid: str, commit: bool = True, **fields) -> TransferLog:
+    """Insert or replace the transfer/SMS record of a call."""
+    entry = session.merge(TransferLog(call_sid=call_sid, **fields))
+    if commit:
+        session.commit()
     return entry
 
 
+def get_transfer_log(session: Session, call_sid: str) -> Optional[TransferLog]:
+    return session.get(TransferLog, call_sid)
+
+
+def claim_idempotency_key(session: Session, key: str, lease_seconds: Optional[int] = None) -> bool:
+    """
+    Record key as seen; False if it already was (INSERT ... ON CONFLICT DO NOTHING).
+
+    With lease_seconds the key stays in progress until finish_idempotency_key
+    or save_idempotent_response. If the worker dies before that, the lease
+    expires and the sender's retry takes the key over instead of being
+    treated as a duplicate forever.
+    """
+    now = datetime.utcnow()
+    leased_until = now + timedelta(seconds=lease_seconds) if lease_seconds else None
+    insert = sqlite_insert if session.get_bind().dialect.name == "sqlite" else postgresql_insert
+    result = session.exec(
+        insert(IdempotencyKey)
+        .values(key=key, created_at=now, leased_until=leased_until)
+        .on_conflict_do_nothing(index_elements=["key"])
+    )
+    claimed = result.rowcount == 1
+    if not claimed:
+        result = session.exec(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key)
+            .where(IdempotencyKey.response.is_(None))
+            .where(IdempotencyKey.leased_until.isnot(None))
+            .where(IdempotencyKey.leased_until < now)
+            .values(leased_until=leased_until)
+            .execution_options(synchronize_session=False)
+        )
+        claimed = result.rowcount == 1
+        if claimed:
+            logger.warning("Idempotency key %s: previous attempt's lease expired, processing again", key)
+    session.commit()
+    return claimed
+
+
+def get_idempotency_key(session: Session, key: str) -> Optional[IdempotencyKey]:
+    return session.get(IdempotencyKey, key)
+
+
+def finish_idempotency_key(session: Session, key: str) -> None:
+    """Mark a claimed key processed; retries are duplicates from now on."""
+    session.exec(update(IdempotencyKey).where(IdempotencyKey.key == key).values(leased_until=None))
+    session.commit()
+
+
+def save_idempotent_response(session: Session, key: str, response: str) -> None:
+    session.exec(
+        update(IdempotencyKey).where(IdempotencyKey.key == key).values(response=response, leased_until=None)
+    )
+    session.commit()
+
+
+def release_idempotency_key(session: Session, key: str) -> None:
+    """Forget a key whose processing failed so the provider's retry runs again."""
+    session.exec(delete(IdempotencyKey).where(IdempotencyKey.key == key))
+    session.commit()
+
+
+def purge_idempotency_keys(session: Session, before: datetime) -> int:
+    result = session.exec(delete(IdempotencyKey).where(IdempotencyKey.created_at < before))
+    session.commit()
+    return result.rowcount
+
+
+def save_policy(session: Session, name: str, repeat: int, tiers: List[dict]) -> EscalationPolicy:
+    """Create or replace the policy (and all its tiers) for a team."""
+    policy = session.exec(select(EscalationPolicy).where(EscalationPolicy.name == name)).first()
+    if policy is None:
+        policy = EscalationPolicy(name=name, repeat=repeat)
+    else:
+        policy.repeat = repeat
+        policy.updated_at = datetime.utcnow()
+        for tier in session.exec(select(PolicyTier).where(PolicyTier.policy_id == policy.id)).all():
+            session.delete(tier)
+    session.add(policy)
+    session.flush()
+    for position, tier in enumerate(tiers):
+        session.add(
+            PolicyTier(
+                policy_id=policy.id,
+                position=position,
+                contacts=json.dumps(tier["contacts"], ensure_ascii=False),
+                timeout_seconds=tier["timeout_seconds"],
+                repeat=tier["repeat"],
+                delay_seconds=tier["delay_seconds"],
+            )
+        )
+    session.commit()
+    session.refresh(policy)
+    return policy
+
+
+def get_policy(session: Session, policy_id: int) -> Optional[EscalationPolicy]:
+    return session.get(EscalationPolicy, policy_id)
+
+
+def get_policy_by_name(session: Session, name: str) -> Optional[EscalationPolicy]:
+    return session.exec(select(EscalationPolicy).where(EscalationPolicy.name == name)).first()
+
+
+def get_policy_tiers(session: Session, policy_id: int) -> List[PolicyTier]:
+    return list(
+        session.exec(
+            select(PolicyTier).where(PolicyTier.policy_id == policy_id).order_by(PolicyTier.position)
+        ).all()
+    )
+
+
+def delete_policy(session: Session, policy_id: int) -> None:
+    for tier in get_policy_tiers(session, policy_id):
+        session.delete(tier)
+    policy = session.get(EscalationPolicy, policy_id)
+    if policy is not None:
+        session.delete(policy)
+    session.commit()
+
+
+def get_alert_group(session: Session, fingerprint: str) -> Optional[AlertGroup]:
+    return session.get(AlertGroup, fingerprint)
+
+
+def attach_duplicate_alert(
+    session: Session,
+    fingerprint: str,
+    incident_id: int,
+    window_start: datetime,
+    count: int = 1,
+    commit: bool = True,
+) -> Optional[int]:
+    """
+    Count an alert against the group's incident if it is still open and recent.
+
+    The window is anchored on the group's first alert, so an alert that keeps
+    repeating (e.g. after the incident's escalation was exhausted) opens a
+    fresh incident once per window instead of being absorbed forever.
+    Single conditional UPDATE; returns the new duplicate count, or None when
+    the incident was acknowledged or the window lapsed.
+    """
+    result = session.exec(
+        update(AlertGroup)
+        .where(AlertGroup.fingerprint == fingerprint)
+        .where(AlertGroup.incident_id == incident_id)
+        .where(AlertGroup.first_seen_at >= window_start)
+        .where(exists().where(Incident.id == incident_id).where(Incident.status != "ack"))
+        .values(duplicate_count=AlertGroup.duplicate_count + count, last_seen_at=datetime.utcnow())
+    )
+    if commit:
+        session.commit()
+    if result.rowcount != 1:
+        return None
+    return session.exec(select(AlertGroup.duplicate_count).where(AlertGroup.fingerprint == fingerprint)).one()
+
+
+def get_alert_groups(session: Session, fingerprints: List[str]) -> List[AlertGroup]:
+    if not fingerprints:
+        return []
+    return list(session.exec(select(AlertGroup).where(AlertGroup.fingerprint.in_(fingerprints))).all())
+
+
+def create_grouped_incidents(
+    session: Session,
+    entries: List[Tuple[str, Optional[Tuple[int, datetime]], int, dict]],
+) -> Optional[List[Incident]]:
+    """
+    Create incidents and make each one its group's incident (flush only, no commit).
+
+    entries are (fingerprint, previous, duplicate_count, incident_fields) where
+    previous is the group's (incident_id, last_seen_at) as read by the caller,
+    None if there was no group. Incidents and new groups go out as bulk
+    INSERTs. If another worker claimed one of the fingerprints meanwhile, the
+    session is rolled back and None is returned.
+    """
+    incidents = create_incidents(session, [fields for _, _, _, fields in entries])
+    now = datetime.utcnow()
+    try:
+        groups = []
+        for (fingerprint, previous, duplicate_count, _), incident in zip(entries, incidents):
+            if previous is None:
+                groups.append(
+                    AlertGroup(
+                        fingerprint=fingerprint,
+                        incident_id=incident.id,
+                        duplicate_count=duplicate_count,
+                        first_seen_at=now,
+                        last_seen_at=now,
+                    )
+                )
+                continue
+            result = session.exec(
+                update(AlertGroup)
+                .where(AlertGroup.fingerprint == fingerprint)
+                .where(AlertGroup.incident_id == previous[0])
+                .where(AlertGroup.last_seen_at == previous[1])
+                .values(incident_id=incident.id, duplicate_count=duplicate_count, first_seen_at=now, last_seen_at=now)
+            )
+            if result.rowcount != 1:
+                session.rollback()
+                return None
+        session.add_all(groups)
+        session.flush()
+    except IntegrityError:
+        session.rollback()
+        return None
+    return incidents
+
+
+def create_grouped_incident(
+    session: Session,
+    fingerprint: str,
+    previous: Optional[Tuple[int, datetime]],
+    commit: bool = True,
+    **incident_fields,
+) -> Optional[Incident]:
+    """
+    Create an incident and make it the group's incident in one transaction.
+
+    Returns None (session rolled back) when another worker claimed the
+    fingerprint first, so the caller can attach to the winner instead.
+    """
+    incidents = create_grouped_incidents(session, [(fingerprint, previous, 0, incident_fields)])
+    if incidents is None:
+        return None
+    if commit:
+        session.commit()
+        session.refresh(incidents[0])
+    return incidents[0]
+
+
+SUCCESS_RESULTS = ("answered", "ack")
+
+
+def _incident_counter_deltas(incidents: List[Incident]) -> Dict[str, int]:
+    deltas: Counter = Counter()
+    for incident in incidents:
+        deltas["incidents"] += 1
+        deltas[f"incidents:{incident.created_at.date().isoformat()}"] += 1
+    return deltas
+
+
+def _call_counter_deltas(entry: CallAttempt) -> Dict[str, int]:
+    deltas: Counter = Counter({"calls": 1, f"provider:{entry.provider}:calls": 1})
+    if entry.result in SUCCESS_RESULTS:
+        deltas["calls:successful"] += 1
+        deltas[f"provider:{entry.provider}:successful"] += 1
+    if entry.duration_sec is not None:
+        deltas["duration:sum"] += entry.duration_sec
+        deltas["duration:count"] += 1
+    if entry.dtmf:
+        deltas[f"dtmf:{entry.dtmf}"] += 1
+    return deltas
+
+
+def _upsert_add(model, rows: List[dict], dialect_name: str):
+    """INSERT rows, adding their value onto rows whose primary key already exists."""
+    insert = sqlite_insert if dialect_name == "sqlite" else postgresql_insert
+    stmt = insert(model).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[column.name for column in model.__table__.primary_key.columns],
+        set_={"value": model.value + stmt.excluded.value},
+    )
+
+
+def _upsert_counters(deltas: Dict[str, int], dialect_name: str):
+    return _upsert_add(StatCounter, [{"name": name, "value": value} for name, value in deltas.items()], dialect_name)
+
+
+def bump_counters(session: Session, deltas: Dict[str, int]) -> None:
+    """Add deltas to their counters with one INSERT ... ON CONFLICT DO UPDATE (no commit)."""
+    deltas = {name: value for name, value in deltas.items() if value}
+    if deltas:
+        session.exec(_upsert_counters(deltas, session.get_bind().dialect.name))
+
+
+def get_counters(session: Session, names: Optional[List[str]] = None, prefix: Optional[str] = None) -> Dict[str, int]:
+    query = select(StatCounter.name, StatCounter.value)
+    if names is not None:
+        query = query.where(StatCounter.name.in_(names))
+    if prefix is not None:
+        query = query.where(StatCounter.name.startswith(prefix))
+    return dict(session.exec(query).all())
+
+
+def rebuild_counters(conn: Connection) -> None:
+    """Recompute every counter from the incident and call tables (grouped single-pass scans)."""
+    deltas: Counter = Counter()
+    for day, count in conn.execute(
+        select(func.date(Incident.created_at), func.count()).group_by(func.date(Incident.created_at))
+    ):
+        deltas["incidents"] += count
+        deltas[f"incidents:{day}"] += count
+    deltas["incidents:ack"] = conn.execute(
+        select(func.count()).select_from(Incident).where(Incident.status == "ack")
+    ).scalar_one()
+    successful = case((CallAttempt.result.in_(SUCCESS_RESULTS), 1), else_=0)
+    for provider, calls, ok, duration_sum, duration_count in conn.execute(
+        select(
+            CallAttempt.provider,
+            func.count(),
+            func.sum(successful),
+            func.sum(CallAttempt.duration_sec),
+            func.count(CallAttempt.duration_sec),
+        ).group_by(CallAttempt.provider)
+    ):
+        deltas["calls"] += calls
+        deltas["calls:successful"] += ok or 0
+        deltas[f"provider:{provider}:calls"] += calls
+        deltas[f"provider:{provider}:successful"] += ok or 0
+        deltas["duration:sum"] += duration_sum or 0
+        deltas["duration:count"] += duration_count
+    for dtmf, count in conn.execute(
+        select(CallAttempt.dtmf, func.count()).where(CallAttempt.dtmf.isnot(None)).group_by(CallAttempt.dtmf)
+    ):
+        deltas[f"dtmf:{dtmf}"] += count
+    conn.execute(delete(StatCounter))
+    deltas = {name: value for name, value in deltas.items() if value}
+    if deltas:
+        conn.execute(_upsert_counters(deltas, conn.dialect.name))
+
+
+KST_OFFSET = timedelta(hours=9)
+ROLLUP_GRANULARITIES = ("hour", "day")
+
+
+def rollup_bucket(granularity: str, at: datetime) -> datetime:
+    """Start (UTC) of the hour, or of the KST calendar day, containing at."""
+    if granularity == "hour":
+        return at.replace(minute=0, second=0, microsecond=0)
+    return (at + KST_OFFSET).replace(hour=0, minute=0, second=0, microsecond=0) - KST_OFFSET
+
+
+def _call_rollup_deltas(entry: CallAttempt) -> Dict[str, int]:
+    return {"calls": 1, f"result:{entry.result}": 1, f"provider:{entry.provider}": 1}
+
+
+def _ack_rollup_deltas(incident: Incident) -> Dict[str, int]:
+    latency = (incident.acknowledged_at - incident.created_at).total_seconds()
+    return {"acks": 1, "ack_seconds": max(int(latency), 0)}
+
+
+def _rollup_rows(events: List[Tuple[datetime, Dict[str, int]]]) -> List[dict]:
+    totals: Counter = Counter()
+    for at, deltas in events:
+        for granularity in ROLLUP_GRANULARITIES:
+            bucket = rollup_bucket(granularity, at)
+            for metric, value in deltas.items():
+                totals[(granularity, bucket, metric)] += value
+    return [
+        {"granularity": granularity, "bucket_start": bucket, "metric": metric, "value": value}
+        for (granularity, bucket, metric), value in totals.items()
+        if value
+    ]
+
+
+def bump_rollups(session: Session, events: List[Tuple[datetime, Dict[str, int]]]) -> None:
+    """Add (timestamp, metric deltas) events to their hour and KST-day buckets (no commit)."""
+    rows = _rollup_rows(events)
+    if rows:
+        session.exec(_upsert_add(TrafficRollup, rows, session.get_bind().dialect.name))
+
+
+def get_rollups(session: Session, granularity: str, start: datetime, end: datetime) -> List[TrafficRollup]:
+    """Rollup rows with start <= bucket_start < end, oldest first."""
+    return list(
+        session.exec(
+            select(TrafficRollup)
+            .where(TrafficRollup.granularity == granularity)
+            .where(TrafficRollup.bucket_start >= start)
+            .where(TrafficRollup.bucket_start < end)
+            .order_by(TrafficRollup.bucket_start)
+        ).all()
+    )
+
+
+def rebuild_rollups(conn: Connection, batch_size: int = 5000) -> None:
+    """Recompute all rollups by streaming the incident and call tables once."""
+    events: List[Tuple[datetime, Dict[str, int]]] = []
+    rows: Counter = Counter()
+
+    def drain() -> None:
+        for row in _rollup_rows(events):
+            rows[(row["granularity"], row["bucket_start"], row["metric"])] += row["value"]
+        events.clear()
+
+    streamed = conn.execution_options(yield_per=batch_size)
+    for incident in streamed.execute(select(Incident.created_at, Incident.acknowledged_at, Incident.status)):
+        events.append((incident.created_at, {"incidents": 1}))
+        if incident.status == "ack" and incident.acknowledged_at is not None:
+            events.append((incident.acknowledged_at, _ack_rollup_deltas(incident)))
+        if len(events) >= batch_size:
+            drain()
+    for call in streamed.execute(select(CallAttempt.created_at, CallAttempt.result, CallAttempt.provider)):
+        events.append((call.created_at, _call_rollup_deltas(call)))
+        if len(events) >= batch_size:
+            drain()
+    drain()
+
+    conn.execute(delete(TrafficRollup))
+    values = [
+        {"granularity": granularity, "bucket_start": bucket, "metric": metric, "value": value}
+        for (granularity, bucket, metric), value in rows.items()
+    ]
+    for start in range(0, len(values), batch_size):
+        conn.execute(TrafficRollup.__table__.insert(), values[start:start + batch_size])
@@ -1,22 +1,53 @@
-from fastapi import FastAPI
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse
 
 from app.config import settings
 from app.db import init_db
+from app.log import setup_logging
 from app.routers.health import router as health_router
+from app.routers.metrics import router as metrics_router
 from app.routers.webhook import router as webhook_router
 from app.routers.simulator import router as simulator_router
 from app.routers.admin import router as admin_router
+from app.routers.policies import router as policies_router
 from app.providers.twilio_provider import router as twilio_router
 from app.providers.vonage_provider import router as vonage_router
 from app.providers.solapi_provider import router as solapi_router
+from app.providers.registry import registry as provider_registry
+from app.services.call_queue import worker_pool
+from app.services.escalation import IncidentBusy
+from app.services.loop_monitor import loop_monitor
+from app.services.tracing import setup_tracing
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 블로킹 DB/SDK 호출(asyncio.to_thread)이 사용하는 스레드 풀 크기 제한
+    executor = ThreadPoolExecutor(max_workers=settings.blocking_workers, thread_name_prefix="blocking")
+    asyncio.get_running_loop().set_default_executor(executor)
+    await loop_monitor.start()
+    # 프로바이더 HTTP 연결 풀 생성 (keep-alive 재사용)
+    await provider_registry.start()
+    # 발신 큐 워커 시작 (재시작 전 남은 작업도 이어서 처리)
+    await worker_pool.start()
+    yield
+    await worker_pool.stop()
+    await provider_registry.aclose()
+    await loop_monitor.stop()
+    executor.shutdown(wait=False)
 
 
 def create_app() -> FastAPI:
+    setup_logging()
+    setup_tracing()
     init_db()
-    app = FastAPI(title="Call Orchestrator", version="0.1.0")
+    app = FastAPI(title="Call Orchestrator", version="0.1.0", lifespan=lifespan)
     
     # CORS 설정 - 외부 접속 허용
     app.add_middleware(
@@ -27,6 +58,11 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
     
+    # 다른 워커가 인시던트를 진행 중이면 콜백을 잠시 뒤 다시 보내도록 503
+    @app.exception_handler(IncidentBusy)
+    def incident_busy(request: Request, exc: IncidentBusy):
+        return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+    
     # 루트 경로 - 메인 페이지로 자동 리다이렉트
     @app.get("/")
     def root():
@@ -34,9 +70,11 @@ def create_app() -> FastAPI:
     
     # 라우터 등록
     app.include_router(health_router)
+    app.include_router(metrics_router)
     app.include_router(webhook_router)
     app.include_router(simulator_router)
     app.include_router(admin_router)
+    app.include_router(policies_router)
     app.include_router(twilio_router)
     app.include_router(vonage_router)
     app.include_router(solapi_router)
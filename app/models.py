@@ -1,10 +1,22 @@
 from enum import Enum
-from pydantic import BaseModel
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class EscalationStrategy(str, Enum):
+    sequential = "sequential"  # 한 명씩 순서대로
+    parallel = "parallel"  # ring-all: 한 라운드의 담당자에게 동시에 발신
+    staggered = "staggered"  # stagger_seconds 간격으로 겹쳐서 발신
 
 
 class StartEscalationRequest(BaseModel):
     incident_summary: str
     tts_text: str
+    strategy: EscalationStrategy = EscalationStrategy.sequential
+    stagger_seconds: int = Field(default=10, ge=0)
+    team: Optional[str] = None  # 에스컬레이션 정책(팀) 이름, 없으면 기본 정/부 정책
+    dedup_key: Optional[str] = None  # 중복 제거 키, 없으면 incident_summary로 판단
 
 
 class Provider(str, Enum):
@@ -12,3 +24,20 @@ class Provider(str, Enum):
     vonage = "vonage"
 
 
+class PolicyContact(BaseModel):
+    name: str
+    phone: str
+    role: Optional[str] = None
+
+
+class PolicyTierIn(BaseModel):
+    contacts: List[PolicyContact] = Field(min_length=1)
+    timeout_seconds: int = Field(default=40, ge=5)  # 각 통화 벨 울림 시간
+    repeat: int = Field(default=1, ge=1)  # 티어 내 담당자 순환 횟수
+    delay_seconds: int = Field(default=0, ge=0)  # 티어 시작 전 대기 시간
+
+
+class EscalationPolicyIn(BaseModel):
+    name: str
+    tiers: List[PolicyTierIn] = Field(min_length=1)
+    repeat: int = Field(default=1, ge=1)  # 전체 티어 반복 횟수
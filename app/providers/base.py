@@ -1,18 +1,65 @@
+import asyncio
 from abc import ABC, abstractmethod
+from typing import Optional
 
 
 class VoiceProvider(ABC):
     @abstractmethod
-    def place_call(self, *, to_number: str, tts_text: str, webhook_base: str, incident_id: int) -> str:
+    def place_call(
+        self,
+        *,
+        to_number: str,
+        tts_text: str,
+        webhook_base: str,
+        incident_id: int,
+        timeout_seconds: Optional[int] = None,
+    ) -> str:
         """
         Place an outbound call with TTS and DTMF gather.
 
+        timeout_seconds overrides the ring timeout (escalation policy tiers);
+        None means settings.call_timeout_seconds. It is only passed when a
+        tier sets it, but providers written before it existed must add the
+        keyword (or **kwargs) or calls for such tiers fail.
+
         Returns provider-specific call id.
         """
 
-    @abstractmethod
-    def webhook_path(self) -> str:
-        """Return the relative callback path for provider webhook registration."""
+    async def place_call_async(
+        self,
+        *,
+        to_number: str,
+        tts_text: str,
+        webhook_base: str,
+        incident_id: int,
+        timeout_seconds: Optional[int] = None,
+    ) -> str:
+        """
+        Async variant of place_call used by the escalation engine.
 
+        Providers with a native async client override this; the default
+        runs the blocking place_call in a worker thread.
+        """
+        kwargs = {"timeout_seconds": timeout_seconds} if timeout_seconds else {}
+        return await asyncio.to_thread(
+            self.place_call,
+            to_number=to_number,
+            tts_text=tts_text,
+            webhook_base=webhook_base,
+            incident_id=incident_id,
+            **kwargs,
+        )
 
+    def cancel_call(self, call_id: str) -> None:
+        """
+        Cancel a ringing call or hang up an in-progress one.
 
+        Providers without a cancel API keep this no-op default.
+        """
+
+    async def cancel_call_async(self, call_id: str) -> None:
+        await asyncio.to_thread(self.cancel_call, call_id)
+
+    @abstractmethod
+    def webhook_path(self) -> str:
+        """Return the relative callback path for provider webhook registration."""
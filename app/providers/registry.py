@@ -0,0 +1,105 @@
+import contextlib
+from typing import Dict, Optional
+
+import httpx
+from twilio.rest import Client
+
+from app.config import settings
+from app.providers.base import VoiceProvider
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class ProviderRegistry:
+    """
+    Process-wide holder of provider instances and their keep-alive HTTP clients.
+
+    Opened from the app lifespan and closed on shutdown so every escalation
+    step reuses pooled TLS connections instead of handshaking per call.
+    """
+
+    def __init__(self) -> None:
+        self._providers: Dict[str, VoiceProvider] = {}
+        self._http: Optional[httpx.AsyncClient] = None
+        self._http_sync: Optional[httpx.Client] = None
+        self._twilio_client: Optional[Client] = None
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        )
+
+    def _timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(settings.http_timeout_seconds)
+
+    def _new_http(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=self._limits(), timeout=self._timeout())
+
+    async def start(self) -> None:
+        """Open the pool on the serving event loop before the first page goes out."""
+        # 다른 이벤트 루프에서 지연 생성된 클라이언트가 있으면 그 연결은 이 루프에서 쓸 수 없으므로 교체
+        stale, self._http = self._http, self._new_http()
+        if stale is not None:
+            with contextlib.suppress(Exception):
+                await stale.aclose()
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        if self._http_sync is not None:
+            self._http_sync.close()
+            self._http_sync = None
+        self._providers.clear()
+        self._twilio_client = None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Shared async client (created lazily if the lifespan has not run)."""
+        if self._http is None:
+            self._http = self._new_http()
+        return self._http
+
+    @property
+    def http_sync(self) -> httpx.Client:
+        """Shared blocking client for the sync place_call paths."""
+        if self._http_sync is None:
+            self._http_sync = httpx.Client(http2=HTTP2_AVAILABLE, limits=self._limits(), timeout=self._timeout())
+        return self._http_sync
+
+    @property
+    def twilio_client(self) -> Client:
+        """Shared Twilio SDK client (its requests session keeps connections alive)."""
+        if self._twilio_client is None:
+            self._twilio_client = Client(settings.twilio_account_sid, settings.twilio_auth_token)
+            self._twilio_client.api.base_url = settings.twilio_api_base_url
+        return self._twilio_client
+
+    def get(self, name: str) -> VoiceProvider:
+        """Return the cached provider instance, constructing it on first use."""
+        provider = self._providers.get(name)
+        if provider is None:
+            provider = self._build(name)
+            self._providers[name] = provider
+        return provider
+
+    def _build(self, name: str) -> VoiceProvider:
+        if name == "twilio":
+            from app.providers.twilio_provider import TwilioProvider
+            return TwilioProvider(client=self.twilio_client, registry=self)
+        if name == "solapi":
+            from app.providers.solapi_provider import SolapiProvider
+            return SolapiProvider(registry=self)
+        if name == "vonage":
+            from app.providers.vonage_provider import VonageProvider
+            return VonageProvider()
+        raise ValueError(f"Unknown voice provider: {name}")
+
+
+registry = ProviderRegistry()
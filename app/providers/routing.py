@@ -0,0 +1,246 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.db import get_call_job_provider, get_session
+from app.providers.registry import ProviderRegistry, registry as provider_registry
+from app.services.metrics import PROVIDER_CIRCUIT_OPEN, PROVIDER_FAILOVERS, observe_provider
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class NoProviderAvailable(RuntimeError):
+    """Every provider failed (or is cut off by its circuit breaker) for this attempt."""
+
+
+class ProviderHealth:
+    """
+    Rolling outcomes of one provider and its circuit breaker.
+
+    The last `window` calls of the past window_seconds are kept; a failed
+    or slower-than-slow_seconds call counts as bad. Once at least min_calls
+    are recorded and the bad share reaches error_ratio the breaker opens and
+    the provider is skipped for cooldown_seconds. Then its history is reset
+    and one trial call is let through (half open): a good result closes the
+    breaker, a bad one opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int,
+        window_seconds: float,
+        min_calls: int,
+        error_ratio: float,
+        slow_seconds: float,
+        cooldown_seconds: float,
+    ) -> None:
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_ratio = error_ratio
+        self.slow_seconds = slow_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        self._outcomes: Deque[Tuple[float, float, bool]] = deque(maxlen=window)  # (at, latency, good)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_running = False
+
+    def bad_ratio(self) -> float:
+        with self._lock:
+            self._refresh()
+            return self._bad_ratio()
+
+    def _bad_ratio(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for _, _, good in self._outcomes if not good) / len(self._outcomes)
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+        if self._state == OPEN and now - self._opened_at >= self.cooldown_seconds:
+            self._outcomes.clear()
+            self._trial_running = False
+            self._set_state(HALF_OPEN)
+
+    def allow(self) -> bool:
+        """True if a call may go to this provider now (claims the trial call when half open)."""
+        with self._lock:
+            self._refresh()
+            if self._state == HALF_OPEN:
+                if self._trial_running:
+                    return False
+                self._trial_running = True
+                return True
+            return self._state == CLOSED
+
+    def release_trial(self) -> None:
+        """Give back a trial call claimed by allow() that ended without an outcome (e.g. cancelled)."""
+        with self._lock:
+            self._trial_running = False
+
+    def degraded(self, threshold: float) -> bool:
+        """Bad share at or above threshold, once at least min_calls are recorded."""
+        with self._lock:
+            self._refresh()
+            return len(self._outcomes) >= self.min_calls and self._bad_ratio() >= threshold
+
+    def record(self, latency: float, ok: bool) -> None:
+        good = ok and latency < self.slow_seconds
+        with self._lock:
+            self._outcomes.append((time.monotonic(), latency, good))
+            if self._state == HALF_OPEN:
+                self._trial_running = False
+                if good:
+                    self._set_state(CLOSED)
+                else:
+                    self._open()
+                return
+            if (
+                self._state == CLOSED
+                and len(self._outcomes) >= self.min_calls
+                and self._bad_ratio() >= self.error_ratio
+            ):
+                self._open()
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        self._set_state(OPEN)
+
+    def _set_state(self, state: str) -> None:
+        if state != self._state:
+            logger.warning("Provider %s circuit %s -> %s", self.name, self._state, state)
+        self._state = state
+        PROVIDER_CIRCUIT_OPEN.labels(self.name).set(1 if state == OPEN else 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refresh()
+            latencies = sorted(latency for _, latency, _ in self._outcomes)
+            return {
+                "state": self._state,
+                "calls": len(self._outcomes),
+                "bad_ratio": round(self._bad_ratio(), 3),
+                "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+                "max_ms": round(latencies[-1] * 1000, 1) if latencies else None,
+            }
+
+
+class ProviderRouter:
+    """
+    Places each call with the healthiest provider and fails over on error.
+
+    Providers are tried in configured order (VOICE_PROVIDER, then
+    VOICE_FAILOVER), skipping ones whose circuit is open; a closed provider
+    already seeing bad calls (at least half the breaker threshold, over at
+    least min_calls calls) is tried after the clean ones. A failure moves the same attempt on to the next
+    provider. There is no fallback to the mock provider: when every provider
+    fails, NoProviderAvailable is raised and the queue job is retried.
+
+    Health is tracked per process. Which provider placed a call is stored on
+    its CallJob so cancels reach the right provider from any worker.
+    """
+
+    def __init__(self, names: List[str], registry: Optional[ProviderRegistry] = None, owners_size: int = 10000) -> None:
+        self.names = names
+        self.registry = registry or provider_registry
+        self.owners_size = owners_size
+        self._health = {
+            name: ProviderHealth(
+                name,
+                window=settings.provider_health_window,
+                window_seconds=settings.provider_health_window_seconds,
+                min_calls=settings.provider_breaker_min_calls,
+                error_ratio=settings.provider_breaker_error_percent / 100,
+                slow_seconds=settings.provider_slow_call_ms / 1000,
+                cooldown_seconds=settings.provider_breaker_cooldown_seconds,
+            )
+            for name in names
+        }
+        self._owners_lock = threading.Lock()
+        self._owners: "OrderedDict[str, str]" = OrderedDict()
+
+    def health(self, name: str) -> ProviderHealth:
+        return self._health[name]
+
+    def _ranked(self) -> List[str]:
+        degraded_at = settings.provider_breaker_error_percent / 200
+        return sorted(self.names, key=lambda name: self._health[name].degraded(degraded_at))
+
+    async def place_call_routed(self, **kwargs) -> Tuple[str, str]:
+        """Place the call; returns (provider name, call id)."""
+        errors: List[str] = []
+        for name in self._ranked():
+            health = self._health[name]
+            if not health.allow():
+                continue
+            started = time.perf_counter()
+            ok: Optional[bool] = None
+            try:
+                provider = self.registry.get(name)
+                with observe_provider(name, "place_call"):
+                    call_id = await provider.place_call_async(**kwargs)
+                ok = True
+            except Exception as e:
+                ok = False
+                logger.warning("%s place_call failed, trying next provider: %s", name, e)
+                errors.append(f"{name}: {e}")
+            finally:
+                if ok is None:
+                    # 작업 취소(CancelledError) 등 결과 없이 끝나면 반개방 시험 호출 권한만 반납
+                    health.release_trial()
+                else:
+                    health.record(time.perf_counter() - started, ok=ok)
+            if not ok:
+                continue
+            if errors:
+                PROVIDER_FAILOVERS.labels(name).inc()
+                logger.warning("Call placed by fallback provider %s after: %s", name, "; ".join(errors))
+            self._remember(call_id, name)
+            return name, call_id
+        raise NoProviderAvailable("; ".join(errors) or "all provider circuits are open")
+
+    async def cancel_call_async(self, call_id: str) -> None:
+        name = await self._owner(call_id)
+        with observe_provider(name, "cancel_call"):
+            await self.registry.get(name).cancel_call_async(call_id)
+
+    async def _owner(self, call_id: str) -> str:
+        with self._owners_lock:
+            name = self._owners.get(call_id)
+        if name is None:
+            name = await asyncio.to_thread(self._stored_owner, call_id)
+        return name or self.names[0]
+
+    def _stored_owner(self, call_id: str) -> Optional[str]:
+        with get_session() as session:
+            return get_call_job_provider(session, call_id)
+
+    def _remember(self, call_id: str, name: str) -> None:
+        with self._owners_lock:
+            self._owners[call_id] = name
+            while len(self._owners) > self.owners_size:
+                self._owners.popitem(last=False)
+
+    def stats(self) -> Dict[str, dict]:
+        return {name: self._health[name].stats() for name in self.names}
+
+
+def configured_providers() -> List[str]:
+    names = [settings.voice_provider]
+    for name in (part.strip() for part in settings.voice_failover.split(",")):
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+provider_router = ProviderRouter(configured_providers())
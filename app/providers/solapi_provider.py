@@ -1,27 +1,86 @@
+import asyncio
+import logging
+
 import httpx
-from fastapi import APIRouter, Response, Form, Request
-from typing import Dict, Any
+from fastapi import APIRouter, BackgroundTasks, Response, Form, Request
+from typing import Dict, Any, Optional, Tuple
 
 from app.config import settings
 from app.providers.base import VoiceProvider
+from app.providers.registry import ProviderRegistry, registry as provider_registry
 from app.db import get_session, get_incident
 
+logger = logging.getLogger(__name__)
+
 
 class SolapiProvider(VoiceProvider):
-    def __init__(self) -> None:
+    def __init__(self, registry: Optional[ProviderRegistry] = None) -> None:
+        self.registry = registry or provider_registry
         self.api_key = settings.solapi_api_key
         self.api_secret = settings.solapi_api_secret
         self.from_number = settings.solapi_from_number
-        self.base_url = "https://api.solapi.com"
-
-    def place_call(self, *, to_number: str, tts_text: str, webhook_base: str, incident_id: int) -> str:
-        """Place voice call using SOLAPI"""
-        url = f"{self.base_url}/messages/v4/send-many/detail"
+        self.base_url = settings.solapi_api_base_url
+
+    def place_call(
+        self,
+        *,
+        to_number: str,
+        tts_text: str,
+        webhook_base: str,
+        incident_id: int,
+        timeout_seconds: Optional[int] = None,
+    ) -> str:
+        """Place voice call using SOLAPI (errors are raised so the router can fail over)"""
+        # 발신번호와 수신번호가 같으면 발신하지 않음
+        if self.from_number == to_number:
+            logger.error("발신번호와 수신번호가 동일합니다. (from: %s, to: %s)", self.from_number, to_number, extra={"incident_id": incident_id})
+            raise ValueError(f"SOLAPI from and to numbers are the same: {to_number}")
+        
+        url, payload, headers = self._build_request(to_number, tts_text)
         
-        # 발신번호와 수신번호가 같으면 에러 방지
+        try:
+            response = self.registry.http_sync.post(url, json=payload, headers=headers)
+            response.raise_for_status()
+            
+            result = response.json()
+            # SOLAPI는 messageId를 반환
+            return result.get("messageId", f"solapi_{incident_id}")
+            
+        except httpx.HTTPError as e:
+            response_text = e.response.text if getattr(e, "response", None) is not None else "No response"
+            logger.error("SOLAPI API error: %s (response: %s)", e, response_text, extra={"incident_id": incident_id})
+            raise
+        except Exception as e:
+            logger.exception("SOLAPI unexpected error: %s", e, extra={"incident_id": incident_id})
+            raise
+
+    async def place_call_async(
+        self,
+        *,
+        to_number: str,
+        tts_text: str,
+        webhook_base: str,
+        incident_id: int,
+        timeout_seconds: Optional[int] = None,
+    ) -> str:
+        """Place voice call using SOLAPI without blocking the event loop"""
         if self.from_number == to_number:
-            print(f"SOLAPI Error: 발신번호와 수신번호가 동일합니다. (from: {self.from_number}, to: {to_number})")
-            return f"solapi_error_same_number_{incident_id}"
+            logger.error("발신번호와 수신번호가 동일합니다. (from: %s, to: %s)", self.from_number, to_number, extra={"incident_id": incident_id})
+            raise ValueError(f"SOLAPI from and to numbers are the same: {to_number}")
+        
+        url, payload, headers = self._build_request(to_number, tts_text)
+        
+        try:
+            response = await self.registry.http.post(url, json=payload, headers=headers)
+            response.raise_for_status()
+            return response.json().get("messageId", f"solapi_{incident_id}")
+        except httpx.HTTPError as e:
+            logger.error("SOLAPI API error: %s", e, extra={"incident_id": incident_id})
+            raise
+
+    def _build_request(self, to_number: str, tts_text: str) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
+        """Build URL, payload and signed headers for a SOLAPI voice message"""
+        url = f"{self.base_url}/messages/v4/send-many/detail"
         
         # SOLAPI 음성 메시지 요청 데이터 구성
         payload = {
@@ -45,25 +104,7 @@ class SolapiProvider(VoiceProvider):
             "Authorization": f"HMAC-SHA256 apiKey={self.api_key}, date={date}, salt={salt}, signature={signature}",
             "Content-Type": "application/json"
         }
-        
-        try:
-            with httpx.Client() as client:
-                response = client.post(url, json=payload, headers=headers)
-                response.raise_for_status()
-                
-                result = response.json()
-                # SOLAPI는 messageId를 반환
-                return result.get("messageId", f"solapi_{incident_id}")
-                
-        except httpx.HTTPError as e:
-            print(f"SOLAPI API error: {e}")
-            print(f"Response: {e.response.text if hasattr(e, 'response') else 'No response'}")
-            return f"solapi_error_{incident_id}"
-        except Exception as e:
-            print(f"SOLAPI unexpected error: {e}")
-            import traceback
-            traceback.print_exc()
-            return f"solapi_error_{incident_id}"
+        return url, payload, headers
 
     def _get_date(self) -> str:
         """Get current date in ISO 8601 format"""
@@ -92,7 +133,7 @@ class SolapiProvider(VoiceProvider):
             
             return signature
         except Exception as e:
-            print(f"SOLAPI signature generation error: {e}")
+            logger.error("SOLAPI signature generation error: %s", e)
             return "dummy_signature"
 
     def webhook_path(self) -> str:
@@ -102,9 +143,17 @@ class SolapiProvider(VoiceProvider):
 router = APIRouter(prefix="/solapi", tags=["solapi"])
 
 
+def _call_incident(message_id: str) -> Optional[int]:
+    from app.db import get_call_job_incident
+    with get_session() as session:
+        return get_call_job_incident(session, message_id)
+
+
 @router.post("/webhook")
-async def solapi_webhook(request: Request) -> dict:
+async def solapi_webhook(request: Request, background_tasks: BackgroundTasks) -> dict:
     """Handle SOLAPI webhook callbacks"""
+    from app.services.call_events import apply_call_status
+
     try:
         data = await request.json()
         
@@ -113,18 +162,25 @@ async def solapi_webhook(request: Request) -> dict:
         status = data.get("status")
         to_number = data.get("to")
         
-        print(f"SOLAPI Webhook - MessageId: {message_id}, Status: {status}, To: {to_number}")
-        
-        # TODO: 데이터베이스에 상태 업데이트
-        # with get_session() as session:
-        #     # CallAttempt 상태 업데이트
-        #     pass
-        
-        return {"ok": True, "message_id": message_id, "status": status}
+        logger.info("SOLAPI webhook: %s (to: %s)", status, to_number, extra={"call_sid": message_id})
         
+        # 웹훅에 incident_id가 없으므로 발신 작업의 messageId로 인시던트를 찾음
+        incident_id = None
+        if message_id:
+            incident_id = await asyncio.to_thread(_call_incident, message_id)
     except Exception as e:
-        print(f"SOLAPI webhook error: {e}")
+        logger.exception("SOLAPI webhook error: %s", e)
         return {"ok": False, "error": str(e)}
+    
+    response = {"ok": True, "message_id": message_id, "status": status}
+    # 에스컬레이션 발신이 아닌 메시지(/send-voice 테스트 등)는 기록만 함
+    if incident_id is None:
+        return response
+    
+    # 같은 messageId+status 재전송은 한 번만 처리, COMPLETE/FAILED면 다음 단계로
+    if not await apply_call_status(background_tasks, "solapi", incident_id, message_id, status):
+        return {**response, "duplicate": True}
+    return {**response, "incident_id": incident_id}
 
 
 @router.post("/send-voice")
@@ -135,8 +191,8 @@ async def send_voice_message(request: Request) -> dict:
         to_number = data.get("to_number")
         message = data.get("message", "테스트 음성 메시지입니다.")
         
-        provider = SolapiProvider()
-        message_id = provider.place_call(
+        provider = provider_registry.get("solapi")
+        message_id = await provider.place_call_async(
             to_number=to_number,
             tts_text=message,
             webhook_base=settings.public_base_url,
@@ -163,10 +219,10 @@ async def send_voice_message(request: Request) -> dict:
 async def test_solapi() -> dict:
     """Test SOLAPI connection"""
     try:
-        provider = SolapiProvider()
+        provider = provider_registry.get("solapi")
         
         # 간단한 연결 테스트
-        test_message_id = provider.place_call(
+        test_message_id = await provider.place_call_async(
             to_number="01000000000",  # 테스트 번호
             tts_text="SOLAPI 연결 테스트입니다.",
             webhook_base=settings.public_base_url,
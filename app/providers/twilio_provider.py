@@ -1,33 +1,93 @@
+import asyncio
+import logging
 from typing import Optional
 from datetime import datetime
-from fastapi import APIRouter, Response, Form, Request, Query
+from fastapi import APIRouter, BackgroundTasks, Response, Form, Request, Query
 from twilio.rest import Client
 
 from app.config import settings
 from app.providers.base import VoiceProvider
+from app.providers.registry import ProviderRegistry, registry as provider_registry
 from app.db import get_session, get_incident
+from app.log import log_context
+from app.services.idempotency import idempotency_store
+from app.services.metrics import observe_provider
+from app.services.tracing import incident_span
+from app.services.transfer_log import transfer_log_entry, transfer_log_store
+from app.services.twiml import ACK_TWIML, INVALID_INPUT_TWIML, twiml_renderer
 
-# 호전환 기록 저장 (메모리 기반)
-transfer_logs = {}
+logger = logging.getLogger(__name__)
 
 
 class TwilioProvider(VoiceProvider):
-    def __init__(self) -> None:
-        self.client = Client(settings.twilio_account_sid, settings.twilio_auth_token)
+    def __init__(self, client: Optional[Client] = None, registry: Optional[ProviderRegistry] = None) -> None:
+        self.registry = registry or provider_registry
+        self.client = client or self.registry.twilio_client
+        self.base_url = settings.twilio_api_base_url
 
-    def place_call(self, *, to_number: str, tts_text: str, webhook_base: str, incident_id: int) -> str:
+    def place_call(
+        self,
+        *,
+        to_number: str,
+        tts_text: str,
+        webhook_base: str,
+        incident_id: int,
+        timeout_seconds: Optional[int] = None,
+    ) -> str:
         # TwiML URL for voice message
         twiml_url = f"{webhook_base}/twilio/voice?incident_id={incident_id}"
         call = self.client.calls.create(
             url=twiml_url,
             to=to_number,
             from_=settings.twilio_from_number,
-            timeout=settings.call_timeout_seconds,
+            timeout=timeout_seconds or settings.call_timeout_seconds,
             status_callback=f"{webhook_base}/twilio/status?incident_id={incident_id}",
             status_callback_event=["initiated", "ringing", "answered", "completed"],
         )
         return call.sid
 
+    async def place_call_async(
+        self,
+        *,
+        to_number: str,
+        tts_text: str,
+        webhook_base: str,
+        incident_id: int,
+        timeout_seconds: Optional[int] = None,
+    ) -> str:
+        """Place call via the Twilio REST API without blocking the event loop"""
+        url = f"{self.base_url}/2010-04-01/Accounts/{settings.twilio_account_sid}/Calls.json"
+        data = {
+            "Url": f"{webhook_base}/twilio/voice?incident_id={incident_id}",
+            "To": to_number,
+            "From": settings.twilio_from_number,
+            "Timeout": str(timeout_seconds or settings.call_timeout_seconds),
+            "StatusCallback": f"{webhook_base}/twilio/status?incident_id={incident_id}",
+            "StatusCallbackEvent": ["initiated", "ringing", "answered", "completed"],
+        }
+        response = await self.registry.http.post(
+            url,
+            data=data,
+            auth=(settings.twilio_account_sid, settings.twilio_auth_token),
+        )
+        response.raise_for_status()
+        return response.json()["sid"]
+
+    def cancel_call(self, call_id: str) -> None:
+        # canceled: queued/ringing 상태 취소, completed: 통화 중이면 종료
+        try:
+            self.client.calls(call_id).update(status="canceled")
+        except Exception:
+            self.client.calls(call_id).update(status="completed")
+
+    async def cancel_call_async(self, call_id: str) -> None:
+        url = f"{self.base_url}/2010-04-01/Accounts/{settings.twilio_account_sid}/Calls/{call_id}.json"
+        auth = (settings.twilio_account_sid, settings.twilio_auth_token)
+        response = await self.registry.http.post(url, data={"Status": "canceled"}, auth=auth)
+        if response.status_code >= 400:
+            response = await self.registry.http.post(url, data={"Status": "completed"}, auth=auth)
+        response.raise_for_status()
+
     def send_sms(self, *, to_number: str, message: str) -> str:
         """Send SMS message using Twilio"""
         message_obj = self.client.messages.create(
@@ -41,61 +101,144 @@ class TwilioProvider(VoiceProvider):
         return "/twilio"
 
 
+def _record_transfer(tag: str, call_sid: str, incident_id: Optional[int], callee: str, dtmf: str, **fields) -> None:
+    """
+    호전환/SMS 처리 결과를 TransferLog에 저장하고, incident가 있으면 같은 트랜잭션에서
+    CallAttempt 기록 및 Incident를 ack로 변경 (이미 ack이면 그대로)
+    """
+    from app.db import log_call_attempt, mark_acknowledged, save_transfer_log
+    try:
+        with get_session() as session:
+            log = save_transfer_log(session, call_sid, incident_id=incident_id, commit=False, **fields)
+            if incident_id:
+                log_call_attempt(session, incident_id=incident_id, callee=callee, provider="twilio",
+                                 result="ack", dtmf=dtmf, commit=False)
+                mark_acknowledged(session, incident_id, commit=False)
+            session.commit()
+            transfer_log_store.remember(transfer_log_entry(log))
+        logger.info("%s transfer log saved (DTMF=%s, ack=%s)", tag, dtmf, bool(incident_id))
+    except Exception as e:
+        logger.exception("%s DB 저장 실패: %s", tag, e)
+
+
+def _send_incident_sms(call_sid: str, incident_id: Optional[int], contact_name: Optional[str]) -> bool:
+    """2번 입력: 원래 담당자에게 장애 메시지 SMS 전송 (Twilio/DB 호출이 블로킹이므로 스레드에서 실행)"""
+    sms_sent = False
+    
+    # CallSid로 원래 전화의 To 번호 조회
+    try:
+        client = provider_registry.twilio_client
+        with observe_provider("twilio", "fetch_call"):
+            call = client.calls(call_sid).fetch()
+        original_to = call.to  # 원래 전화를 받은 담당자 번호
+        caller_number = original_to
+        logger.debug("[SMS] Original call To (담당자): %s", original_to)
+    except Exception as e:
+        logger.error("[SMS] 통화 정보 조회 실패: %s", e)
+        caller_number = None
+    
+    # incident_id 검증 및 폴백
+    if not incident_id:
+        logger.warning("[SMS] incident_id 없음, 가장 최근 incident 사용")
+        # incident_id가 없으면 가장 최근 incident 가져오기
+        try:
+            with get_session() as session:
+                from app.db import Incident
+                latest_inc = session.query(Incident).order_by(Incident.id.desc()).first()
+                if latest_inc:
+                    incident_id = latest_inc.id
+                    logger.info("[SMS] Found latest incident: %s", incident_id)
+                else:
+                    logger.error("[SMS] No incidents found in database")
+                    sms_sent = False
+        except Exception as e:
+            logger.error("[SMS] 최근 incident 조회 실패: %s", e)
+            sms_sent = False
+    
+    if caller_number:
+        try:
+            from app.db import get_incident
+            sms_message = None
+            
+            # incident_id가 있으면 실제 메시지 가져오기
+            if incident_id:
+                with get_session() as session:
+                    inc = get_incident(session, incident_id)
+                    if inc:
+                        # 한국 시간으로 변환 (DB는 UTC로 저장되므로 먼저 UTC로 지정 후 KST로 변환)
+                        from zoneinfo import ZoneInfo
+                        utc_time = inc.created_at.replace(tzinfo=ZoneInfo("UTC"))
+                        kst_time = utc_time.astimezone(ZoneInfo("Asia/Seoul"))
+                        # 한국 시간 형식
+                        time_str = kst_time.strftime('%m/%d %H:%M')
+                        # 담당자명과 메시지 간결화
+                        name_prefix = f"{contact_name} 담당자님,\n" if contact_name else ""
+                        # SMS는 "장애가 발생했습니다."를 "장애 발생"으로 간결하게
+                        sms_text = inc.tts_text.replace(' 장애가 발생했습니다.', ' 장애 발생')
+                        sms_message = f"{name_prefix}[긴급 장애]\n{sms_text}\n\n발생시각: {time_str}"
+            
+            # incident가 없으면 기본 메시지 사용
+            if not sms_message:
+                logger.warning("[SMS] Using default message (no incident found)")
+                from zoneinfo import ZoneInfo
+                now_kst = datetime.now(ZoneInfo("Asia/Seoul"))
+                time_str = now_kst.strftime('%m/%d %H:%M')
+                name_prefix = f"{contact_name} 담당자님,\n" if contact_name else ""
+                sms_message = f"{name_prefix}[긴급 장애]\n단위DB 서버 다운 Critical 장애 발생\n\n발생시각: {time_str}"
+            
+            # SMS 전송
+            sms_client = provider_registry.twilio_client
+            
+            with observe_provider("twilio", "send_sms"):
+                message = sms_client.messages.create(
+                    body=sms_message,
+                    from_=settings.twilio_from_number,
+                    to=caller_number
+                )
+            
+            sms_sent = True
+            logger.info("[SMS] SMS sent to %s (MessageSid: %s)", caller_number, message.sid)
+            
+            # SMS 전송 기록 저장 및 승인 처리 (SMS 전송 = 승인으로 처리)
+            _record_transfer(
+                "[SMS]", call_sid, incident_id, caller_number, "2",
+                action="sms_send", sms_sent=True, to_number=caller_number, message_sid=message.sid,
+            )
+        except Exception as e:
+            logger.exception("[SMS] SMS 전송 실패: %s", e)
+            sms_sent = False
+    
+    return sms_sent
+
+
 router = APIRouter(prefix="/twilio", tags=["twilio"])
 
 
 @router.get("/voice")
 def twilio_voice(incident_id: int, text: Optional[str] = None) -> Response:
     # Twilio fetches TwiML; repeat message 2 times (no DTMF input required)
-    if text:
-        speak_text = text
-    else:
-        with get_session() as session:
-            inc = get_incident(session, incident_id)
-            speak_text = (
-                inc.tts_text if inc else "긴급 알림입니다."
-            )
-    
-    # Repeat message 2 times
-    twiml = f"""
-<?xml version='1.0' encoding='UTF-8'?>
-<Response>
-  <Say language="ko-KR" voice="Polly.Seoyeon">{speak_text}</Say>
-  <Pause length="1"/>
-  <Say language="ko-KR" voice="Polly.Seoyeon">{speak_text}</Say>
-  <Pause length="1"/>
-  <Say language="ko-KR" voice="Polly.Seoyeon">메시지 전달이 완료되었습니다. 감사합니다.</Say>
-  <Hangup/>
-</Response>
-""".strip()
-    return Response(content=twiml, media_type="application/xml")
+    with incident_span("twilio.voice", incident_id):
+        return Response(content=twiml_renderer.voice(incident_id, text), media_type="application/xml")
 
 
 @router.post("/gather")
-def twilio_gather(incident_id: int, Digits: Optional[str] = Form(None)) -> Response:  # Twilio posts Digits
+def twilio_gather(
+    incident_id: int,
+    background_tasks: BackgroundTasks,
+    Digits: Optional[str] = Form(None),  # Twilio posts Digits
+    CallSid: Optional[str] = Form(None),
+) -> Response:
     from app.services.escalation import acknowledge_incident, retry_next
+    from app.services.call_queue import schedule_attempt, schedule_hangups
     
-    if Digits == "1":
-        acknowledge_incident(incident_id, dtmf="1")
-        twiml = """
-<?xml version='1.0' encoding='UTF-8'?>
-<Response>
-  <Say language="en-US">Confirmation received. Thank you.</Say>
-  <Hangup/>
-</Response>
-""".strip()
-    else:
-        with get_session() as session:
-            inc = get_incident(session, incident_id)
-            text = inc.tts_text if inc else "알림입니다."
-        retry_next(incident_id, text)
-        twiml = """
-<?xml version='1.0' encoding='UTF-8'?>
-<Response>
-  <Say language="en-US">Invalid input. Ending call.</Say>
-  <Hangup/>
-</Response>
-""".strip()
+    with incident_span("twilio.gather", incident_id, {"call.sid": CallSid, "dtmf": Digits}):
+        if Digits == "1":
+            schedule_hangups(background_tasks, acknowledge_incident(incident_id, dtmf="1", call_id=CallSid))
+            twiml = ACK_TWIML
+        else:
+            text = twiml_renderer.incident_text(incident_id) or "알림입니다."
+            schedule_attempt(background_tasks, retry_next(incident_id, text, call_id=CallSid))
+            twiml = INVALID_INPUT_TWIML
     return Response(content=twiml, media_type="application/xml")
 
 
@@ -125,57 +268,31 @@ async def twilio_transfer(
             except:
                 incident_id = None
     
-    # 전체 폼 데이터 로그
-    print(f"[TRANSFER] === FULL FORM DATA ===")
-    for key, value in form.items():
-        print(f"[TRANSFER] {key}: {value}")
-    print(f"[TRANSFER] === END FORM DATA ===")
-    print(f"[TRANSFER] Parsed - Digits: {Digits}, CallSid: {call_sid}, To: {caller_number}, incident_id: {incident_id}, contact_name: {contact_name}")
-    
+    span = incident_span("twilio.transfer", incident_id, {"call.sid": call_sid, "dtmf": Digits})
+    with log_context(incident_id=incident_id, call_sid=call_sid), span:
+        # 전체 폼 데이터는 샘플링되는 DEBUG 로그로만 남김
+        logger.debug("[TRANSFER] form data", extra={"fields": {"form": dict(form.items())}})
+        logger.info("[TRANSFER] Digits=%s, To=%s, contact_name=%s", Digits, caller_number, contact_name)
+        twiml = await _transfer_twiml(call_sid, incident_id, caller_number, contact_name, Digits)
+    return Response(content=twiml.strip(), media_type="application/xml")
+
+
+async def _transfer_twiml(
+    call_sid: str, incident_id: Optional[int], caller_number: str, contact_name: Optional[str], Digits: Optional[str]
+) -> str:
+    """twilio_transfer의 입력별 처리 후 응답 TwiML 반환"""
     # 상황근무자 번호 (010-8672-1718 -> +821086721718)
     situation_room_number = "+821086721718"
     
     if Digits == "1":
-        print(f"[TRANSFER] Simulating transfer to {situation_room_number} (demo mode)")
-        
-        # 호전환 기록 저장 (메모리)
-        transfer_logs[call_sid] = {
-            "transferred": True,
-            "to_number": situation_room_number,
-            "timestamp": datetime.now().isoformat(),
-            "incident_id": incident_id,
-            "action": "call_transfer"
-        }
-        print(f"[TRANSFER] Saved transfer log for CallSid: {call_sid}")
-        
-        # DB에 DTMF 입력 기록 저장 및 Incident 상태 업데이트
-        if incident_id:
-            try:
-                with get_session() as session:
-                    from app.db import log_call_attempt, get_incident
-                    
-                    # CallAttempt 기록
-                    log_call_attempt(
-                        session=session,
-                        incident_id=incident_id,
-                        callee=caller_number or "unknown",
-                        provider="twilio",
-                        result="ack",  # 호전환 요청 = 승인으로 처리
-                        dtmf="1"
-                    )
-                    print(f"[TRANSFER] DB에 DTMF=1 기록 저장 완료")
-                    
-                    # Incident 상태를 "ack"로 변경
-                    inc = get_incident(session, incident_id)
-                    if inc and inc.status != "ack":
-                        inc.status = "ack"
-                        inc.acknowledged_at = datetime.utcnow()
-                        session.add(inc)
-                        session.commit()
-                        print(f"[TRANSFER] Incident #{incident_id} 상태를 'ack'로 변경 완료")
-            except Exception as e:
-                print(f"[TRANSFER] DB 저장 실패: {e}")
+        logger.info("[TRANSFER] Simulating transfer to %s (demo mode)", situation_room_number)
         
+        # 호전환 기록 저장 및 승인 처리 (호전환 요청 = 승인으로 처리)
+        await asyncio.to_thread(
+            _record_transfer, "[TRANSFER]", call_sid, incident_id, caller_number or "unknown", "1",
+            action="call_transfer", transferred=True, to_number=situation_room_number,
+        )
+
         # 체험용: 실제 전화 없이 메시지만 재생
         twiml = f"""<?xml version='1.0' encoding='UTF-8'?>
 <Response>
@@ -186,140 +303,7 @@ async def twilio_transfer(
 </Response>"""
     
     elif Digits == "2":
-        print(f"[SMS] ===== DIGIT 2 PRESSED =====")
-        print(f"[SMS] CallSid: {call_sid}")
-        
-        sms_sent = False
-        
-        # CallSid로 원래 전화의 To 번호 조회
-        try:
-            print(f"[SMS] Fetching original call details for CallSid: {call_sid}")
-            client = Client(settings.twilio_account_sid, settings.twilio_auth_token)
-            call = client.calls(call_sid).fetch()
-            original_to = call.to  # 원래 전화를 받은 담당자 번호
-            caller_number = original_to
-            print(f"[SMS] Original call To (담당자): {original_to}")
-        except Exception as e:
-            print(f"[SMS] ERROR fetching call details: {e}")
-            caller_number = None
-        
-        print(f"[SMS] Final caller_number: {caller_number}")
-        print(f"[SMS] incident_id: {incident_id}")
-        
-        # incident_id 검증 및 폴백
-        if not incident_id:
-            print(f"[SMS] WARNING: incident_id is EMPTY! Trying to get latest incident...")
-            # incident_id가 없으면 가장 최근 incident 가져오기
-            try:
-                with get_session() as session:
-                    from app.db import Incident
-                    latest_inc = session.query(Incident).order_by(Incident.id.desc()).first()
-                    if latest_inc:
-                        incident_id = latest_inc.id
-                        print(f"[SMS] Found latest incident: {incident_id}")
-                    else:
-                        print(f"[SMS] ERROR: No incidents found in database!")
-                        sms_sent = False
-            except Exception as e:
-                print(f"[SMS] ERROR fetching latest incident: {e}")
-                sms_sent = False
-        
-        if caller_number:
-            try:
-                from app.db import get_incident
-                sms_message = None
-                
-                # incident_id가 있으면 실제 메시지 가져오기
-                if incident_id:
-                    print(f"[SMS] Fetching incident {incident_id}...")
-                    with get_session() as session:
-                        inc = get_incident(session, incident_id)
-                        if inc:
-                            print(f"[SMS] Incident found: {inc.tts_text[:30]}...")
-                            # 한국 시간으로 변환 (DB는 UTC로 저장되므로 먼저 UTC로 지정 후 KST로 변환)
-                            from zoneinfo import ZoneInfo
-                            utc_time = inc.created_at.replace(tzinfo=ZoneInfo("UTC"))
-                            kst_time = utc_time.astimezone(ZoneInfo("Asia/Seoul"))
-                            # 한국 시간 형식
-                            time_str = kst_time.strftime('%m/%d %H:%M')
-                            # 담당자명과 메시지 간결화
-                            name_prefix = f"{contact_name} 담당자님,\n" if contact_name else ""
-                            # SMS는 "장애가 발생했습니다."를 "장애 발생"으로 간결하게
-                            sms_text = inc.tts_text.replace(' 장애가 발생했습니다.', ' 장애 발생')
-                            sms_message = f"{name_prefix}[긴급 장애]\n{sms_text}\n\n발생시각: {time_str}"
-                
-                # incident가 없으면 기본 메시지 사용
-                if not sms_message:
-                    print(f"[SMS] Using default message (no incident found)")
-                    from zoneinfo import ZoneInfo
-                    now_kst = datetime.now(ZoneInfo("Asia/Seoul"))
-                    time_str = now_kst.strftime('%m/%d %H:%M')
-                    name_prefix = f"{contact_name} 담당자님,\n" if contact_name else ""
-                    sms_message = f"{name_prefix}[긴급 장애]\n단위DB 서버 다운 Critical 장애 발생\n\n발생시각: {time_str}"
-                
-                print(f"[SMS] Prepared message (length: {len(sms_message)})")
-                
-                # SMS 전송
-                print(f"[SMS] Creating Twilio client...")
-                sms_client = Client(settings.twilio_account_sid, settings.twilio_auth_token)
-                
-                print(f"[SMS] Sending SMS from {settings.twilio_from_number} to {caller_number}...")
-                message = sms_client.messages.create(
-                    body=sms_message,
-                    from_=settings.twilio_from_number,
-                    to=caller_number
-                )
-                
-                sms_sent = True
-                print(f"[SMS] ✅ SMS sent successfully! MessageSid: {message.sid}")
-                
-                # SMS 전송 기록 저장 (메모리)
-                transfer_logs[call_sid] = {
-                    "transferred": False,
-                    "sms_sent": True,
-                    "to_number": caller_number,
-                    "message_sid": message.sid,
-                    "timestamp": datetime.now().isoformat(),
-                    "incident_id": incident_id,
-                    "action": "sms_send"
-                }
-                print(f"[SMS] Log saved for CallSid: {call_sid}")
-                
-                # DB에 DTMF 입력 기록 저장 및 Incident 상태 업데이트
-                if incident_id:
-                    try:
-                        with get_session() as session:
-                            from app.db import log_call_attempt, get_incident
-                            
-                            # CallAttempt 기록
-                            log_call_attempt(
-                                session=session,
-                                incident_id=incident_id,
-                                callee=caller_number,
-                                provider="twilio",
-                                result="ack",  # SMS 전송 = 승인으로 처리
-                                dtmf="2"
-                            )
-                            print(f"[SMS] DB에 DTMF=2 기록 저장 완료")
-                            
-                            # Incident 상태를 "ack"로 변경
-                            inc = get_incident(session, incident_id)
-                            if inc and inc.status != "ack":
-                                inc.status = "ack"
-                                inc.acknowledged_at = datetime.utcnow()
-                                session.add(inc)
-                                session.commit()
-                                print(f"[SMS] Incident #{incident_id} 상태를 'ack'로 변경 완료")
-                    except Exception as e:
-                        print(f"[SMS] DB 저장 실패: {e}")
-            except Exception as e:
-                import traceback
-                print(f"[SMS] ❌ Exception occurred: {e}")
-                print(f"[SMS] Full traceback:")
-                print(traceback.format_exc())
-                sms_sent = False
-        
-        print(f"[SMS] Final sms_sent status: {sms_sent}")
+        sms_sent = await asyncio.to_thread(_send_incident_sms, call_sid, incident_id, contact_name)
         
         # TwiML 응답
         if sms_sent:
@@ -338,57 +322,58 @@ async def twilio_transfer(
 </Response>"""
     
     else:
-        print(f"[TRANSFER] No valid digit received, ending call")
+        logger.info("[TRANSFER] No valid digit received, ending call")
         # 1번, 2번 외의 입력 또는 타임아웃
         twiml = """<?xml version='1.0' encoding='UTF-8'?>
 <Response>
   <Say language="ko-KR" voice="Polly.Seoyeon"><prosody rate="100%">감사합니다.</prosody></Say>
   <Hangup/>
 </Response>"""
-    
-    print(f"[TRANSFER] Returning TwiML: {twiml[:100]}...")
-    return Response(content=twiml.strip(), media_type="application/xml")
+    return twiml
 
 
 @router.post("/status")
-async def twilio_status(request: Request, incident_id: int) -> dict:
+async def twilio_status(
+    request: Request,
+    incident_id: int,
+    background_tasks: BackgroundTasks,
+    source: Optional[str] = Query(None),
+) -> dict:
     """Handle Twilio status callbacks for call events"""
-    from app.services.escalation import acknowledge_incident, retry_next
-    
     form = await request.form()
     call_status = form.get("CallStatus")
     call_sid = form.get("CallSid")
     
+    span = incident_span("twilio.status", incident_id, {"call.sid": call_sid, "call.status": call_status})
+    with log_context(incident_id=incident_id, call_sid=call_sid), span:
+        return await _handle_twilio_status(form, incident_id, call_sid, call_status, background_tasks, source)
+
+
+async def _handle_twilio_status(form, incident_id: int, call_sid: Optional[str], call_status: Optional[str],
+                                background_tasks: BackgroundTasks, source: Optional[str]) -> dict:
+    from app.services.call_events import apply_call_status, call_status_hub
+    from app.routers.simulator import _parse_duration
+
     # Log the call status for monitoring
-    print(f"Twilio Status - Incident: {incident_id}, CallSid: {call_sid}, Status: {call_status}")
+    logger.info("Twilio status: %s", call_status)
     
-    # If call is answered, automatically acknowledge the incident
-    if call_status == "answered":
-        acknowledge_incident(incident_id, dtmf=None)
-        print(f"Incident {incident_id} automatically acknowledged (call answered)")
+    # 상태를 기다리는 코루틴(시뮬레이터)에 즉시 전달
+    call_status_hub.publish(call_sid, {
+        "status": call_status,
+        "duration": _parse_duration(form.get("CallDuration")),
+        "answered_by": form.get("AnsweredBy"),
+        "source": "callback",
+    })
     
-    # If call completed but not answered, try next person
-    elif call_status == "completed":
-        with get_session() as session:
-            incident = get_incident(session, incident_id)
-            if incident and incident.status != "ack":
-                print(f"Call completed but not answered - trying next person")
-                tts_text = incident.tts_text
-                retry_result = retry_next(incident_id, tts_text)
-                print(f"Retry result: {retry_result}")
-    
-    # Store call status in database for audit trail
-    with get_session() as session:
-        from app.db import log_call_attempt
-        log_call_attempt(
-            session,
-            incident_id=incident_id,
-            callee="callback",
-            provider=settings.voice_provider,
-            result=call_status or "unknown",
-        )
+    response = {"ok": True, "incident_id": incident_id, "call_status": call_status, "call_sid": call_sid}
+    # 시뮬레이터 발신은 시뮬레이터가 직접 에스컬레이션을 진행하므로 여기서 종료
+    if source == "simulator":
+        return response
     
-    return {"ok": True, "incident_id": incident_id, "call_status": call_status, "call_sid": call_sid}
+    # in-progress(받음)면 승인, completed/no-answer/busy/failed/canceled면 다음 단계로
+    if not await apply_call_status(background_tasks, "twilio", incident_id, call_sid, call_status):
+        return {**response, "duplicate": True}
+    return response
 
 
 @router.post("/sms")
@@ -398,9 +383,10 @@ async def send_sms(request: Request) -> dict:
     to_number = form.get("to_number")
     message = form.get("message")
     
-    provider = TwilioProvider()
+    provider = provider_registry.get("twilio")
     try:
-        message_sid = provider.send_sms(to_number=to_number, message=message)
+        # Twilio SDK 호출은 블로킹이므로 스레드에서 실행
+        message_sid = await asyncio.to_thread(provider.send_sms, to_number=to_number, message=message)
         return {
             "ok": True, 
             "message_sid": message_sid, 
@@ -1,8 +1,15 @@
-from fastapi import APIRouter, Response, Request
+import asyncio
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, BackgroundTasks, Response, Request
 import vonage
 
 from app.config import settings
 from app.providers.base import VoiceProvider
+from app.services.tracing import incident_span
+
+logger = logging.getLogger(__name__)
 
 
 class VonageProvider(VoiceProvider):
@@ -10,7 +17,15 @@ class VonageProvider(VoiceProvider):
         self.client = vonage.Client(key=settings.vonage_api_key, secret=settings.vonage_api_secret)
         self.voice = vonage.Voice(self.client)
 
-    def place_call(self, *, to_number: str, tts_text: str, webhook_base: str, incident_id: int) -> str:
+    def place_call(
+        self,
+        *,
+        to_number: str,
+        tts_text: str,
+        webhook_base: str,
+        incident_id: int,
+        timeout_seconds: Optional[int] = None,
+    ) -> str:
         ncco = [
             {"action": "talk", "text": tts_text, "language": "ko-KR"},
             {
@@ -21,16 +36,20 @@ class VonageProvider(VoiceProvider):
             },
             {"action": "talk", "text": "입력이 없어 통화를 종료합니다.", "language": "ko-KR"},
         ]
-        resp = self.voice.create_call(
-            {
-                "to": [{"type": "phone", "number": to_number}],
-                "from": {"type": "phone", "number": settings.vonage_from_number},
-                "ncco": ncco,
-                "event_url": [f"{webhook_base}/vonage/status?incident_id={incident_id}"],
-            }
-        )
+        params = {
+            "to": [{"type": "phone", "number": to_number}],
+            "from": {"type": "phone", "number": settings.vonage_from_number},
+            "ncco": ncco,
+            "event_url": [f"{webhook_base}/vonage/status?incident_id={incident_id}"],
+        }
+        if timeout_seconds:
+            params["ringing_timer"] = timeout_seconds
+        resp = self.voice.create_call(params)
         return resp.get("uuid", "")
 
+    def cancel_call(self, call_id: str) -> None:
+        self.voice.update_call(call_id, action="hangup")
+
     def webhook_path(self) -> str:
         return "/vonage"
 
@@ -38,51 +57,60 @@ class VonageProvider(VoiceProvider):
 router = APIRouter(prefix="/vonage", tags=["vonage"])
 
 
+def _incident_text(incident_id: int) -> str:
+    from app.db import get_session, get_incident
+    with get_session() as session:
+        incident = get_incident(session, incident_id)
+        return incident.tts_text if incident else "알림입니다."
+
+
 @router.post("/gather")
-async def vonage_gather(request: Request, incident_id: int):
+async def vonage_gather(request: Request, incident_id: int, background_tasks: BackgroundTasks):
     """Handle Vonage DTMF input callbacks"""
     from app.services.escalation import acknowledge_incident, retry_next
+    from app.services.call_queue import schedule_attempt, schedule_hangups
     
     body = await request.json()
     dtmf = None
     if isinstance(body, dict):
         dtmf = body.get("dtmf") or body.get("payload", {}).get("dtmf") if isinstance(body.get("payload"), dict) else body.get("dtmf")
     
-    print(f"Vonage DTMF - Incident: {incident_id}, DTMF: {dtmf}")
+    call_uuid = body.get("uuid") if isinstance(body, dict) else None
+    logger.info("Vonage DTMF: %s", dtmf, extra={"incident_id": incident_id, "call_sid": call_uuid})
     
-    if dtmf == "1":
-        acknowledge_incident(incident_id, dtmf="1")
-        # Return NCCO to confirm acknowledgment
-        return [
-            {"action": "talk", "text": "승인 입력을 확인했습니다. 감사합니다.", "language": "ko-KR"}
-        ]
-    else:
-        # Retry next callee
-        from app.db import get_session, get_incident
-        with get_session() as session:
-            incident = get_incident(session, incident_id)
-            text = incident.tts_text if incident else "알림입니다."
-        retry_next(incident_id, text)
-        return [
-            {"action": "talk", "text": "유효하지 않은 입력입니다. 통화를 종료합니다.", "language": "ko-KR"}
-        ]
+    with incident_span("vonage.gather", incident_id, {"call.sid": call_uuid, "dtmf": dtmf}):
+        if dtmf == "1":
+            call_ids = await asyncio.to_thread(acknowledge_incident, incident_id, dtmf="1", call_id=call_uuid)
+            schedule_hangups(background_tasks, call_ids)
+            # Return NCCO to confirm acknowledgment
+            return [
+                {"action": "talk", "text": "승인 입력을 확인했습니다. 감사합니다.", "language": "ko-KR"}
+            ]
+        else:
+            # Retry next callee (DB 조회/작업 등록은 스레드에서 실행해 이벤트 루프를 막지 않음)
+            text = await asyncio.to_thread(_incident_text, incident_id)
+            plan = await asyncio.to_thread(retry_next, incident_id, text, call_id=call_uuid)
+            schedule_attempt(background_tasks, plan)
+            return [
+                {"action": "talk", "text": "유효하지 않은 입력입니다. 통화를 종료합니다.", "language": "ko-KR"}
+            ]
 
 
 @router.post("/status")
-async def vonage_status(request: Request, incident_id: int) -> dict:
+async def vonage_status(request: Request, incident_id: int, background_tasks: BackgroundTasks) -> dict:
     """Handle Vonage status callbacks for call events"""
+    from app.services.call_events import apply_call_status
+
     body = await request.json()
     status = body.get("status") if isinstance(body, dict) else None
     uuid = body.get("uuid") if isinstance(body, dict) else None
     
     # Log the call status for monitoring
-    print(f"Vonage Status - Incident: {incident_id}, UUID: {uuid}, Status: {status}")
+    logger.info("Vonage status: %s", status, extra={"incident_id": incident_id, "call_sid": uuid})
     
-    # TODO: Store call status in database for audit trail
-    # with get_session() as session:
-    #     # Update CallAttempt record with status
-    #     pass
-    
-    return {"ok": True, "incident_id": incident_id, "call_status": status, "call_uuid": uuid}
-
-
+    # answered면 승인, 종료 상태(completed/unanswered/timeout/busy...)면 다음 단계로
+    response = {"ok": True, "incident_id": incident_id, "call_status": status, "call_uuid": uuid}
+    with incident_span("vonage.status", incident_id, {"call.sid": uuid, "call.status": status}):
+        if not await apply_call_status(background_tasks, "vonage", incident_id, uuid, status):
+            return {**response, "duplicate": True}
+    return response
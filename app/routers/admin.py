@@ -1,10 +1,27 @@
-from fastapi import APIRouter
-from fastapi.responses import FileResponse
-from sqlmodel import select, func
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+import asyncio
+import base64
+import json
+from collections import defaultdict
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlmodel import select, or_, and_
+from datetime import date, datetime, time, timedelta
+from typing import List, Dict, Any, Literal, Optional, Tuple
 
-from app.db import get_session, Incident, CallAttempt
+from app.db import (
+    KST_OFFSET,
+    get_session,
+    get_counters,
+    get_rollups,
+    rebuild_counters,
+    rebuild_rollups,
+    rollup_bucket,
+    Incident,
+    CallAttempt,
+)
+from app.services.admin_events import admin_event_bus
+from app.services.metrics import track_sse
+from app.services.response_cache import admin_cache, cached_json
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -15,87 +32,164 @@ async def admin_page():
     return FileResponse("app/static/admin.html")
 
 
+ADMIN_EVENTS_HEARTBEAT_SECONDS = 15.0
+
+
+@router.get("/events")
+async def admin_events(request: Request):
+    """
+    관리자 대시보드 실시간 이벤트 (SSE)
+
+    incident_created / incident_updated / attempt_logged / incident_acknowledged,
+    그리고 클라이언트가 밀렸을 때 전체 새로고침을 요청하는 resync 이벤트를 보냅니다.
+    """
+    queue = admin_event_bus.subscribe()
+
+    async def event_generator():
+        try:
+            with track_sse("admin"):
+                yield "retry: 3000\n\n"
+                while True:
+                    try:
+                        event = await asyncio.wait_for(queue.get(), timeout=ADMIN_EVENTS_HEARTBEAT_SECONDS)
+                    except asyncio.TimeoutError:
+                        if await request.is_disconnected():
+                            break
+                        yield ": ping\n\n"  # 프록시 유휴 연결 종료 방지
+                        continue
+                    yield f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        finally:
+            admin_event_bus.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"  # Nginx buffering 방지
+        }
+    )
+
+
+# 아래 조회 엔드포인트는 캐시 미스 시 DB를 조회하므로 동기 함수로 두어 스레드풀에서 실행 (이벤트 루프를 막지 않음)
 @router.get("/stats")
-async def get_stats():
-    """전체 통계 정보 반환"""
+def get_stats(request: Request):
+    """전체 통계 정보 반환 (StatCounter 카운터 한 번 조회, 응답 캐시)"""
+    return cached_json(request, "stats", lambda headers: _stats())
+
+
+def _stats() -> Dict[str, Any]:
+    today_key = f"incidents:{datetime.utcnow().date().isoformat()}"
     with get_session() as session:
-        # 총 인시던트 수
-        total_incidents = session.exec(
-            select(func.count(Incident.id))
-        ).one()
-        
-        # 상태별 인시던트 수
-        acknowledged = session.exec(
-            select(func.count(Incident.id)).where(Incident.status == "ack")
-        ).one()
-        
-        # 총 통화 시도 수
-        total_calls = session.exec(
-            select(func.count(CallAttempt.id))
-        ).one()
-        
-        # 성공한 통화 수 (answered 또는 ack)
-        successful_calls = session.exec(
-            select(func.count(CallAttempt.id)).where(
-                CallAttempt.result.in_(["answered", "ack"])
-            )
-        ).one()
-        
-        # 평균 응답 시간
-        avg_duration = session.exec(
-            select(func.avg(CallAttempt.duration_sec)).where(
-                CallAttempt.duration_sec.isnot(None)
-            )
-        ).one()
-        
-        # 오늘 인시던트 수
-        today = datetime.utcnow().date()
-        today_incidents = session.exec(
-            select(func.count(Incident.id)).where(
-                func.date(Incident.created_at) == today
-            )
-        ).one()
-        
-        # DTMF 입력 통계 (1번: 호전환, 2번: 문자)
-        dtmf_1_count = session.exec(
-            select(func.count(CallAttempt.id)).where(CallAttempt.dtmf == "1")
-        ).one()
-        
-        dtmf_2_count = session.exec(
-            select(func.count(CallAttempt.id)).where(CallAttempt.dtmf == "2")
-        ).one()
-        
-        return {
-            "total_incidents": total_incidents,
-            "acknowledged_incidents": acknowledged,
-            "pending_incidents": total_incidents - acknowledged,
-            "total_calls": total_calls,
-            "successful_calls": successful_calls,
-            "failed_calls": total_calls - successful_calls,
-            "success_rate": round(successful_calls / total_calls * 100, 1) if total_calls > 0 else 0,
-            "avg_duration_sec": round(avg_duration, 1) if avg_duration else 0,
-            "today_incidents": today_incidents,
-            "dtmf_transfer_count": dtmf_1_count,
-            "dtmf_sms_count": dtmf_2_count,
-        }
+        counters = get_counters(
+            session,
+            names=[
+                "incidents",
+                "incidents:ack",
+                "calls",
+                "calls:successful",
+                "duration:sum",
+                "duration:count",
+                "dtmf:1",  # 1번: 호전환
+                "dtmf:2",  # 2번: 문자
+                today_key,
+            ],
+        )
+
+    total_incidents = counters.get("incidents", 0)
+    acknowledged = counters.get("incidents:ack", 0)
+    total_calls = counters.get("calls", 0)
+    successful_calls = counters.get("calls:successful", 0)
+    duration_count = counters.get("duration:count", 0)
+    avg_duration = counters.get("duration:sum", 0) / duration_count if duration_count else 0
+    return {
+        "total_incidents": total_incidents,
+        "acknowledged_incidents": acknowledged,
+        "pending_incidents": total_incidents - acknowledged,
+        "total_calls": total_calls,
+        "successful_calls": successful_calls,
+        "failed_calls": total_calls - successful_calls,
+        "success_rate": round(successful_calls / total_calls * 100, 1) if total_calls > 0 else 0,
+        "avg_duration_sec": round(avg_duration, 1) if avg_duration else 0,
+        "today_incidents": counters.get(today_key, 0),
+        "dtmf_transfer_count": counters.get("dtmf:1", 0),
+        "dtmf_sms_count": counters.get("dtmf:2", 0),
+    }
+
+
+@router.post("/stats/rebuild")
+def rebuild_stats():
+    """카운터와 트래픽 롤업을 원본 테이블에서 다시 계산 (수동 데이터 정리 후 사용, 스레드풀에서 실행)"""
+    with get_session() as session:
+        rebuild_counters(session.connection())
+        rebuild_rollups(session.connection())
+        session.commit()
+    admin_cache.invalidate()
+    return {"ok": True}
+
+
+def _encode_cursor(inc: Incident) -> str:
+    raw = f"{inc.created_at.isoformat()}|{inc.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, incident_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(incident_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid cursor")
 
 
 @router.get("/recent-incidents")
-async def get_recent_incidents(limit: int = 50):
-    """최근 인시던트 목록"""
+def get_recent_incidents(
+    request: Request,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+):
+    """
+    최근 인시던트 목록 (created_at, id 역순 keyset 페이지네이션)
+
+    다음 페이지가 있으면 X-Next-Cursor 헤더로 커서를 돌려주며, ?cursor=로 이어서 조회합니다.
+    통화 시도는 페이지 전체를 한 번의 IN 쿼리로 가져옵니다.
+    """
+    return cached_json(
+        request,
+        f"recent-incidents:{limit}:{cursor or ''}",
+        lambda headers: _recent_incidents(limit, cursor, headers),
+    )
+
+
+def _recent_incidents(limit: int, cursor: Optional[str], headers: Dict[str, str]) -> List[Dict[str, Any]]:
     with get_session() as session:
-        incidents = session.exec(
-            select(Incident).order_by(Incident.created_at.desc()).limit(limit)
-        ).all()
-        
-        result = []
-        for inc in incidents:
-            # 해당 인시던트의 통화 시도들
+        query = select(Incident).order_by(Incident.created_at.desc(), Incident.id.desc()).limit(limit + 1)
+        if cursor:
+            created_at, incident_id = _decode_cursor(cursor)
+            query = query.where(
+                or_(
+                    Incident.created_at < created_at,
+                    and_(Incident.created_at == created_at, Incident.id < incident_id),
+                )
+            )
+        incidents = session.exec(query).all()
+        if len(incidents) > limit:
+            incidents = incidents[:limit]
+            headers["X-Next-Cursor"] = _encode_cursor(incidents[-1])
+
+        calls_by_incident: Dict[int, List[CallAttempt]] = defaultdict(list)
+        if incidents:
             calls = session.exec(
-                select(CallAttempt).where(CallAttempt.incident_id == inc.id)
+                select(CallAttempt)
+                .where(CallAttempt.incident_id.in_([inc.id for inc in incidents]))
+                .order_by(CallAttempt.incident_id, CallAttempt.created_at)
             ).all()
-            
-            result.append({
+            for call in calls:
+                calls_by_incident[call.incident_id].append(call)
+
+        return [
+            {
                 "id": inc.id,
                 "summary": inc.summary,
                 "status": inc.status,
@@ -111,63 +205,118 @@ async def get_recent_incidents(limit: int = 50):
                         "duration_sec": call.duration_sec,
                         "created_at": call.created_at.isoformat(),
                     }
-                    for call in calls
+                    for call in calls_by_incident[inc.id]
                 ]
-            })
-        
-        return result
+            }
+            for inc in incidents
+        ]
 
 
 @router.get("/hourly-traffic")
-async def get_hourly_traffic():
-    """시간대별 트래픽 (최근 24시간)"""
+def get_hourly_traffic(request: Request):
+    """시간대별 트래픽 (최근 24시간, 시간별 롤업에서 조회)"""
+    return cached_json(request, "hourly-traffic", lambda headers: _hourly_traffic())
+
+
+def _hourly_traffic() -> List[Dict[str, Any]]:
+    end = rollup_bucket("hour", datetime.utcnow()) + timedelta(hours=1)
     with get_session() as session:
-        # 최근 24시간 데이터
-        since = datetime.utcnow() - timedelta(hours=24)
-        
-        incidents = session.exec(
-            select(Incident).where(Incident.created_at >= since)
-        ).all()
-        
-        # 시간대별 그룹화
-        hourly_data = {}
-        for inc in incidents:
-            hour = inc.created_at.replace(minute=0, second=0, microsecond=0)
-            hour_str = hour.isoformat()
-            if hour_str not in hourly_data:
-                hourly_data[hour_str] = 0
-            hourly_data[hour_str] += 1
-        
-        # 정렬해서 반환
-        return [
-            {"hour": hour, "count": count}
-            for hour, count in sorted(hourly_data.items())
-        ]
+        rows = get_rollups(session, "hour", end - timedelta(hours=24), end)
+    return [
+        {"hour": row.bucket_start.isoformat(), "count": row.value}
+        for row in rows
+        if row.metric == "incidents"
+    ]
+
+
+MAX_TRAFFIC_RANGE = {"hour": timedelta(days=31), "day": timedelta(days=366)}
+
+
+@router.get("/traffic")
+def get_traffic(
+    request: Request,
+    granularity: Literal["hour", "day"] = "day",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+):
+    """
+    기간별 트래픽 롤업 (start~end는 KST 날짜, 양끝 포함)
+
+    기본 기간은 hour=오늘(KST) 하루, day=최근 90일. 버킷마다 인시던트/통화/승인 수,
+    결과·프로바이더별 통화 수, 평균 승인 소요 시간을 돌려줍니다.
+    """
+    today = (datetime.utcnow() + KST_OFFSET).date()
+    end = end or today
+    start = start or (end if granularity == "hour" else end - timedelta(days=89))
+    # KST 자정 → UTC
+    range_start = datetime.combine(start, time()) - KST_OFFSET
+    range_end = datetime.combine(end + timedelta(days=1), time()) - KST_OFFSET
+    if range_end <= range_start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if range_end - range_start > MAX_TRAFFIC_RANGE[granularity]:
+        raise HTTPException(status_code=400, detail=f"range too long for granularity={granularity}")
+    return cached_json(
+        request,
+        f"traffic:{granularity}:{range_start.isoformat()}:{range_end.isoformat()}",
+        lambda headers: _traffic(granularity, range_start, range_end),
+    )
+
+
+def _traffic(granularity: str, range_start: datetime, range_end: datetime) -> List[Dict[str, Any]]:
+    with get_session() as session:
+        rows = get_rollups(session, granularity, range_start, range_end)
+
+    buckets: Dict[datetime, Dict[str, Any]] = {}
+    for row in rows:
+        bucket = buckets.get(row.bucket_start)
+        if bucket is None:
+            kst = row.bucket_start + KST_OFFSET
+            bucket = buckets[row.bucket_start] = {
+                "bucket_start": row.bucket_start.isoformat(),
+                "kst": kst.strftime("%Y-%m-%dT%H:00") if granularity == "hour" else kst.date().isoformat(),
+                "incidents": 0,
+                "calls": 0,
+                "acks": 0,
+                "ack_seconds": 0,
+                "results": {},
+                "providers": {},
+            }
+        kind, _, name = row.metric.partition(":")
+        if kind == "result":
+            bucket["results"][name] = row.value
+        elif kind == "provider":
+            bucket["providers"][name] = row.value
+        else:
+            bucket[row.metric] = row.value
+
+    result = []
+    for bucket in buckets.values():
+        ack_seconds = bucket.pop("ack_seconds")
+        bucket["avg_ack_seconds"] = round(ack_seconds / bucket["acks"], 1) if bucket["acks"] else None
+        result.append(bucket)
+    return result
 
 
 @router.get("/provider-stats")
-async def get_provider_stats():
+def get_provider_stats(request: Request):
     """프로바이더별 통계"""
+    return cached_json(request, "provider-stats", lambda headers: _provider_stats())
+
+
+def _provider_stats() -> Dict[str, Dict[str, Any]]:
     with get_session() as session:
-        providers = session.exec(
-            select(CallAttempt.provider, func.count(CallAttempt.id))
-            .group_by(CallAttempt.provider)
-        ).all()
-        
-        result = {}
-        for provider, count in providers:
-            # 성공률 계산
-            successful = session.exec(
-                select(func.count(CallAttempt.id))
-                .where(CallAttempt.provider == provider)
-                .where(CallAttempt.result.in_(["answered", "ack"]))
-            ).one()
-            
-            result[provider] = {
-                "total": count,
-                "successful": successful,
-                "success_rate": round(successful / count * 100, 1) if count > 0 else 0
-            }
-        
-        return result
+        counters = get_counters(session, prefix="provider:")
+
+    result = {}
+    for name, count in sorted(counters.items()):
+        provider, kind = name[len("provider:"):].rsplit(":", 1)
+        if kind != "calls":
+            continue
+        successful = counters.get(f"provider:{provider}:successful", 0)
+        result[provider] = {
+            "total": count,
+            "successful": successful,
+            "success_rate": round(successful / count * 100, 1) if count > 0 else 0
+        }
 
+    return result
@@ -1,5 +1,9 @@
 from fastapi import APIRouter
 
+from app.config import settings
+from app.providers.routing import provider_router
+from app.services.loop_monitor import loop_monitor
+
 router = APIRouter()
 
 
@@ -8,6 +12,13 @@ def healthz() -> dict:
     return {"ok": True}
 
 
+@router.get("/healthz/loop")
+async def healthz_loop() -> dict:
+    """이벤트 루프 지연 통계 (블로킹 호출이 루프에서 실행되면 값이 커짐)"""
+    return {"ok": True, "blocking_workers": settings.blocking_workers, **loop_monitor.stats()}
 
 
-
+@router.get("/healthz/providers")
+def healthz_providers() -> dict:
+    """프로바이더별 최근 발신 지연/실패율과 회로 차단 상태 (발신 우선순위 순)"""
+    return {"ok": True, "order": provider_router.names, "providers": provider_router.stats()}
@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Response
+
+from app.services.metrics import render_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    """Prometheus 수집 엔드포인트"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -0,0 +1,73 @@
+from fastapi import APIRouter, HTTPException
+from sqlmodel import select
+
+from app.db import get_session, save_policy, get_policy_by_name, delete_policy, EscalationPolicy
+from app.models import EscalationPolicyIn
+from app.services.policies import PolicyNotFound, policy_cache
+
+router = APIRouter(prefix="/policies", tags=["policies"])
+
+
+def _policy_response(name: str) -> dict:
+    try:
+        compiled = policy_cache.get_by_name(name)
+    except PolicyNotFound:
+        raise HTTPException(status_code=404, detail="policy not found")
+    return {
+        "id": compiled.id,
+        "name": compiled.name,
+        "repeat": compiled.repeat,
+        "total_steps": compiled.total_steps,
+        "steps": [
+            {
+                "name": step.name,
+                "phone": step.phone,
+                "role": step.role,
+                "tier": step.tier,
+                "timeout_seconds": step.timeout_seconds,
+                "delay_seconds": step.delay_seconds,
+            }
+            for step in compiled.steps
+        ],
+    }
+
+
+@router.get("")
+def list_policies() -> list:
+    """팀별 에스컬레이션 정책 목록"""
+    with get_session() as session:
+        policies = session.exec(select(EscalationPolicy).order_by(EscalationPolicy.name)).all()
+        return [{"id": p.id, "name": p.name, "repeat": p.repeat} for p in policies]
+
+
+@router.put("/{name}")
+def put_policy(name: str, payload: EscalationPolicyIn) -> dict:
+    """팀 정책 생성 또는 전체 교체"""
+    if payload.name != name:
+        raise HTTPException(status_code=400, detail="name mismatch")
+    with get_session() as session:
+        policy = save_policy(
+            session,
+            name=name,
+            repeat=payload.repeat,
+            tiers=[tier.model_dump() for tier in payload.tiers],
+        )
+        policy_cache.invalidate(policy.id)
+    return _policy_response(name)
+
+
+@router.get("/{name}")
+def read_policy(name: str) -> dict:
+    return _policy_response(name)
+
+
+@router.delete("/{name}")
+def remove_policy(name: str) -> dict:
+    with get_session() as session:
+        policy = get_policy_by_name(session, name)
+        if policy is None:
+            raise HTTPException(status_code=404, detail="policy not found")
+        policy_id = policy.id
+        delete_policy(session, policy_id)
+    policy_cache.invalidate(policy_id)
+    return {"ok": True}
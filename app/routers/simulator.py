@@ -1,16 +1,25 @@
 import asyncio
+import logging
 import time
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from typing import Optional
+from typing import List, Optional
 from urllib.parse import quote
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse, Response
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from twilio.rest import Client
 import json
 
 from app.config import settings
+from app.models import EscalationStrategy
+from app.providers.registry import registry as provider_registry
+from app.services.call_events import call_status_hub
+from app.services.metrics import observe_provider, track_sse
+from app.services.policies import PolicyNotFound, policy_cache
+from app.services.twiml import twiml_renderer
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/simulator", tags=["simulator"])
 
@@ -19,7 +28,6 @@ router = APIRouter(prefix="/simulator", tags=["simulator"])
 def get_twiml(incident_id: int, contact_name: Optional[str] = None) -> Response:
     """TwiML을 반환하는 endpoint (URL 방식 - GET/POST 모두 지원)"""
     twiml = create_twiml("", contact_name, incident_id)
-    print(f"[TWIML ENDPOINT] Returning TwiML for incident {incident_id}")
     return Response(content=twiml, media_type="application/xml")
 
 
@@ -30,57 +38,44 @@ class SimulatorCallRequest(BaseModel):
     secondary_phone: Optional[str] = None
     incident_summary: str
     tts_text: str
+    strategy: EscalationStrategy = EscalationStrategy.sequential
+    stagger_seconds: int = Field(default=10, ge=0)
+    team: Optional[str] = None  # 지정하면 팀 정책의 담당자/티어 순서로 발신
 
 
 def create_twiml(message: str, contact_name: str = None, incident_id: int = None) -> str:
-    """TwiML 생성 - 메시지 + Gather (XML 이스케이프)"""
-    import html
-    
-    # DB에서 실제 메시지 가져오기
-    from app.db import get_session, get_incident
-    with get_session() as session:
-        inc = get_incident(session, incident_id)
-        full_message = inc.tts_text if inc else "장애가 발생했습니다."
-    
-    # 담당자 이름 포함
-    if contact_name:
-        full_message = f"{contact_name} 담당자님, {full_message}"
-    
-    # XML 특수문자 이스케이프
-    full_message = html.escape(full_message)
-    
-    # Action URL
-    action_url = f"{settings.public_base_url}/twilio/transfer?incident_id={incident_id}"
-    if contact_name:
-        action_url += f"&contact_name={quote(contact_name)}"
-    
-    # Action URL도 이스케이프 (& 기호 때문)
-    action_url = html.escape(action_url)
-    
-    # TwiML 생성 (메시지 + 안내를 2번 반복)
-    twiml = f'<?xml version="1.0" encoding="UTF-8"?><Response>'
-    # 1차 반복
-    twiml += f'<Say language="ko-KR">{full_message}</Say>'
-    twiml += '<Pause length="1"/>'
-    twiml += '<Say language="ko-KR">상황근무자 연결은 1번, 장애 문자 전송은 2번을 눌러주세요.</Say>'
-    twiml += '<Pause length="1"/>'
-    # 2차 반복 (Gather 포함)
-    twiml += f'<Gather action="{action_url}" method="POST" numDigits="1" timeout="10">'
-    twiml += f'<Say language="ko-KR">{full_message}</Say>'
-    twiml += '<Pause length="1"/>'
-    twiml += '<Say language="ko-KR">상황근무자 연결은 1번, 장애 문자 전송은 2번을 눌러주세요.</Say>'
-    twiml += '</Gather>'
-    twiml += '<Hangup/></Response>'
-    
-    print(f"[TWIML-ESCAPED] incident {incident_id}:")
-    print(twiml[:300])
-    
-    return twiml
+    """TwiML 생성 - 메시지 + Gather (미리 컴파일된 템플릿, 인시던트별 캐시)"""
+    return twiml_renderer.gather(incident_id, contact_name)
+
+
+# 콜백이 오지 않을 때만 사용하는 저빈도 폴링 간격 (초)
+FALLBACK_POLL_INTERVAL = 5.0
+
+
+def _parse_duration(value) -> int:
+    try:
+        return int(value) if value else 0
+    except (ValueError, TypeError):
+        return 0
+
+
+async def _fetch_call_event(client: Client, call_sid: str) -> dict:
+    """콜백 대신 Twilio API로 상태 조회 (이벤트 루프를 막지 않도록 스레드에서 실행)"""
+    with observe_provider("twilio", "fetch_call"):
+        call = await asyncio.to_thread(client.calls(call_sid).fetch)
+    return {
+        "status": call.status,
+        "duration": _parse_duration(call.duration),
+        "answered_by": getattr(call, 'answered_by', None),
+        "source": "poll",
+    }
 
 
 async def check_call_status(client: Client, call_sid: str, max_wait: int = 20) -> dict:
     """
-    Twilio 통화 상태를 폴링하여 최종 결과 확인
+    Twilio 상태 콜백(/twilio/status)을 기다려 최종 결과 확인
+    
+    콜백이 FALLBACK_POLL_INTERVAL 동안 오지 않으면 API 조회로 대체한다.
     
     Returns:
         {"status": "answered" | "no-answer" | "busy" | "failed" | "canceled", "duration": int}
@@ -88,121 +83,163 @@ async def check_call_status(client: Client, call_sid: str, max_wait: int = 20) -
     start_time = time.time()
     in_progress_detected = False  # in-progress 상태를 한번이라도 감지했는지
     in_progress_start_time = None  # in-progress 시작 시간
-    check_count = 0  # 체크 횟수
+    events = call_status_hub.subscribe(call_sid)
     
-    while time.time() - start_time < max_wait:
-        try:
-            call = client.calls(call_sid).fetch()
-            status = call.status
-            check_count += 1
-            
-            # 디버깅: 상태 변화 로깅
-            if check_count <= 3 or status in ["completed", "busy", "failed", "canceled", "in-progress"]:
-                print(f"Call {call_sid} status: {status} (check #{check_count})")
-            
-            # 통화 상태별 처리
-            if status == "completed":
-                # completed 상태를 처음 감지했을 때, duration이 업데이트될 때까지 빠르게 재조회
-                duration = 0
-                answered_by = None
+    try:
+        while time.time() - start_time < max_wait:
+            remaining = max_wait - (time.time() - start_time)
+            try:
+                try:
+                    event = await asyncio.wait_for(events.get(), timeout=min(remaining, FALLBACK_POLL_INTERVAL))
+                except asyncio.TimeoutError:
+                    if time.time() - start_time >= max_wait:
+                        break
+                    event = await _fetch_call_event(client, call_sid)
                 
-                for retry in range(3):  # 3번 재시도 (0.4초 간격, 총 1.2초)
-                    await asyncio.sleep(0.4)
-                    call = client.calls(call_sid).fetch()
-                    
-                    try:
-                        if call.duration:
-                            duration = int(call.duration)
-                    except (ValueError, TypeError):
-                        duration = 0
+                status = event["status"]
+                logger.debug("Call status: %s (via %s)", status, event.get("source", "callback"), extra={"call_sid": call_sid})
+                
+                # 통화 상태별 처리
+                if status == "completed":
+                    duration = event.get("duration", 0)
+                    answered_by = event.get("answered_by")
+                    # 콜백에 duration이 없으면 한 번만 API로 확인
+                    if duration == 0 and event.get("source") != "poll":
+                        polled = await _fetch_call_event(client, call_sid)
+                        duration = polled["duration"]
+                        answered_by = answered_by or polled["answered_by"]
                     
-                    answered_by = getattr(call, 'answered_by', None)
+                    logger.info(
+                        "Call completed - duration: %ss, answered_by: %s, in_progress_detected: %s",
+                        duration, answered_by, in_progress_detected, extra={"call_sid": call_sid},
+                    )
                     
-                    # duration이 업데이트되었거나 in_progress가 감지되었으면 즉시 종료
-                    if duration > 0 or in_progress_detected:
-                        break
+                    # 실제로 통화가 이루어졌는지 엄격하게 확인:
+                    # 1. duration이 최소 5초 이상 (전화 받고 메시지 듣기 시작하면 최소 5초)
+                    # 2. answered_by가 machine/fax가 아님 (사람이 받은 경우)
+                    if duration >= 5 and answered_by not in ['machine', 'fax']:
+                        return {"status": "answered", "duration": duration}
+                    # duration은 있지만 너무 짧거나 자동응답기가 받은 경우
+                    elif duration > 0:
+                        logger.info(
+                            "Call duration too short (%ss) or answered_by=%s - marking as no-answer",
+                            duration, answered_by, extra={"call_sid": call_sid},
+                        )
+                        return {"status": "no-answer", "duration": duration}
+                    else:
+                        # duration이 0이면 전화 거절 또는 즉시 끊김
+                        return {"status": "no-answer", "duration": 0}
                 
-                print(f"Call completed - duration: {duration}s, answered_by: {answered_by}, in_progress_detected: {in_progress_detected}")
+                elif status in ["busy", "no-answer"]:
+                    return {"status": status, "duration": 0}
                 
-                # 실제로 통화가 이루어졌는지 엄격하게 확인:
-                # 1. duration이 최소 5초 이상 (전화 받고 메시지 듣기 시작하면 최소 5초)
-                # 2. answered_by가 machine/fax가 아님 (사람이 받은 경우)
-                if duration >= 5 and answered_by not in ['machine', 'fax']:
-                    return {"status": "answered", "duration": duration}
-                # duration은 있지만 너무 짧거나 자동응답기가 받은 경우
-                elif duration > 0:
-                    print(f"Call duration too short ({duration}s) or answered_by={answered_by} - marking as no-answer")
-                    return {"status": "no-answer", "duration": duration}
-                else:
-                    # duration이 0이면 전화 거절 또는 즉시 끊김
-                    return {"status": "no-answer", "duration": 0}
-            
-            elif status == "busy":
-                return {"status": "busy", "duration": 0}
-            
-            elif status in ["failed", "canceled"]:
-                return {"status": status, "duration": 0}
-            
-            # 아직 진행 중이면 대기 (초기엔 빠르게, 이후엔 0.5초마다 체크)
-            elif status in ["queued", "ringing"]:
-                # 초반 5번은 0.2초마다 빠르게 체크 (빠른 거절 감지)
-                wait_time = 0.2 if check_count <= 5 else 0.4
-                await asyncio.sleep(wait_time)
-                continue
-            
-            elif status == "in-progress":
-                # 전화가 연결되어 통화 중 상태 - completed 될 때까지 빠르게 체크
-                if not in_progress_detected:
-                    in_progress_detected = True
-                    in_progress_start_time = time.time()
-                    print(f"Call in progress detected at {in_progress_start_time - start_time:.1f}s")
-                print(f"Call in progress - waiting for completion...")
-                await asyncio.sleep(0.5)  # 통화 중 빠르게 체크하여 종료 즉시 감지
-                continue
+                elif status in ["failed", "canceled"]:
+                    return {"status": status, "duration": 0}
                 
-        except Exception as e:
-            print(f"Error checking call status: {e}")
-            # in-progress가 감지되었고 최소 5초 이상 통화했다면 성공으로 처리
-            if in_progress_detected and in_progress_start_time:
-                elapsed = time.time() - in_progress_start_time
-                if elapsed >= 5:
-                    print(f"Network error during call, but in-progress lasted {elapsed:.1f}s -> marking as answered")
-                    return {"status": "answered", "duration": int(elapsed)}
-                else:
-                    print(f"Network error, in-progress only lasted {elapsed:.1f}s -> marking as no-answer")
-                    return {"status": "no-answer", "duration": 0}
-            # 네트워크 에러가 반복되면 재시도
-            await asyncio.sleep(1)
-            continue
+                elif status == "in-progress":
+                    # 전화가 연결되어 통화 중 상태 - completed 콜백을 기다림
+                    if not in_progress_detected:
+                        in_progress_detected = True
+                        in_progress_start_time = time.time()
+                        logger.info("Call in progress detected at %.1fs", in_progress_start_time - start_time, extra={"call_sid": call_sid})
+                
+                # queued/initiated/ringing: 다음 이벤트 대기
+                
+            except Exception as e:
+                logger.warning("Error checking call status: %s", e, extra={"call_sid": call_sid})
+                # in-progress가 감지되었고 최소 5초 이상 통화했다면 성공으로 처리
+                if in_progress_detected and in_progress_start_time:
+                    elapsed = time.time() - in_progress_start_time
+                    if elapsed >= 5:
+                        logger.info("Network error during call, but in-progress lasted %.1fs -> marking as answered", elapsed, extra={"call_sid": call_sid})
+                        return {"status": "answered", "duration": int(elapsed)}
+                    else:
+                        logger.info("Network error, in-progress only lasted %.1fs -> marking as no-answer", elapsed, extra={"call_sid": call_sid})
+                        return {"status": "no-answer", "duration": 0}
+                # 네트워크 에러가 반복되면 재시도
+                await asyncio.sleep(1)
+                continue
+    finally:
+        call_status_hub.unsubscribe(call_sid)
     
     # 타임아웃 - in-progress가 감지되었고 최소 5초 이상이라면 성공으로 처리
     if in_progress_detected and in_progress_start_time:
         elapsed = time.time() - in_progress_start_time
         if elapsed >= 5:
-            print(f"Timeout but in-progress lasted {elapsed:.1f}s -> marking as answered")
+            logger.info("Timeout but in-progress lasted %.1fs -> marking as answered", elapsed, extra={"call_sid": call_sid})
             return {"status": "answered", "duration": int(elapsed)}
         else:
-            print(f"Timeout, in-progress only lasted {elapsed:.1f}s -> marking as no-answer")
+            logger.info("Timeout, in-progress only lasted %.1fs -> marking as no-answer", elapsed, extra={"call_sid": call_sid})
             return {"status": "no-answer", "duration": 0}
     
     return {"status": "timeout", "duration": 0}
 
 
-async def escalate_with_status(request: SimulatorCallRequest):
-    """
-    순차적 에스컬레이션 로직 with 실시간 상태 업데이트
-    정 → 부 → 정 → 부 (최대 4회)
-    한 명이라도 받으면 즉시 종료
-    """
-    def get_timestamp():
-        """한국 시간 타임스탬프 생성"""
-        return datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
-    
-    client = Client(settings.twilio_account_sid, settings.twilio_auth_token)
+def get_timestamp():
+    """한국 시간 타임스탬프 생성"""
+    return datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _sse(event: dict) -> str:
+    return f"data: {json.dumps({**event, 'timestamp': get_timestamp()}, ensure_ascii=False)}\n\n"
+
+
+async def _place_simulator_call(client: Client, contact: dict, incident_id: Optional[int]) -> str:
+    """담당자에게 발신하고 CallSid 반환 (TwiML URL 방식, 상태는 /twilio/status 콜백으로 수신)"""
+    twiml_url = f"{settings.public_base_url}/simulator/twiml/{incident_id}?contact_name={quote(contact['name'])}"
+    logger.debug("TwiML URL: %s", twiml_url, extra={"incident_id": incident_id})
     
-    # Incident 생성 (SMS에서 사용할 수 있도록)
+    status_callback = f"{settings.public_base_url}/twilio/status?incident_id={incident_id or 0}&source=simulator"
+    with observe_provider("twilio", "place_call"):
+        call = await asyncio.to_thread(
+            client.calls.create,
+            to=contact['phone'],
+            from_=settings.twilio_from_number,
+            url=twiml_url,
+            timeout=settings.call_timeout_seconds,
+            status_callback=status_callback,
+            status_callback_event=["initiated", "ringing", "answered", "completed"],
+        )
+    return call.sid
+
+
+def _record_call_result(incident_id: Optional[int], contact: dict, result: dict) -> None:
+    """DB에 통화 결과 저장 및 Incident 상태 업데이트"""
+    if not incident_id:
+        return
+    try:
+        from app.db import get_session, log_call_attempt, get_incident
+        with get_session() as session:
+            if result['status'] == 'answered':
+                call_result = "answered"
+            elif result['status'] == 'canceled-by-escalation':
+                call_result = "canceled"
+            else:
+                call_result = "no_answer"
+            log_call_attempt(
+                session=session,
+                incident_id=incident_id,
+                callee=contact['phone'],
+                provider="twilio",
+                result=call_result,
+                duration_sec=result.get('duration', 0)
+            )
+            logger.info("DB에 통화 기록 저장: %s", call_result, extra={"incident_id": incident_id})
+            
+            # 전화를 받았으면 Incident 상태를 "answered"로 변경 (아직 대응은 안함)
+            if result['status'] == 'answered':
+                inc = get_incident(session, incident_id)
+                if inc and inc.status == "new":
+                    inc.status = "answered"
+                    session.add(inc)
+                    session.commit()
+                    logger.info("Incident 상태를 'answered'로 변경 (미대응)", extra={"incident_id": incident_id})
+    except Exception as e:
+        logger.exception("DB 저장 실패: %s", e, extra={"incident_id": incident_id})
+
+
+def _create_simulator_incident(request: "SimulatorCallRequest") -> Optional[int]:
     from app.db import get_session, create_incident
-    incident_id = None
     try:
         with get_session() as session:
             incident = create_incident(
@@ -210,46 +247,188 @@ async def escalate_with_status(request: SimulatorCallRequest):
                 summary=request.incident_summary,
                 tts_text=request.tts_text
             )
-            incident_id = incident.id
-            print(f"[SIMULATOR] Created incident {incident_id} for SMS")
+            logger.info("Created incident for SMS", extra={"incident_id": incident.id})
+            return incident.id
     except Exception as e:
-        print(f"[SIMULATOR] Failed to create incident: {e}")
-    
-    # 담당자 리스트 (정-부-정-부)
-    contacts = [
+        logger.exception("Failed to create incident: %s", e)
+        return None
+
+
+async def _cancel_simulator_call(call_sid: str) -> None:
+    try:
+        with observe_provider("twilio", "cancel_call"):
+            await provider_registry.get("twilio").cancel_call_async(call_sid)
+    except Exception as e:
+        logger.warning("통화 취소 실패: %s", e, extra={"call_sid": call_sid})
+
+
+def _default_contacts(request: "SimulatorCallRequest") -> List[dict]:
+    """정-부-정-부 (부담당자가 없으면 정담당자만 2회 시도)"""
+    if not request.secondary_name or not request.secondary_phone:
+        return [
+            {"name": request.primary_name, "phone": request.primary_phone, "role": "정담당자"},
+            {"name": request.primary_name, "phone": request.primary_phone, "role": "정담당자(2차)"},
+        ]
+    return [
         {"name": request.primary_name, "phone": request.primary_phone, "role": "정담당자"},
         {"name": request.secondary_name, "phone": request.secondary_phone, "role": "부담당자"},
         {"name": request.primary_name, "phone": request.primary_phone, "role": "정담당자(2차)"},
         {"name": request.secondary_name, "phone": request.secondary_phone, "role": "부담당자(2차)"},
     ]
+
+
+def _policy_contacts(team: str) -> List[dict]:
+    """팀 정책의 전체 발신 순서 (티어 반복/정책 반복 포함)"""
+    policy = policy_cache.get_by_name(team)
+    contacts = []
+    for attempt in range(policy.total_steps):
+        step = policy.step(attempt)
+        contacts.append({
+            "name": step.name,
+            "phone": step.phone,
+            "role": step.role,
+            "round": attempt - (attempt % len(policy.steps)) + step.round_start,
+            "delay": step.delay_seconds,
+        })
+    return contacts
+
+
+def _group_rounds(contacts: List[dict]) -> List[List[dict]]:
+    """동시에 걸 수 있는 라운드로 묶기 (정책 라운드 경계 유지, 같은 번호는 같은 라운드에 넣지 않음)"""
+    rounds: List[List[dict]] = []
+    for contact in contacts:
+        if (
+            not rounds
+            or contact.get('round') != rounds[-1][0].get('round')
+            or any(c['phone'] == contact['phone'] for c in rounds[-1])
+        ):
+            rounds.append([])
+        rounds[-1].append(contact)
+    return rounds
+
+
+async def _ring_contact(
+    client: Client,
+    contact: dict,
+    attempt: int,
+    incident_id: Optional[int],
+    delay: float,
+    answered: asyncio.Event,
+    events: asyncio.Queue,
+) -> None:
+    """라운드 안의 한 담당자 발신 - 다른 담당자가 먼저 받으면 발신/통화를 취소"""
+    try:
+        if delay:
+            try:
+                await asyncio.wait_for(answered.wait(), timeout=delay)
+                return  # 시차 대기 중에 다른 담당자가 응답 -> 발신하지 않음
+            except asyncio.TimeoutError:
+                pass
+        if answered.is_set():
+            return
+        
+        await events.put({'type': 'call_start', 'attempt': attempt, 'name': contact['name'], 'phone': contact['phone'], 'role': contact['role']})
+        try:
+            call_sid = await _place_simulator_call(client, contact, incident_id)
+        except Exception as e:
+            await events.put({'type': 'call_error', 'attempt': attempt, 'name': contact['name'], 'error': str(e)})
+            return
+        await events.put({'type': 'call_initiated', 'attempt': attempt, 'call_id': call_sid})
+        
+        status_task = asyncio.create_task(check_call_status(client, call_sid, max_wait=20))
+        answered_task = asyncio.create_task(answered.wait())
+        done, _ = await asyncio.wait({status_task, answered_task}, return_when=asyncio.FIRST_COMPLETED)
+        
+        if status_task in done:
+            answered_task.cancel()
+            result = status_task.result()
+        else:
+            # 다른 담당자가 응답 -> 이 통화는 즉시 취소
+            status_task.cancel()
+            await _cancel_simulator_call(call_sid)
+            result = {"status": "canceled-by-escalation", "duration": 0}
+        
+        await asyncio.to_thread(_record_call_result, incident_id, contact, result)
+        if result['status'] == 'answered':
+            await events.put({'type': 'call_answered', 'attempt': attempt, 'name': contact['name'], 'duration': result['duration']})
+        elif result['status'] == 'canceled-by-escalation':
+            await events.put({'type': 'call_canceled', 'attempt': attempt, 'name': contact['name']})
+        else:
+            await events.put({'type': 'call_failed', 'attempt': attempt, 'name': contact['name'], 'reason': result['status']})
+    finally:
+        await events.put(None)
+
+
+async def escalate_concurrently(request: "SimulatorCallRequest", client: Client, contacts: List[dict], incident_id: Optional[int]):
+    """
+    동시(ring-all) / 시차(staggered) 에스컬레이션
+    라운드 단위로 담당자들에게 함께 발신하고, 한 명이 받으면 나머지 통화를 취소
+    """
+    staggered = request.strategy == EscalationStrategy.staggered
+    attempt = 0
+    for round_contacts in _group_rounds(contacts):
+        events: asyncio.Queue = asyncio.Queue()
+        answered = asyncio.Event()
+        answered_by = None
+        tasks = []
+        for offset, contact in enumerate(round_contacts):
+            attempt += 1
+            delay = contact.get('delay', 0) + (request.stagger_seconds * offset if staggered else 0)
+            tasks.append(asyncio.create_task(
+                _ring_contact(client, contact, attempt, incident_id, delay, answered, events)
+            ))
+        
+        running = len(tasks)
+        while running:
+            event = await events.get()
+            if event is None:
+                running -= 1
+                continue
+            yield _sse(event)
+            if answered_by is None and event['type'] == 'call_answered':
+                answered_by = event['name']
+                answered.set()
+        
+        if answered_by is not None:
+            yield _sse({'type': 'escalation_complete', 'total_attempts': attempt, 'answered_by': answered_by})
+            return
     
-    # 부담당자가 없으면 정담당자만 2회 시도
-    if not request.secondary_name or not request.secondary_phone:
-        contacts = [
-            {"name": request.primary_name, "phone": request.primary_phone, "role": "정담당자"},
-            {"name": request.primary_name, "phone": request.primary_phone, "role": "정담당자(2차)"},
-        ]
+    yield _sse({'type': 'escalation_failed', 'total_attempts': attempt})
+
+
+async def escalate_with_status(request: SimulatorCallRequest):
+    """
+    에스컬레이션 로직 with 실시간 상태 업데이트
+    정 → 부 → 정 → 부 (최대 4회, strategy가 sequential이면 순차 발신)
+    한 명이라도 받으면 즉시 종료
+    """
+    client = provider_registry.twilio_client
+    
+    # Incident 생성 (SMS에서 사용할 수 있도록) - DB 작업은 스레드에서 실행해 이벤트 루프를 막지 않음
+    incident_id = await asyncio.to_thread(_create_simulator_incident, request)
+    
+    # 담당자 리스트 (팀 정책 또는 기본 정-부-정-부)
+    if request.team:
+        contacts = await asyncio.to_thread(_policy_contacts, request.team)
+    else:
+        contacts = _default_contacts(request)
+    
+    if request.strategy != EscalationStrategy.sequential:
+        async for event in escalate_concurrently(request, client, contacts, incident_id):
+            yield event
+        return
     
     for idx, contact in enumerate(contacts, 1):
+        # 티어 시작 전 대기 (정책 기반)
+        if contact.get('delay'):
+            await asyncio.sleep(contact['delay'])
+        
         # 발신 시작 이벤트
         yield f"data: {json.dumps({'type': 'call_start', 'attempt': idx, 'name': contact['name'], 'phone': contact['phone'], 'role': contact['role'], 'timestamp': get_timestamp()}, ensure_ascii=False)}\n\n"
         await asyncio.sleep(0.1)
         
         try:
-            # URL 방식으로 TwiML 제공 (inline 대신)
-            twiml_url = f"{settings.public_base_url}/simulator/twiml/{incident_id}?contact_name={quote(contact['name'])}"
-            
-            print(f"[SIMULATOR] TwiML URL: {twiml_url}")
-            
-            # 전화 발신 (URL 방식)
-            call = client.calls.create(
-                to=contact['phone'],
-                from_=settings.twilio_from_number,
-                url=twiml_url,
-                timeout=settings.call_timeout_seconds
-            )
-            
-            call_sid = call.sid
+            call_sid = await _place_simulator_call(client, contact, incident_id)
             
             # 발신 완료 (통화 대기 중)
             yield f"data: {json.dumps({'type': 'call_initiated', 'attempt': idx, 'call_id': call_sid, 'timestamp': get_timestamp()}, ensure_ascii=False)}\n\n"
@@ -259,31 +438,7 @@ async def escalate_with_status(request: SimulatorCallRequest):
             result = await check_call_status(client, call_sid, max_wait=20)
             
             # DB에 통화 결과 저장 및 Incident 상태 업데이트
-            if incident_id:
-                try:
-                    from app.db import log_call_attempt, get_incident
-                    with get_session() as session:
-                        call_result = "answered" if result['status'] == 'answered' else "no_answer"
-                        log_call_attempt(
-                            session=session,
-                            incident_id=incident_id,
-                            callee=contact['phone'],
-                            provider="twilio",
-                            result=call_result,
-                            duration_sec=result.get('duration', 0)
-                        )
-                        print(f"[SIMULATOR] DB에 통화 기록 저장: {call_result}")
-                        
-                        # 전화를 받았으면 Incident 상태를 "answered"로 변경 (아직 대응은 안함)
-                        if result['status'] == 'answered':
-                            inc = get_incident(session, incident_id)
-                            if inc and inc.status == "new":
-                                inc.status = "answered"
-                                session.add(inc)
-                                session.commit()
-                                print(f"[SIMULATOR] Incident #{incident_id} 상태를 'answered'로 변경 (미대응)")
-                except Exception as e:
-                    print(f"[SIMULATOR] DB 저장 실패: {e}")
+            await asyncio.to_thread(_record_call_result, incident_id, contact, result)
             
             # 결과 전송
             if result['status'] == 'answered':
@@ -307,15 +462,23 @@ async def escalate_with_status(request: SimulatorCallRequest):
 @router.post("/call")
 async def simulator_call(request: SimulatorCallRequest):
     """
-    실시간 순차 에스컬레이션 with SSE (Server-Sent Events)
+    실시간 에스컬레이션 with SSE (Server-Sent Events)
     
-    정담당자 → 부담당자 → 정담당자(2차) → 부담당자(2차)
+    sequential: 정담당자 → 부담당자 → 정담당자(2차) → 부담당자(2차)
+    parallel/staggered: 라운드별 동시(또는 시차) 발신
     한 명이라도 받으면 즉시 종료
     """
+    if request.team:
+        try:
+            policy_cache.get_by_name(request.team)
+        except PolicyNotFound:
+            raise HTTPException(status_code=404, detail="policy not found")
+    
     async def event_generator():
         try:
-            async for event in escalate_with_status(request):
-                yield event
+            with track_sse("simulator"):
+                async for event in escalate_with_status(request):
+                    yield event
         except Exception as e:
             yield f"data: {json.dumps({'type': 'error', 'message': str(e)}, ensure_ascii=False)}\n\n"
     
@@ -335,19 +498,19 @@ def get_transfer_log(call_sid: str):
     """
     호전환 기록 조회
     """
-    from app.providers.twilio_provider import transfer_logs
+    from app.services.transfer_log import transfer_log_store
     
-    if call_sid in transfer_logs:
-        log = transfer_logs[call_sid]
+    log = transfer_log_store.get(call_sid)
+    if log:
         return {
             "found": True,
-            "transferred": log.get("transferred", False),
-            "to_number": log.get("to_number"),
-            "timestamp": log.get("timestamp")
+            "transferred": log["transferred"],
+            "sms_sent": log["sms_sent"],
+            "to_number": log["to_number"],
+            "timestamp": log["timestamp"]
         }
     else:
         return {
             "found": False,
             "transferred": False
         }
-
@@ -1,25 +1,131 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
+from typing import List, Optional
 
+from fastapi import APIRouter, BackgroundTasks, Header, HTTPException, Request
+from pydantic import ValidationError
+
+from app.config import settings
 from app.models import StartEscalationRequest
-from app.services.escalation import start_escalation, acknowledge_incident, retry_next
+from app.services.escalation import start_escalation, start_escalation_batch, acknowledge_incident, retry_next
+from app.services.call_queue import schedule_attempt, schedule_hangups
+from app.services.idempotency import idempotency_store
+from app.services.policies import PolicyNotFound, policy_cache
 from app.db import get_session, get_incident
 
 router = APIRouter(prefix="/webhook", tags=["webhook"])
 
 @router.post("/start")
-def webhook_start(payload: StartEscalationRequest) -> dict:
-    # 에스컬레이션 시작
-    result = start_escalation(payload.incident_summary, payload.tts_text)
+def webhook_start(
+    payload: StartEscalationRequest,
+    background_tasks: BackgroundTasks,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+) -> dict:
+    # 같은 Idempotency-Key로 재시도하면 새로 발신하지 않고 처음 응답을 그대로 돌려줌
+    key = f"start:{idempotency_key}" if idempotency_key else None
+    if key:
+        if len(idempotency_key) > 200:
+            raise HTTPException(status_code=400, detail="Idempotency-Key too long")
+        if not idempotency_store.claim(key):
+            previous = idempotency_store.response(key)
+            if previous is None:
+                raise HTTPException(status_code=409, detail="request with this Idempotency-Key is in progress")
+            return previous
+    # 에스컬레이션 시작 (발신은 응답 후 백그라운드에서 진행)
+    try:
+        result = start_escalation(
+            payload.incident_summary,
+            payload.tts_text,
+            strategy=payload.strategy,
+            stagger_seconds=payload.stagger_seconds,
+            team=payload.team,
+            dedup_key=payload.dedup_key,
+        )
+    except Exception as e:
+        if key:
+            idempotency_store.release(key)
+        if isinstance(e, PolicyNotFound):
+            raise HTTPException(status_code=404, detail="policy not found")
+        raise
+    result = schedule_attempt(background_tasks, result)
+    if key:
+        idempotency_store.save_response(key, result)
     return result
 
+def _parse_alert(index: int, raw) -> StartEscalationRequest:
+    try:
+        return StartEscalationRequest.model_validate(raw)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail={"index": index, "errors": e.errors(include_url=False)})
+
+def _loads(index: int, line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError:
+        raise HTTPException(status_code=422, detail={"index": index, "errors": "invalid JSON"})
+
+async def _ndjson_alerts(request: Request):
+    """Yield alerts from an NDJSON body as lines arrive."""
+    index = 0
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_alert(index, _loads(index, line))
+                index += 1
+    if buffer.strip():
+        yield _parse_alert(index, _loads(index, buffer))
+
+def _resolve_teams(alerts: List[StartEscalationRequest]) -> None:
+    """Raise 404 for an unknown team before anything is written."""
+    for team in {alert.team for alert in alerts if alert.team}:
+        try:
+            policy_cache.get_by_name(team)
+        except PolicyNotFound:
+            raise HTTPException(status_code=404, detail=f"policy not found: {team}")
+
+async def _ingest(alerts: List[StartEscalationRequest], background_tasks: BackgroundTasks) -> List[dict]:
+    try:
+        results = await asyncio.to_thread(start_escalation_batch, alerts)
+    except PolicyNotFound as e:
+        raise HTTPException(status_code=404, detail=f"policy not found: {e}")
+    for result in results:
+        schedule_attempt(background_tasks, result)
+    return results
+
+@router.post("/start-batch")
+async def webhook_start_batch(request: Request, background_tasks: BackgroundTasks) -> dict:
+    # 알림 일괄 접수: JSON 배열 또는 NDJSON(한 줄에 알림 하나)
+    # 본문 전체의 형식과 팀을 먼저 확인한 뒤 기록: 뒤쪽 알림이 잘못됐을 때 앞쪽만 저장되어
+    # 실패 응답을 받은 클라이언트의 재시도가 중복 발신을 만들지 않도록 함
+    if "ndjson" in request.headers.get("content-type", ""):
+        # NDJSON은 도착하는 대로 파싱/검증
+        alerts = [alert async for alert in _ndjson_alerts(request)]
+    else:
+        try:
+            payload = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=422, detail="invalid JSON")
+        if not isinstance(payload, list):
+            raise HTTPException(status_code=422, detail="expected a JSON array of alerts")
+        alerts = [_parse_alert(index, raw) for index, raw in enumerate(payload)]
+    await asyncio.to_thread(_resolve_teams, alerts)
+    # INGEST_BATCH_SIZE 단위로 한 트랜잭션씩 기록
+    results: List[dict] = []
+    for start in range(0, len(alerts), settings.ingest_batch_size):
+        results += await _ingest(alerts[start:start + settings.ingest_batch_size], background_tasks)
+    return {"accepted": len(results), "results": results}
+
 @router.post("/ack/{incident_id}")
-def webhook_ack(incident_id: int) -> dict:
-    acknowledge_incident(incident_id, dtmf="1")
+def webhook_ack(incident_id: int, background_tasks: BackgroundTasks) -> dict:
+    schedule_hangups(background_tasks, acknowledge_incident(incident_id, dtmf="1"))
     return {"ok": True}
 
 @router.post("/retry/{incident_id}")
-def webhook_retry(incident_id: int, payload: StartEscalationRequest) -> dict:
-    return retry_next(incident_id, payload.tts_text)
+def webhook_retry(incident_id: int, payload: StartEscalationRequest, background_tasks: BackgroundTasks) -> dict:
+    return schedule_attempt(background_tasks, retry_next(incident_id, payload.tts_text))
 
 @router.get("/incident/{incident_id}")
 def webhook_incident(incident_id: int) -> dict:
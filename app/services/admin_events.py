@@ -0,0 +1,55 @@
+import asyncio
+from typing import Dict, List
+
+from app.config import settings
+from app.db import on_data_change
+
+
+class EventBus:
+    """
+    In-process pub/sub fan-out of committed data changes to SSE clients.
+
+    Each subscriber gets its own bounded queue. A client that falls behind
+    has its backlog replaced by a single "resync" event (reload everything)
+    instead of growing memory.
+    """
+
+    def __init__(self, max_queue: int) -> None:
+        self.max_queue = max_queue
+        self._subscribers: Dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue)
+        self._subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.pop(queue, None)
+
+    def publish(self, events: List[dict]) -> None:
+        """Fan events out to every subscriber; safe to call from any thread."""
+        for queue, loop in list(self._subscribers.items()):
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, events)
+            except RuntimeError:
+                # 루프가 이미 닫힌 구독자
+                self.unsubscribe(queue)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, events: List[dict]) -> None:
+        for event in events:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "resync"})
+                return
+
+
+admin_event_bus = EventBus(max_queue=settings.admin_events_queue_size)
+on_data_change(admin_event_bus.publish)
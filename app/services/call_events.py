@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from fastapi import BackgroundTasks
+
+logger = logging.getLogger(__name__)
+
+# 프로바이더 통화 상태 → 에스컬레이션 이벤트
+# answered: 받음 → 인시던트 승인, 나머지 통화 취소 / ended: 통화 종료(미응답 포함) → call_ended
+CALL_ANSWERED, CALL_ENDED = "answered", "ended"
+_STATUS_EVENTS: Dict[str, Dict[str, str]] = {
+    # Twilio는 받은 통화를 in-progress로, 끝난 통화를 completed/no-answer/busy/failed/canceled로 알림
+    "twilio": {
+        "in-progress": CALL_ANSWERED,
+        "completed": CALL_ENDED,
+        "no-answer": CALL_ENDED,
+        "busy": CALL_ENDED,
+        "failed": CALL_ENDED,
+        "canceled": CALL_ENDED,
+    },
+    # Vonage 이벤트 웹훅: answered 후 completed, 받지 않으면 timeout/unanswered/busy/rejected 등으로 종료
+    "vonage": {
+        "answered": CALL_ANSWERED,
+        "completed": CALL_ENDED,
+        "busy": CALL_ENDED,
+        "cancelled": CALL_ENDED,
+        "failed": CALL_ENDED,
+        "rejected": CALL_ENDED,
+        "timeout": CALL_ENDED,
+        "unanswered": CALL_ENDED,
+    },
+    # SOLAPI 음성 메시지는 DTMF 승인이 없으므로 전달 결과(COMPLETE/FAILED)를 통화 종료로 처리
+    "solapi": {
+        "complete": CALL_ENDED,
+        "failed": CALL_ENDED,
+    },
+}
+
+
+def call_event(provider: str, status: Optional[str]) -> Optional[str]:
+    """CALL_ANSWERED / CALL_ENDED for a provider's call status, None for intermediate ones (ringing...)."""
+    return _STATUS_EVENTS.get(provider, {}).get((status or "").lower())
+
+
+class CallStatusHub:
+    """
+    In-process hand-off of Twilio status callbacks to whoever awaits a CallSid.
+
+    /twilio/status publishes every callback here; the simulator subscribes to
+    the CallSid it just created instead of polling the Twilio API. Events that
+    arrive before the subscription (fast rejects) are buffered briefly.
+    """
+
+    def __init__(self, max_early_events: int = 1000) -> None:
+        self._queues: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = {}
+        self._early: "OrderedDict[str, list]" = OrderedDict()
+        self._max_early_events = max_early_events
+
+    def subscribe(self, call_sid: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._queues[call_sid] = (asyncio.get_running_loop(), queue)
+        for event in self._early.pop(call_sid, []):
+            queue.put_nowait(event)
+        return queue
+
+    def unsubscribe(self, call_sid: str) -> None:
+        self._queues.pop(call_sid, None)
+
+    def publish(self, call_sid: Optional[str], event: dict) -> None:
+        """Deliver a status event; safe to call from any thread."""
+        if not call_sid:
+            return
+        target = self._queues.get(call_sid)
+        if target is None:
+            self._early.setdefault(call_sid, []).append(event)
+            self._early.move_to_end(call_sid)
+            while len(self._early) > self._max_early_events:
+                self._early.popitem(last=False)
+            return
+        loop, queue = target
+        loop.call_soon_threadsafe(queue.put_nowait, event)
+
+
+call_status_hub = CallStatusHub()
+
+
+async def apply_call_status(
+    background_tasks: BackgroundTasks,
+    provider: str,
+    incident_id: int,
+    call_id: Optional[str],
+    status: Optional[str],
+) -> bool:
+    """
+    Advance the escalation for a provider status callback, once per call and status.
+
+    Answering acknowledges the incident and hangs up the other calls of the
+    round; a terminal status runs call_ended (next step or round). Every
+    status is logged as a "callback" attempt. Returns False for a repeated
+    delivery that was ignored.
+    """
+    from app.services.call_queue import schedule_attempt, schedule_hangups
+    from app.services.escalation import acknowledge_incident, call_ended, log_status_callback
+    from app.services.idempotency import idempotency_store
+
+    # 타임아웃 재전송 등 같은 통화+상태 콜백은 한 번만 처리
+    key = f"{provider}:{call_id}:{status}" if call_id and status else None
+    if key and not await asyncio.to_thread(idempotency_store.claim, key):
+        logger.info("%s status: duplicate callback ignored (%s)", provider, status)
+        return False
+    try:
+        event = call_event(provider, status)
+        if event == CALL_ANSWERED:
+            # 동시/시차 발신 중인 다른 통화는 취소
+            call_ids = await asyncio.to_thread(acknowledge_incident, incident_id, dtmf=None, call_id=call_id)
+            schedule_hangups(background_tasks, call_ids)
+            logger.info("Incident automatically acknowledged (call answered)")
+        elif event == CALL_ENDED:
+            plan = await asyncio.to_thread(call_ended, incident_id, call_id)
+            logger.info("Call ended (%s), next step: %s", status, schedule_attempt(background_tasks, plan))
+        await asyncio.to_thread(log_status_callback, incident_id, provider, status)
+    except Exception:
+        # 처리 실패 시 재전송이 다시 처리되도록 키 해제
+        # (프로세스가 죽으면 키의 처리 중 리스가 만료된 뒤 재전송이 이어받음)
+        if key:
+            await asyncio.to_thread(idempotency_store.release, key)
+        raise
+    if key:
+        await asyncio.to_thread(idempotency_store.finish, key)
+    return True
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import os
+import socket
+from typing import List, Optional
+
+from fastapi import BackgroundTasks
+
+from app.config import settings
+from app.db import CallJob, get_session, claim_call_job
+from app.services.escalation import run_call_job, hang_up_calls
+
+logger = logging.getLogger(__name__)
+
+
+class CallWorkerPool:
+    """
+    Pool of async workers draining the durable CallJob queue.
+
+    Jobs are leased for a visibility timeout; a job whose worker dies before
+    completing it is picked up again once the lease expires (at-least-once).
+    """
+
+    def __init__(self, workers: int, poll_interval: float, visibility_timeout: int) -> None:
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.visibility_timeout = visibility_timeout
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+        logger.info("Started %s call workers (%s)", self.workers, self.owner)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = None
+        self._loop = None
+
+    def notify(self) -> None:
+        """Wake idle workers after new jobs were enqueued (safe from any thread)."""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _claim(self, job_id: Optional[int] = None) -> Optional[CallJob]:
+        with get_session() as session:
+            job = claim_call_job(session, self.owner, self.visibility_timeout, job_id=job_id)
+            if job is not None:
+                session.expunge(job)
+            return job
+
+    async def run_job(self, job_id: int) -> None:
+        """Claim and run one specific job right away (no-op if another worker has it)."""
+        job = await asyncio.to_thread(self._claim, job_id)
+        if job is not None:
+            await run_call_job(job)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                job = await asyncio.to_thread(self._claim)
+                if job is None:
+                    await self._idle()
+                    continue
+                await run_call_job(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Worker error: %s", e)
+                await asyncio.sleep(self.poll_interval)
+
+    async def _idle(self) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+
+worker_pool = CallWorkerPool(
+    workers=settings.queue_workers,
+    poll_interval=settings.queue_poll_interval_seconds,
+    visibility_timeout=settings.queue_visibility_timeout_seconds,
+)
+
+
+def schedule_attempt(background_tasks: BackgroundTasks, plan: dict) -> dict:
+    """
+    Dispatch the job enqueued by start_escalation/retry_next.
+
+    The job is already durable; running it as a background task just avoids
+    waiting for the next worker poll.
+    """
+    job_ids = plan.get("job_ids") or ([plan["job_id"]] if "job_id" in plan else [])
+    for job_id in job_ids:
+        # 지연(staggered) 작업은 아직 claim되지 않으므로 워커가 시간에 맞춰 처리
+        background_tasks.add_task(worker_pool.run_job, job_id)
+    if job_ids:
+        worker_pool.notify()
+    return plan
+
+
+def schedule_hangups(background_tasks: BackgroundTasks, call_ids: List[str]) -> None:
+    """Cancel the other calls of a round after the response is sent."""
+    if call_ids:
+        background_tasks.add_task(hang_up_calls, call_ids)
@@ -0,0 +1,156 @@
+import hashlib
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlmodel import Session
+
+from app.config import settings
+from app.db import (
+    Incident,
+    get_alert_group,
+    get_alert_groups,
+    attach_duplicate_alert,
+    create_grouped_incident,
+    create_grouped_incidents,
+)
+
+
+def alert_fingerprint(summary: str, dedup_key: Optional[str] = None, team: Optional[str] = None) -> str:
+    """Stable fingerprint of an alert: the client's dedup key, else its summary, per team."""
+    source = dedup_key if dedup_key else " ".join(summary.split()).lower()
+    return hashlib.sha256(f"{team or ''}\n{source}".encode("utf-8")).hexdigest()
+
+
+class DedupIndex:
+    """
+    Bounded in-memory view of AlertGroup rows (fingerprint -> open incident, first_seen_at).
+
+    Lets an alert storm attach duplicates with one conditional UPDATE instead
+    of a read per alert. The AlertGroup table stays authoritative: a stale or
+    missing entry only costs a lookup.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._groups: "OrderedDict[str, Tuple[int, datetime]]" = OrderedDict()
+        self._fingerprints: Dict[int, str] = {}
+
+    def get(self, fingerprint: str) -> Optional[Tuple[int, datetime]]:
+        entry = self._groups.get(fingerprint)
+        if entry is not None:
+            self._groups.move_to_end(fingerprint)
+        return entry
+
+    def put(self, fingerprint: str, incident_id: int, first_seen_at: datetime) -> None:
+        previous = self._groups.get(fingerprint)
+        if previous is not None and previous[0] != incident_id:
+            self._fingerprints.pop(previous[0], None)
+        self._groups[fingerprint] = (incident_id, first_seen_at)
+        self._groups.move_to_end(fingerprint)
+        self._fingerprints[incident_id] = fingerprint
+        while len(self._groups) > self.max_entries:
+            _, (old_incident, _) = self._groups.popitem(last=False)
+            self._fingerprints.pop(old_incident, None)
+
+    def forget_incident(self, incident_id: int) -> None:
+        """Drop the group of an incident that was acknowledged."""
+        fingerprint = self._fingerprints.pop(incident_id, None)
+        if fingerprint is not None:
+            self._groups.pop(fingerprint, None)
+
+    def clear(self) -> None:
+        self._groups.clear()
+        self._fingerprints.clear()
+
+
+dedup_index = DedupIndex(max_entries=settings.dedup_index_size)
+
+
+def open_grouped_incident(
+    session: Session,
+    fingerprint: str,
+    commit: bool = True,
+    **incident_fields,
+) -> Tuple[Optional[Incident], int, int]:
+    """
+    Attach the alert to its group's open incident, or create a new incident.
+
+    Returns (incident, incident_id, duplicate_count); incident is only set
+    when it was just created and still needs escalating. With commit=False a
+    new incident is flushed and left for the caller's commit.
+    """
+    window_start = datetime.utcnow() - timedelta(seconds=settings.dedup_window_seconds)
+    for _ in range(3):
+        cached = dedup_index.get(fingerprint)
+        if cached is not None and cached[1] >= window_start:
+            count = attach_duplicate_alert(session, fingerprint, cached[0], window_start)
+            if count is not None:
+                return None, cached[0], count
+
+        # 창은 그룹의 첫 알림 기준 (계속 반복되는 알림이 끝난 인시던트에 영원히 묶이지 않도록)
+        group = get_alert_group(session, fingerprint)
+        previous = (group.incident_id, group.last_seen_at) if group is not None else None
+        if group is not None and group.first_seen_at >= window_start:
+            count = attach_duplicate_alert(session, fingerprint, group.incident_id, window_start)
+            if count is not None:
+                dedup_index.put(fingerprint, group.incident_id, group.first_seen_at)
+                return None, group.incident_id, count
+
+        # 그룹이 없거나 만료/ack 됨 → 새 인시던트를 그룹 대표로 등록 (경합 시 재시도)
+        incident = create_grouped_incident(session, fingerprint, previous, commit=commit, **incident_fields)
+        if incident is not None:
+            dedup_index.put(fingerprint, incident.id, incident.created_at)
+            return incident, incident.id, 0
+    raise RuntimeError(f"alert group {fingerprint[:12]} kept changing, giving up")
+
+
+def open_grouped_incidents(
+    session: Session,
+    alerts: List[Tuple[str, dict]],
+) -> Optional[List[Tuple[Optional[Incident], int, int]]]:
+    """
+    Batch form of open_grouped_incident for (fingerprint, incident_fields) pairs.
+
+    Groups are read with one query, repeats inside the batch are folded into
+    one UPDATE per group and new incidents are bulk inserted; nothing is
+    committed. Returns None (session rolled back) if another worker claimed
+    one of the fingerprints meanwhile.
+    """
+    window_start = datetime.utcnow() - timedelta(seconds=settings.dedup_window_seconds)
+    occurrences: "OrderedDict[str, List[int]]" = OrderedDict()
+    for index, (fingerprint, _) in enumerate(alerts):
+        occurrences.setdefault(fingerprint, []).append(index)
+    groups = {group.fingerprint: group for group in get_alert_groups(session, list(occurrences))}
+    first_seen: Dict[str, datetime] = {}
+
+    results: List[Optional[Tuple[Optional[Incident], int, int]]] = [None] * len(alerts)
+    new_entries = []
+    for fingerprint, indexes in occurrences.items():
+        group = groups.get(fingerprint)
+        previous = (group.incident_id, group.last_seen_at) if group is not None else None
+        if group is not None and group.first_seen_at >= window_start:
+            count = attach_duplicate_alert(
+                session, fingerprint, group.incident_id, window_start, count=len(indexes), commit=False
+            )
+            if count is not None:
+                first = count - len(indexes) + 1
+                for offset, index in enumerate(indexes):
+                    results[index] = (None, group.incident_id, first + offset)
+                first_seen[fingerprint] = group.first_seen_at
+                continue
+        new_entries.append((fingerprint, previous, len(indexes) - 1, alerts[indexes[0]][1]))
+
+    incidents = create_grouped_incidents(session, new_entries) if new_entries else []
+    if incidents is None:
+        return None
+    for (fingerprint, _, _, _), incident in zip(new_entries, incidents):
+        indexes = occurrences[fingerprint]
+        results[indexes[0]] = (incident, incident.id, 0)
+        for offset, index in enumerate(indexes[1:], start=1):
+            results[index] = (None, incident.id, offset)
+        first_seen[fingerprint] = incident.created_at
+
+    for fingerprint, indexes in occurrences.items():
+        dedup_index.put(fingerprint, results[indexes[0]][1], first_seen[fingerprint])
+    return results
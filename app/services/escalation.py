@@ -1,28 +1,75 @@
-from typing import Tuple, Optional
+import asyncio
+import logging
+import os
+import socket
+import time
+import weakref
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Tuple
+from uuid import uuid4
+
+from opentelemetry import trace
+from sqlmodel import Session
 
 from app.config import settings
+from app.log import log_context
+from app.models import EscalationStrategy, StartEscalationRequest
 from app.db import (
+    CallJob,
+    Incident,
     get_session,
     create_incident,
-    increment_attempt,
+    create_incidents,
+    advance_attempts,
+    acquire_incident_lease,
+    release_incident_lease,
     log_call_attempt,
     mark_acknowledged,
     get_incident,
+    enqueue_call_job,
+    extend_call_job_lease,
+    complete_call_job,
+    fail_call_job,
+    cancel_pending_call_jobs,
+    mark_call_job_ended,
+    has_active_call_jobs,
 )
-from app.providers.twilio_provider import TwilioProvider
-from app.providers.vonage_provider import VonageProvider
-from app.providers.solapi_provider import SolapiProvider
+from app.providers.routing import ProviderRouter, provider_router
+from app.services.dedup import alert_fingerprint, dedup_index, open_grouped_incident, open_grouped_incidents
+from app.services.metrics import ESCALATION_STEP, observe_provider
+from app.services.policies import PolicyNotFound, PolicyStep, default_policy, policy_cache
+from app.services.tracing import incident_span, record_incident_start, tracer
+
+logger = logging.getLogger(__name__)
 
 
 def _get_provider():
+    """
+    MockProvider for VOICE_PROVIDER=mock, otherwise the failover router.
+
+    A provider that cannot be constructed counts as a failed call in the
+    router instead of silently turning real pages into log lines.
+    """
     from app.providers.base import VoiceProvider
 
     class MockProvider(VoiceProvider):
-        def place_call(self, *, to_number: str, tts_text: str, webhook_base: str, incident_id: int) -> str:
-            print(f"모의 전화 발신 대상: {to_number}")
-            print(f"TTS 메시지: {tts_text}")
-            print(f"웹훅 URL: {webhook_base}/twilio/voice?incident_id={incident_id}")
-            print(f"전화 발신 완료! (실제로는 Mock)")
+        def place_call(
+            self,
+            *,
+            to_number: str,
+            tts_text: str,
+            webhook_base: str,
+            incident_id: int,
+            timeout_seconds: Optional[int] = None,
+        ) -> str:
+            logger.info(
+                "모의 전화 발신: %s (TTS: %s, 웹훅: %s/twilio/voice)",
+                to_number,
+                tts_text,
+                webhook_base,
+                extra={"incident_id": incident_id},
+            )
             return f"mock_call_{incident_id}"
 
         def webhook_path(self) -> str:
@@ -30,60 +77,372 @@ def _get_provider():
 
     if settings.voice_provider == "mock":
         return MockProvider()
-    elif settings.voice_provider == "twilio":
-        try:
-            return TwilioProvider()
-        except Exception as e:
-            print(f"Twilio initialization failed: {e}, using MockProvider")
-            return MockProvider()
-    elif settings.voice_provider == "solapi":
-        try:
-            return SolapiProvider()
-        except Exception as e:
-            print(f"SOLAPI initialization failed: {e}, using MockProvider")
-            return MockProvider()
-    else:
+    # 라우터는 레지스트리에 캐시된 인스턴스를 재사용 (연결 풀 공유)
+    return provider_router
+
+
+# Per-event-loop cap on in-flight provider API calls
+_dial_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _dial_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _dial_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(settings.max_concurrent_dials)
+        _dial_semaphores[loop] = semaphore
+    return semaphore
+
+
+def _observe(provider, operation: str):
+    # 라우터는 실제로 호출한 프로바이더 이름으로 직접 기록
+    if isinstance(provider, ProviderRouter):
+        return nullcontext()
+    return observe_provider(settings.voice_provider, operation)
+
+
+async def _place_call(provider, **kwargs) -> Tuple[str, str]:
+    """Place the call; returns (provider name, call id)."""
+    if isinstance(provider, ProviderRouter):
+        return await provider.place_call_routed(**kwargs)
+    place_call_async = getattr(provider, "place_call_async", None)
+    with _observe(provider, "place_call"):
+        if place_call_async is not None:
+            return settings.voice_provider, await place_call_async(**kwargs)
+        return settings.voice_provider, await asyncio.to_thread(provider.place_call, **kwargs)
+
+
+async def run_call_job(job: CallJob) -> None:
+    """Dial one leased queue job and record the outcome."""
+    attributes = {"callee": job.callee, "job.id": job.id, "job.tries": job.tries}
+    with ESCALATION_STEP.labels("dial").time(), log_context(incident_id=job.incident_id), incident_span(
+        "escalation.dial", job.incident_id, attributes
+    ):
+        await _run_call_job(job)
+
+
+async def _run_call_job(job: CallJob) -> None:
+    provider = _get_provider()
+    call_kwargs = {}
+    if job.ring_timeout_seconds:
+        call_kwargs["timeout_seconds"] = job.ring_timeout_seconds
+    async with _dial_slots():
+        # 슬롯을 기다리는 동안 임대가 만료됐으면 다른 워커가 가져갔을 수 있으므로 발신하지 않음
+        if not await asyncio.to_thread(_extend_lease, job):
+            logger.warning("Lease of call job %s expired before dialing; leaving it to the next claim", job.id)
+            return
         try:
-            return VonageProvider()
+            provider_name, call_id = await _place_call(
+                provider,
+                to_number=job.callee,
+                tts_text=job.tts_text,
+                webhook_base=settings.public_base_url,
+                incident_id=job.incident_id,
+                **call_kwargs,
+            )
         except Exception as e:
-            print(f"Vonage initialization failed: {e}, using MockProvider")
-            return MockProvider()
+            logger.warning("Call placement to %s failed (try %s): %s", job.callee, job.tries, e)
+            await asyncio.to_thread(_fail_job, job, str(e))
+            return
+    logger.info("Call placed to %s via %s", job.callee, provider_name, extra={"call_sid": call_id})
+    trace.get_current_span().set_attributes({"call.sid": call_id, "provider": provider_name})
+    acknowledged = await asyncio.to_thread(_complete_job, job, provider_name, call_id)
+    # 발신 중에 다른 담당자가 이미 응답했다면 방금 건 전화는 바로 취소
+    if acknowledged and call_id:
+        await hang_up_calls([call_id])
 
 
-def _next_callee(attempts: int) -> Tuple[str, str]:
-    # Even attempts -> primary first call, odd -> secondary
-    if attempts % 2 == 0:
-        return settings.primary_contact, "primary"
-    return settings.secondary_contact, "secondary"
+# 아래 DB 작업은 asyncio.to_thread로 실행 (발신/취소마다 이벤트 루프에서 커밋하지 않음)
+def _fail_job(job: CallJob, error: str) -> None:
+    with get_session() as session:
+        gave_up = fail_call_job(
+            session,
+            job.id,
+            job.lease_owner,
+            job.tries,
+            error,
+            max_tries=settings.queue_max_tries,
+            retry_delay=settings.queue_retry_delay_seconds,
+        )
+        if gave_up:
+            log_call_attempt(
+                session,
+                incident_id=job.incident_id,
+                callee=job.callee,
+                provider=settings.voice_provider,
+                result="failed",
+            )
 
 
-def start_escalation(summary: str, tts_text: str) -> dict:
+def _complete_job(job: CallJob, provider_name: str, call_id: str) -> bool:
+    """Record the placed call; True if the incident was acknowledged meanwhile."""
     with get_session() as session:
-        incident = create_incident(session, summary, tts_text)
-        provider = _get_provider()
-        callee, role = _next_callee(incident.attempts)
-        increment_attempt(session, incident.id)
-        call_id = provider.place_call(
-            to_number=callee,
-            tts_text=tts_text,
-            webhook_base=settings.public_base_url,
-            incident_id=incident.id,
-        )
+        if not complete_call_job(session, job.id, job.lease_owner, job.tries, call_id, provider=provider_name, commit=False):
+            logger.warning("Call job %s was claimed again while dialing", job.id, extra={"call_sid": call_id})
         log_call_attempt(
             session,
-            incident_id=incident.id,
-            callee=callee,
-            provider=settings.voice_provider,
+            incident_id=job.incident_id,
+            callee=job.callee,
+            provider=provider_name,
             result="initiated",
+            commit=False,
+        )
+        incident = get_incident(session, job.incident_id)
+        acknowledged = incident is not None and incident.status == "ack"
+        session.commit()
+    return acknowledged
+
+
+def _extend_lease(job: CallJob) -> bool:
+    with get_session() as session:
+        return extend_call_job_lease(
+            session, job.id, job.lease_owner, job.tries, settings.queue_visibility_timeout_seconds
+        )
+
+
+async def hang_up_calls(call_ids: List[str]) -> None:
+    """Cancel calls that are still ringing after someone else answered."""
+    provider = _get_provider()
+    cancel = getattr(provider, "cancel_call_async", None)
+    if cancel is None or not call_ids:
+        return
+
+    async def _cancel(call_id: str) -> None:
+        try:
+            with _observe(provider, "cancel_call"):
+                await cancel(call_id)
+        except Exception as e:
+            logger.warning("Call cancel failed: %s", e, extra={"call_sid": call_id})
+
+    await asyncio.gather(*(_cancel(call_id) for call_id in call_ids))
+    await asyncio.to_thread(_mark_ended, call_ids)
+
+
+def _mark_ended(call_ids: List[str]) -> None:
+    with get_session() as session:
+        for call_id in call_ids:
+            mark_call_job_ended(session, call_id, commit=False)
+        session.commit()
+
+
+def log_status_callback(incident_id: int, provider: str, status: Optional[str]) -> None:
+    """Keep a provider status callback in the call attempt log (audit trail)."""
+    with get_session() as session:
+        log_call_attempt(session, incident_id=incident_id, callee="callback", provider=provider, result=status or "unknown")
+
+
+def _plan_step(
+    session: Session, incident: Incident, tts_text: str
+) -> Optional[Tuple[List[CallJob], List[PolicyStep]]]:
+    """
+    Reserve the next escalation step of the incident's policy and add its call jobs.
+
+    The step is reserved with a compare-and-set on attempts, so returns None
+    if another worker advanced (or someone acknowledged) the incident first.
+    Nothing is committed here.
+    """
+    dialed = _next_callees(incident.policy_id, incident.strategy, incident.attempts)
+    if not dialed:
+        return [], []
+    if not advance_attempts(session, incident.id, expected=incident.attempts, count=len(dialed), commit=False):
+        return None
+    return _add_call_jobs(session, incident, dialed, tts_text), dialed
+
+
+def _next_callees(policy_id: Optional[int], strategy: str, attempts: int) -> List[PolicyStep]:
+    """
+    Callees of the step after attempts dials.
+
+    Sequential incidents dial one callee per step. Parallel and staggered
+    incidents dial the rest of the current round (one pass over a tier) at
+    once.
+    """
+    try:
+        policy = policy_cache.get(policy_id)
+    except PolicyNotFound:
+        # 진행 중인 인시던트의 정책이 삭제됐으면 멈추지 않고 기본(정/부 교대) 정책으로 계속
+        logger.warning("Escalation policy %s no longer exists; using the default policy", policy_id)
+        policy = default_policy()
+    if strategy == EscalationStrategy.sequential.value:
+        steps = [policy.step(attempts)]
+    else:
+        steps = policy.round_steps(attempts)
+    dialed: List[PolicyStep] = []
+    for step in steps:
+        if step is None or attempts + len(dialed) >= settings.max_attempts:
+            break
+        if any(step.phone == other.phone for other in dialed):
+            break  # 같은 번호로 동시에 걸지 않음
+        dialed.append(step)
+    return dialed
+
+
+def _add_call_jobs(session: Session, incident: Incident, dialed: List[PolicyStep], tts_text: str) -> List[CallJob]:
+    """Add one call job per callee; staggered incidents delay each further callee by stagger_seconds."""
+    staggered = incident.strategy == EscalationStrategy.staggered.value
+    jobs: List[CallJob] = []
+    for index, step in enumerate(dialed):
+        delay = step.delay_seconds if index == 0 else 0
+        if staggered:
+            delay += incident.stagger_seconds * index
+        jobs.append(
+            enqueue_call_job(
+                session,
+                incident.id,
+                step.phone,
+                tts_text,
+                delay_seconds=delay,
+                ring_timeout_seconds=step.timeout_seconds,
+                commit=False,
+            )
         )
-        return {"incident_id": incident.id, "call_id": call_id, "to": callee, "role": role}
+    return jobs
+
+
+def _trace_started(result: dict) -> dict:
+    """Emit the root span of a newly created incident (or note the duplicate alert in its trace)."""
+    if result.get("status") == "deduplicated":
+        with incident_span("alert.deduplicated", result["incident_id"], {"duplicates": result["duplicate_count"]}):
+            pass
+    elif result.get("incident_id") is not None:
+        record_incident_start(result["incident_id"], {"status": result.get("status"), "strategy": result.get("strategy")})
+    return result
+
+
+def _step_result(incident: Incident, plan: Optional[Tuple[List[CallJob], List[PolicyStep]]]) -> dict:
+    if plan is None:
+        return {"incident_id": incident.id, "status": "already_advanced"}
+    jobs, dialed = plan
+    if not jobs:
+        return {"status": "max_attempts_reached"}
+    return {
+        "incident_id": incident.id,
+        "job_id": jobs[0].id,
+        "job_ids": [job.id for job in jobs],
+        "to": dialed[0].phone,
+        "role": dialed[0].role,
+        "tier": dialed[0].tier,
+        "strategy": incident.strategy,
+        "status": "dialing",
+    }
+
 
+@ESCALATION_STEP.labels("enqueue").time()
+def _enqueue_step(session: Session, incident: Incident, tts_text: str) -> dict:
+    """Enqueue the incident's next step and commit it together with any pending writes."""
+    plan = _plan_step(session, incident, tts_text)
+    session.flush()
+    result = _step_result(incident, plan)
+    session.commit()
+    return result
 
-def acknowledge_incident(incident_id: int, dtmf: Optional[str] = None) -> None:
+
+def _incident_fields(summary: str, tts_text: str, strategy, stagger_seconds: int, team: Optional[str]) -> dict:
+    """Raises PolicyNotFound for an unknown team."""
+    return dict(
+        summary=summary,
+        tts_text=tts_text,
+        strategy=EscalationStrategy(strategy).value,
+        stagger_seconds=stagger_seconds,
+        policy_id=policy_cache.get_by_name(team).id if team else None,
+    )
+
+
+@tracer.start_as_current_span("escalation.start")
+def start_escalation(
+    summary: str,
+    tts_text: str,
+    strategy: EscalationStrategy = EscalationStrategy.sequential,
+    stagger_seconds: int = 0,
+    team: Optional[str] = None,
+    dedup_key: Optional[str] = None,
+) -> dict:
+    """
+    Create the incident and enqueue its first step in one commit. Raises PolicyNotFound for an unknown team.
+
+    Within settings.dedup_window_seconds an alert with the same fingerprint
+    is counted against the open incident instead of paging again.
+    """
+    fields = _incident_fields(summary, tts_text, strategy, stagger_seconds, team)
     with get_session() as session:
+        if settings.dedup_window_seconds <= 0:
+            incident = create_incident(session, commit=False, **fields)
+            session.flush()
+            return _trace_started(_enqueue_step(session, incident, tts_text))
+        fingerprint = alert_fingerprint(summary, dedup_key, team)
+        incident, incident_id, duplicates = open_grouped_incident(session, fingerprint, commit=False, **fields)
+        if incident is None:
+            return _trace_started({"incident_id": incident_id, "status": "deduplicated", "duplicate_count": duplicates})
+        return _trace_started(_enqueue_step(session, incident, tts_text))
+
+
+@tracer.start_as_current_span("escalation.start_batch")
+def start_escalation_batch(alerts: List[StartEscalationRequest]) -> List[dict]:
+    """
+    Ingest a burst of alerts in a single transaction.
+
+    Incidents (with their first step already counted in attempts), alert
+    groups and first-step call jobs are written as bulk INSERTs with one
+    commit; advance_attempts is only needed for incidents that already
+    exist. Unknown teams raise PolicyNotFound before anything is written.
+    If another worker races the batch for an alert group, it falls back to
+    start_escalation per alert.
+    """
+    fields = [
+        _incident_fields(alert.incident_summary, alert.tts_text, alert.strategy, alert.stagger_seconds, alert.team)
+        for alert in alerts
+    ]
+    # 새 인시던트의 첫 단계는 INSERT에 attempts를 미리 넣어 예약 (행마다 UPDATE+SELECT 하지 않음)
+    first_steps = [_next_callees(f["policy_id"], f["strategy"], 0) for f in fields]
+    for f, dialed in zip(fields, first_steps):
+        f["attempts"] = len(dialed)
+    with get_session() as session:
+        if settings.dedup_window_seconds <= 0:
+            incidents = create_incidents(session, fields)
+            opened = [(incident, incident.id, 0) for incident in incidents]
+        else:
+            opened = open_grouped_incidents(
+                session,
+                [(alert_fingerprint(a.incident_summary, a.dedup_key, a.team), f) for a, f in zip(alerts, fields)],
+            )
+        if opened is not None:
+            planned = [
+                (_add_call_jobs(session, incident, dialed, alert.tts_text), dialed) if incident is not None else None
+                for alert, dialed, (incident, _, _) in zip(alerts, first_steps, opened)
+            ]
+            session.flush()
+            results = [
+                _step_result(incident, plan)
+                if incident is not None
+                else {"incident_id": incident_id, "status": "deduplicated", "duplicate_count": duplicates}
+                for plan, (incident, incident_id, duplicates) in zip(planned, opened)
+            ]
+            session.commit()
+            return [_trace_started(result) for result in results]
+    return [
+        start_escalation(
+            alert.incident_summary,
+            alert.tts_text,
+            strategy=alert.strategy,
+            stagger_seconds=alert.stagger_seconds,
+            team=alert.team,
+            dedup_key=alert.dedup_key,
+        )
+        for alert in alerts
+    ]
+
+
+def acknowledge_incident(incident_id: int, dtmf: Optional[str] = None, call_id: Optional[str] = None) -> List[str]:
+    """
+    Mark the incident acknowledged and stop the rest of its escalation.
+
+    Returns the ids of other calls still ringing, for hang_up_calls.
+    """
+    with incident_span("escalation.acknowledge", incident_id, {"call.sid": call_id}), get_session() as session:
         if get_incident(session, incident_id) is None:
-            return
-        mark_acknowledged(session, incident_id)
+            return []
+        mark_acknowledged(session, incident_id, commit=False)
+        dedup_index.forget_incident(incident_id)
         log_call_attempt(
             session,
             incident_id=incident_id,
@@ -91,30 +450,102 @@ def acknowledge_incident(incident_id: int, dtmf: Optional[str] = None) -> None:
             provider=settings.voice_provider,
             result="ack",
             dtmf=dtmf,
+            commit=False,
         )
+        return [other for other in cancel_pending_call_jobs(session, incident_id) if other != call_id]
+
+
+_LEASE_OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
 
+class IncidentBusy(RuntimeError):
+    """Another worker kept the incident's escalation lease past INCIDENT_LEASE_WAIT_SECONDS."""
 
-def retry_next(incident_id: int, tts_text: str) -> dict:
+
+@contextmanager
+def _incident_lease(incident_id: int) -> Iterator[None]:
+    """
+    Hold the incident's escalation lease across workers and nodes.
+
+    Waits while another owner holds it, but only up to
+    incident_lease_wait_seconds (then IncidentBusy) so a burst of callbacks
+    for one incident cannot fill the blocking thread pool. A lease whose
+    holder died expires after incident_lease_seconds. The attempts
+    compare-and-set in _plan_step still guards a holder that outlives its lease.
+    """
+    owner = f"{_LEASE_OWNER}:{uuid4().hex[:8]}"
+    deadline = time.monotonic() + settings.incident_lease_wait_seconds
     with get_session() as session:
+        while not acquire_incident_lease(session, incident_id, owner, settings.incident_lease_seconds):
+            if get_incident(session, incident_id) is None:
+                break
+            if time.monotonic() >= deadline:
+                raise IncidentBusy(f"incident {incident_id} escalation lease is held by another worker")
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        with get_session() as session:
+            release_incident_lease(session, incident_id, owner)
+
+
+def _next_step(session: Session, incident: Incident, tts_text: str) -> dict:
+    if incident.status == "ack":
+        return {"status": "acknowledged"}
+    if incident.attempts >= settings.max_attempts:
+        return {"status": "max_attempts_reached"}
+    return _enqueue_step(session, incident, tts_text)
+
+
+def retry_next(incident_id: int, tts_text: str, call_id: Optional[str] = None) -> dict:
+    """
+    Escalate to the next step now (manual retry or invalid DTMF input).
+
+    With call_id, a repeated webhook for the same call does not escalate again.
+    If another worker is busy advancing the incident this returns
+    already_advanced; the call's final status callback still runs call_ended.
+    """
+    with incident_span("escalation.retry_next", incident_id, {"call.sid": call_id}):
+        try:
+            with _incident_lease(incident_id), get_session() as session:
+                if call_id and not mark_call_job_ended(session, call_id, commit=False):
+                    return {"status": "duplicate_callback"}
+                incident = get_incident(session, incident_id)
+                if incident is None:
+                    return {"error": "incident_not_found"}
+                result = _next_step(session, incident, tts_text)
+                session.commit()
+                return result
+        except IncidentBusy:
+            logger.warning("Retry skipped: incident escalation lease is busy", extra={"incident_id": incident_id})
+            return {"incident_id": incident_id, "status": "already_advanced"}
+
+
+@ESCALATION_STEP.labels("call_ended").time()
+def call_ended(incident_id: int, call_id: Optional[str]) -> dict:
+    """
+    Handle a finished call: escalate further unless acknowledged.
+
+    For parallel/staggered rounds the next round only starts once every
+    call of the current round has ended. Runs under the incident lease, and
+    a repeated callback for the same call is ignored. Raises IncidentBusy
+    (answered with 503) if the lease stays taken, so the callback is retried.
+    """
+    with incident_span("escalation.call_ended", incident_id, {"call.sid": call_id}), _incident_lease(
+        incident_id
+    ), get_session() as session:
+        if call_id and not mark_call_job_ended(session, call_id, commit=False):
+            return {"status": "duplicate_callback"}
         incident = get_incident(session, incident_id)
         if incident is None:
-            return {"error": "incident_not_found"}
-        if incident.attempts >= settings.max_attempts:
-            return {"status": "max_attempts_reached"}
-        provider = _get_provider()
-        callee, role = _next_callee(incident.attempts)
-        increment_attempt(session, incident.id)
-        call_id = provider.place_call(
-            to_number=callee,
-            tts_text=tts_text,
-            webhook_base=settings.public_base_url,
-            incident_id=incident.id,
-        )
-        log_call_attempt(
-            session,
-            incident_id=incident.id,
-            callee=callee,
-            provider=settings.voice_provider,
-            result="initiated",
-        )
-        return {"incident_id": incident.id, "call_id": call_id, "to": callee, "role": role}
\ No newline at end of file
+            result = {"error": "incident_not_found"}
+        elif incident.status == "ack":
+            result = {"status": "acknowledged"}
+        elif incident.strategy != EscalationStrategy.sequential.value and has_active_call_jobs(
+            session, incident_id, datetime.utcnow() - timedelta(seconds=settings.call_timeout_seconds + 60)
+        ):
+            result = {"status": "round_in_progress"}
+        else:
+            result = _next_step(session, incident, incident.tts_text)
+        session.commit()
+        return result
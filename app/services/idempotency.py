@@ -0,0 +1,111 @@
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.config import settings
+from app.db import (
+    claim_idempotency_key,
+    finish_idempotency_key,
+    get_idempotency_key,
+    get_session,
+    purge_idempotency_keys,
+    release_idempotency_key,
+    save_idempotent_response,
+)
+
+# 이 횟수만큼 새 키를 기록할 때마다 보관 기간이 지난 키를 정리
+PURGE_EVERY = 1000
+
+
+class IdempotencyStore:
+    """
+    Exactly-once gate for webhook deliveries and client requests.
+
+    A bounded LRU answers retries of recently finished keys without a DB
+    round-trip; the IdempotencyKey primary key decides first-seen across
+    workers and restarts. A claimed key is in progress until finish() or
+    save_response(); if that never happens (worker killed, request timed
+    out) its lease_seconds lease lapses and the next retry processes it.
+    Keys older than ttl_seconds are purged.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, lease_seconds: int) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._seen: "OrderedDict[str, Optional[dict]]" = OrderedDict()
+        self._claims = 0
+
+    def claim(self, key: str, done: bool = False) -> bool:
+        """
+        True the first time key is seen (process it, then finish()), False for a retry.
+
+        done=True records the key as processed right away, for handlers with
+        nothing left to run after the claim.
+        """
+        with self._lock:
+            if key in self._seen:
+                self._seen.move_to_end(key)
+                return False
+        with get_session() as session:
+            claimed = claim_idempotency_key(session, key, lease_seconds=None if done else self.lease_seconds)
+            if claimed:
+                self._claims += 1
+                if self._claims % PURGE_EVERY == 0:
+                    purge_idempotency_keys(session, datetime.utcnow() - timedelta(seconds=self.ttl_seconds))
+        if done and claimed:
+            self._remember(key, None)
+        return claimed
+
+    def finish(self, key: str) -> None:
+        """The claimed key's work is committed; later deliveries are duplicates."""
+        with get_session() as session:
+            finish_idempotency_key(session, key)
+        self._remember(key, None)
+
+    def release(self, key: str) -> None:
+        """Undo claim after a failure so the sender's retry is processed."""
+        with self._lock:
+            self._seen.pop(key, None)
+        with get_session() as session:
+            release_idempotency_key(session, key)
+
+    def save_response(self, key: str, response: dict) -> None:
+        with get_session() as session:
+            save_idempotent_response(session, key, json.dumps(response, ensure_ascii=False))
+        self._remember(key, response)
+
+    def response(self, key: str) -> Optional[dict]:
+        """Response stored for key, or None while the first request is still in progress."""
+        with self._lock:
+            response = self._seen.get(key)
+        if response is not None:
+            return response
+        with get_session() as session:
+            entry = get_idempotency_key(session, key)
+            if entry is None or entry.response is None:
+                return None
+            response = json.loads(entry.response)
+        self._remember(key, response)
+        return response
+
+    def clear(self) -> None:
+        with self._lock:
+            self._seen.clear()
+
+    def _remember(self, key: str, response: Optional[dict]) -> None:
+        with self._lock:
+            self._seen[key] = response
+            self._seen.move_to_end(key)
+            while len(self._seen) > self.max_entries:
+                self._seen.popitem(last=False)
+
+
+idempotency_store = IdempotencyStore(
+    max_entries=settings.idempotency_cache_size,
+    ttl_seconds=settings.idempotency_ttl_seconds,
+    lease_seconds=settings.idempotency_lease_seconds,
+)
@@ -0,0 +1,68 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """
+    Measures event loop responsiveness.
+
+    A background task sleeps for a fixed interval and records how late it
+    wakes up. Any blocking call made on the loop (sync DB session, sync
+    provider SDK) shows up directly as lag.
+    """
+
+    def __init__(self, interval: float, warn_threshold: float, window: int = 120) -> None:
+        self.interval = interval
+        self.warn_threshold = warn_threshold
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._max = 0.0
+        self._warnings = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def record(self, lag: float) -> None:
+        self._samples.append(lag)
+        self._max = max(self._max, lag)
+        if lag >= self.warn_threshold:
+            self._warnings += 1
+            logger.warning("Event loop blocked for %.0fms", lag * 1000)
+
+    def stats(self) -> dict:
+        samples = list(self._samples)
+        return {
+            "running": self._task is not None,
+            "interval_ms": round(self.interval * 1000),
+            "samples": len(samples),
+            "last_ms": round(samples[-1] * 1000, 1) if samples else 0.0,
+            "avg_ms": round(sum(samples) / len(samples) * 1000, 1) if samples else 0.0,
+            "window_max_ms": round(max(samples) * 1000, 1) if samples else 0.0,
+            "max_ms": round(self._max * 1000, 1),
+            "warnings": self._warnings,
+        }
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - started - self.interval))
+
+
+loop_monitor = LoopLagMonitor(
+    interval=settings.loop_lag_interval_ms / 1000,
+    warn_threshold=settings.loop_lag_warn_ms / 1000,
+)
@@ -0,0 +1,136 @@
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, List, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from opentelemetry.trace import SpanKind
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.db import on_data_change
+from app.services.tracing import tracer
+
+PROVIDER_LATENCY = Histogram(
+    "provider_api_seconds",
+    "Provider API call latency",
+    ["provider", "operation", "outcome"],
+)
+DB_COMMIT = Histogram(
+    "db_commit_seconds",
+    "Session commit latency including the final flush",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+TWIML_RENDER = Histogram(
+    "twiml_render_seconds",
+    "TwiML render time on cache misses",
+    ["kind"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05),
+)
+SSE_CONNECTIONS = Gauge(
+    "sse_connections",
+    "Open server-sent event streams",
+    ["stream"],
+    multiprocess_mode="livesum",
+)
+ESCALATION_STEP = Histogram(
+    "escalation_step_seconds",
+    "Duration of escalation steps (enqueue: plan + commit, dial: queue job, call_ended: next-step decision)",
+    ["stage"],
+)
+TIME_TO_ACK = Histogram(
+    "time_to_acknowledge_seconds",
+    "Incident creation to acknowledgement",
+    buckets=(5, 10, 15, 30, 45, 60, 90, 120, 180, 300, 600, 1800, 3600),
+)
+PROVIDER_CIRCUIT_OPEN = Gauge(
+    "provider_circuit_open",
+    "1 while the provider's circuit breaker keeps it out of routing",
+    ["provider"],
+    multiprocess_mode="max",
+)
+PROVIDER_FAILOVERS = Counter(
+    "provider_failovers",
+    "Calls placed by a fallback provider after the preferred one failed",
+    ["provider"],
+)
+CALL_ATTEMPTS = Counter(
+    "call_attempts",
+    "Logged call attempts by provider and result",
+    ["provider", "result"],
+)
+
+
+@contextmanager
+def observe_provider(provider: str, operation: str) -> Iterator[None]:
+    """Time one provider API call (histogram and client span); failures are recorded with outcome="error"."""
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        with tracer.start_as_current_span(
+            f"{provider}.{operation}", kind=SpanKind.CLIENT, attributes={"provider": provider}
+        ):
+            yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        PROVIDER_LATENCY.labels(provider, operation, outcome).observe(time.perf_counter() - started)
+
+
+@contextmanager
+def track_sse(stream: str) -> Iterator[None]:
+    SSE_CONNECTIONS.labels(stream).inc()
+    try:
+        yield
+    finally:
+        SSE_CONNECTIONS.labels(stream).dec()
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Exposition for /metrics; aggregates all uvicorn workers when PROMETHEUS_MULTIPROC_DIR is set."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+@event.listens_for(Session, "before_commit")
+def _commit_started(session: Session) -> None:
+    session.info["commit_started"] = time.perf_counter()
+
+
+@event.listens_for(Session, "after_commit")
+def _commit_finished(session: Session) -> None:
+    started = session.info.pop("commit_started", None)
+    if started is not None:
+        DB_COMMIT.observe(time.perf_counter() - started)
+
+
+@event.listens_for(Session, "after_rollback")
+def _commit_abandoned(session: Session) -> None:
+    session.info.pop("commit_started", None)
+
+
+def _observe_changes(events: List[dict]) -> None:
+    for change in events:
+        if change["type"] == "attempt_logged":
+            CALL_ATTEMPTS.labels(change["provider"], change["result"]).inc()
+        elif change["type"] == "incident_acknowledged":
+            created_at = datetime.fromisoformat(change["created_at"])
+            acknowledged_at = datetime.fromisoformat(change["acknowledged_at"])
+            TIME_TO_ACK.observe(max(0.0, (acknowledged_at - created_at).total_seconds()))
+
+
+on_data_change(_observe_changes)
@@ -0,0 +1,164 @@
+import json
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.db import get_session, get_policy, get_policy_by_name, get_policy_tiers
+
+
+class PolicyNotFound(LookupError):
+    pass
+
+
+@dataclass(frozen=True)
+class PolicyStep:
+    name: str
+    phone: str
+    role: str
+    tier: int
+    round_start: int  # 이 단계가 속한 라운드의 첫 단계 인덱스
+    round_end: int  # 라운드의 마지막 단계 다음 인덱스
+    timeout_seconds: Optional[int]
+    delay_seconds: int  # 라운드 시작 전 대기 (라운드 첫 단계에만 적용)
+
+
+@dataclass(frozen=True)
+class CompiledPolicy:
+    """
+    Escalation policy flattened into a step table.
+
+    Each pass over a tier's contacts is one round; step i of the escalation
+    is steps[i % len(steps)], so evaluating the next step is O(1).
+    """
+
+    id: Optional[int]
+    name: str
+    steps: Tuple[PolicyStep, ...]
+    repeat: Optional[int]  # None: 설정의 max_attempts까지 순환
+
+    @property
+    def total_steps(self) -> Optional[int]:
+        return None if self.repeat is None else len(self.steps) * self.repeat
+
+    def step(self, attempt: int) -> Optional[PolicyStep]:
+        if self.total_steps is not None and attempt >= self.total_steps:
+            return None
+        return self.steps[attempt % len(self.steps)]
+
+    def round_steps(self, attempt: int) -> List[PolicyStep]:
+        """Remaining steps of the round that contains the given attempt."""
+        step = self.step(attempt)
+        if step is None:
+            return []
+        offset = attempt % len(self.steps)
+        return list(self.steps[offset:step.round_end])
+
+
+def compile_policy(policy_id: Optional[int], name: str, repeat: Optional[int], tiers: List[dict]) -> CompiledPolicy:
+    steps: List[PolicyStep] = []
+    for tier_index, tier in enumerate(tiers):
+        for _ in range(tier["repeat"]):
+            start = len(steps)
+            end = start + len(tier["contacts"])
+            for position, contact in enumerate(tier["contacts"]):
+                steps.append(
+                    PolicyStep(
+                        name=contact["name"],
+                        phone=contact["phone"],
+                        role=contact.get("role") or f"tier{tier_index + 1}",
+                        tier=tier_index,
+                        round_start=start,
+                        round_end=end,
+                        timeout_seconds=tier.get("timeout_seconds"),
+                        delay_seconds=tier["delay_seconds"] if position == 0 else 0,
+                    )
+                )
+    return CompiledPolicy(id=policy_id, name=name, steps=tuple(steps), repeat=repeat)
+
+
+def default_policy() -> CompiledPolicy:
+    """정담당자/부담당자 교대 (설정 기반, DB 정책이 없는 인시던트용)"""
+    return compile_policy(
+        None,
+        "default",
+        None,
+        [
+            {
+                "contacts": [
+                    {"name": "primary", "phone": settings.primary_contact, "role": "primary"},
+                    {"name": "secondary", "phone": settings.secondary_contact, "role": "secondary"},
+                ],
+                "timeout_seconds": None,
+                "repeat": 1,
+                "delay_seconds": 0,
+            }
+        ],
+    )
+
+
+class PolicyCache:
+    """
+    In-memory cache of compiled policies keyed by id and team name.
+
+    Writes through the policy API invalidate locally; the TTL bounds how long
+    other workers can serve a stale copy.
+    """
+
+    def __init__(self, ttl_seconds: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._by_id: Dict[int, Tuple[float, CompiledPolicy]] = {}
+        self._ids_by_name: Dict[str, int] = {}
+
+    def get(self, policy_id: Optional[int]) -> CompiledPolicy:
+        if policy_id is None:
+            return default_policy()
+        cached = self._by_id.get(policy_id)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl_seconds:
+            return cached[1]
+        compiled = self._load(policy_id)
+        self._by_id[policy_id] = (time.monotonic(), compiled)
+        self._ids_by_name[compiled.name] = policy_id
+        return compiled
+
+    def get_by_name(self, name: str) -> CompiledPolicy:
+        policy_id = self._ids_by_name.get(name)
+        if policy_id is not None:
+            try:
+                return self.get(policy_id)
+            except PolicyNotFound:
+                # 다른 워커가 정책을 삭제(또는 삭제 후 같은 이름으로 재생성)한 경우 이름으로 다시 찾음
+                self.invalidate(policy_id)
+        with get_session() as session:
+            policy = get_policy_by_name(session, name)
+            if policy is None:
+                raise PolicyNotFound(name)
+            policy_id = policy.id
+        return self.get(policy_id)
+
+    def invalidate(self, policy_id: Optional[int] = None) -> None:
+        if policy_id is None:
+            self._by_id.clear()
+            self._ids_by_name.clear()
+            return
+        self._by_id.pop(policy_id, None)
+        self._ids_by_name = {name: pid for name, pid in self._ids_by_name.items() if pid != policy_id}
+
+    def _load(self, policy_id: int) -> CompiledPolicy:
+        with get_session() as session:
+            policy = get_policy(session, policy_id)
+            if policy is None:
+                raise PolicyNotFound(str(policy_id))
+            tiers = [
+                {
+                    "contacts": json.loads(tier.contacts),
+                    "timeout_seconds": tier.timeout_seconds,
+                    "repeat": tier.repeat,
+                    "delay_seconds": tier.delay_seconds,
+                }
+                for tier in get_policy_tiers(session, policy_id)
+            ]
+            return compile_policy(policy.id, policy.name, policy.repeat, tiers)
+
+
+policy_cache = PolicyCache(ttl_seconds=settings.policy_cache_ttl_seconds)
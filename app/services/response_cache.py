@@ -0,0 +1,71 @@
+import hashlib
+import json
+import time
+from typing import Any, Callable, Dict, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.config import settings
+from app.db import on_data_change
+
+
+class ResponseCache:
+    """
+    In-process cache of rendered JSON responses for the admin dashboard.
+
+    An entry is served until its TTL runs out or a write commits in this
+    process (on_data_change), whichever comes first. The TTL bounds how long
+    writes made by other workers stay invisible.
+    """
+
+    def __init__(self, ttl_seconds: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._version = 0
+        self._entries: Dict[str, Tuple[float, int, bytes, str, Dict[str, str]]] = {}
+
+    def invalidate(self) -> None:
+        self._version += 1
+        self._entries.clear()
+
+    def get_or_render(
+        self, key: str, compute: Callable[[Dict[str, str]], Any]
+    ) -> Tuple[bytes, str, Dict[str, str]]:
+        """
+        Return (body, etag, headers) for key, rendering compute(headers) on a miss.
+
+        compute may add response headers (e.g. a pagination cursor) to the dict
+        it receives; they are cached with the body.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic() and entry[1] == self._version:
+            return entry[2], entry[3], entry[4]
+        version = self._version
+        headers: Dict[str, str] = {}
+        body = json.dumps(jsonable_encoder(compute(headers)), ensure_ascii=False).encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        if version == self._version:
+            # 계산 중 쓰기가 커밋됐다면 저장하지 않음
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, version, body, etag, headers)
+        return body, etag, headers
+
+
+admin_cache = ResponseCache(ttl_seconds=settings.admin_cache_ttl_seconds)
+on_data_change(lambda events: admin_cache.invalidate())
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def cached_json(request: Request, key: str, compute: Callable[[Dict[str, str]], Any]) -> Response:
+    """Serve a cached JSON body with an ETag; 304 when the client already has it."""
+    body, etag, extra_headers = admin_cache.get_or_render(key, compute)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", **extra_headers}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
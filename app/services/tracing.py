@@ -0,0 +1,238 @@
+"""
+Tracing across an incident's escalation.
+
+One escalation is spread over many requests and workers: the alert webhook,
+call workers dialing, provider callbacks minutes later and the next dial.
+All spans about an incident join one trace whose trace id and root span id
+are derived from incident_id, so a callback only needs the incident_id that
+is already in its webhook URL to attach itself; no trace context has to be
+stored or sent through the carrier. The root "incident" span is emitted when
+the incident is created, linked to the request span that created it.
+
+Provider API calls (observe_provider), SQL statements and commits become
+child spans, which shows whether time went to the carrier, the DB or our
+code. Spans are exported as JSON lines to TRACE_FILE or to an OTLP/HTTP
+collector; with TRACE_EXPORTER=none the API stays a no-op.
+"""
+
+import contextvars
+import hashlib
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+from opentelemetry import context as otel_context
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SpanExporter
+from opentelemetry.sdk.trace.id_generator import RandomIdGenerator
+from opentelemetry.trace import Link, NonRecordingSpan, SpanContext, Status, StatusCode, TraceFlags
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from app.config import settings
+
+# 인시던트 루트 span을 만드는 동안에만 설정되는 (trace_id, span_id)
+_forced_ids: "contextvars.ContextVar[Optional[Tuple[int, int]]]" = contextvars.ContextVar(
+    "trace_forced_ids", default=None
+)
+_provider: Optional[TracerProvider] = None
+
+
+class _AppTracer(trace.Tracer):
+    """
+    The app's tracer: delegates to the provider installed here.
+
+    Without one it falls back to the global provider (a no-op unless set),
+    so tests can install a provider for a while with recording() and take it
+    away again, which the process-global provider does not allow.
+    """
+
+    def _tracer(self) -> trace.Tracer:
+        return _provider.get_tracer("app") if _provider is not None else trace.get_tracer("app")
+
+    def start_span(self, *args, **kwargs) -> trace.Span:
+        return self._tracer().start_span(*args, **kwargs)
+
+    @contextmanager
+    def start_as_current_span(self, *args, **kwargs) -> Iterator[trace.Span]:
+        with self._tracer().start_as_current_span(*args, **kwargs) as span:
+            yield span
+
+
+tracer = _AppTracer()
+
+
+def incident_trace_ids(incident_id: int) -> Tuple[int, int]:
+    """(trace_id, root span_id) of the incident's trace, the same in every worker."""
+    digest = hashlib.sha256(f"incident:{incident_id}".encode()).digest()
+    return int.from_bytes(digest[:16], "big"), int.from_bytes(digest[16:24], "big")
+
+
+class IncidentIdGenerator(RandomIdGenerator):
+    """Random ids, except for the incident root span being started."""
+
+    def generate_trace_id(self) -> int:
+        forced = _forced_ids.get()
+        return forced[0] if forced else super().generate_trace_id()
+
+    def generate_span_id(self) -> int:
+        forced = _forced_ids.get()
+        return forced[1] if forced else super().generate_span_id()
+
+
+def _attributes(incident_id: Optional[int], attributes: Optional[dict]) -> dict:
+    values = {"incident.id": incident_id, **(attributes or {})}
+    return {key: value for key, value in values.items() if value is not None}
+
+
+def record_incident_start(incident_id: int, attributes: Optional[dict] = None) -> None:
+    """
+    Emit the incident's root span, linked to the current (creating) span.
+
+    It starts with the current span, so it covers writing the incident and
+    its first call jobs.
+    """
+    current = trace.get_current_span()
+    start_time = getattr(current, "start_time", None) or time.time_ns()
+    links = [Link(current.get_span_context())] if current.get_span_context().is_valid else []
+    token = _forced_ids.set(incident_trace_ids(incident_id))
+    try:
+        span = tracer.start_span(
+            "incident",
+            context=otel_context.Context(),
+            start_time=start_time,
+            links=links,
+            attributes=_attributes(incident_id, attributes),
+        )
+    finally:
+        _forced_ids.reset(token)
+    span.end()
+
+
+@contextmanager
+def incident_span(name: str, incident_id: Optional[int], attributes: Optional[dict] = None) -> Iterator[trace.Span]:
+    """
+    Span in the incident's trace.
+
+    Nested under the current span when that is already part of the trace,
+    otherwise a child of the incident root span (e.g. a provider callback).
+    Without an incident_id this is an ordinary span.
+    """
+    parent = None
+    if incident_id is not None:
+        trace_id, root_span_id = incident_trace_ids(incident_id)
+        if trace.get_current_span().get_span_context().trace_id != trace_id:
+            root = SpanContext(trace_id, root_span_id, is_remote=True, trace_flags=TraceFlags(TraceFlags.SAMPLED))
+            parent = trace.set_span_in_context(NonRecordingSpan(root))
+    with tracer.start_as_current_span(name, context=parent, attributes=_attributes(incident_id, attributes)) as span:
+        yield span
+
+
+def _configured_exporter() -> Optional[SpanExporter]:
+    if settings.trace_exporter == "none":
+        return None
+    if settings.trace_exporter == "file":
+        return ConsoleSpanExporter(
+            out=open(settings.trace_file, "a", encoding="utf-8"),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    if settings.trace_exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        return OTLPSpanExporter(endpoint=settings.trace_otlp_endpoint)
+    raise RuntimeError(f"Invalid TRACE_EXPORTER: {settings.trace_exporter}")
+
+
+def _create_provider(exporter: SpanExporter) -> TracerProvider:
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.trace_service_name}),
+        id_generator=IncidentIdGenerator(),
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    return provider
+
+
+def setup_tracing() -> None:
+    """Install the tracer provider for TRACE_EXPORTER, also as the global one (idempotent)."""
+    global _provider
+    if _provider is not None:
+        return
+    exporter = _configured_exporter()
+    if exporter is None:
+        return
+    _provider = _create_provider(exporter)
+    trace.set_tracer_provider(_provider)
+
+
+@contextmanager
+def recording(exporter: SpanExporter) -> Iterator[None]:
+    """Send the app's spans to exporter inside the block only (tests); the global provider is untouched."""
+    global _provider
+    previous, _provider = _provider, _create_provider(exporter)
+    try:
+        yield
+    finally:
+        provider, _provider = _provider, previous
+        provider.shutdown()
+
+
+def force_flush() -> None:
+    if _provider is not None:
+        _provider.force_flush()
+
+
+# SQL 문/커밋은 추적 중인 요청 안에서만 span으로 기록 (워커 폴링 등은 제외)
+@event.listens_for(Engine, "before_cursor_execute")
+def _query_started(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None and trace.get_current_span().is_recording():
+        operation = statement.split(None, 1)[0].upper() if statement else "SQL"
+        context._trace_span = tracer.start_span(
+            f"db.{operation.lower()}",
+            kind=trace.SpanKind.CLIENT,
+            attributes={"db.system": conn.dialect.name, "db.statement": statement[:500]},
+        )
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _query_finished(conn, cursor, statement, parameters, context, executemany) -> None:
+    span = getattr(context, "_trace_span", None)
+    if span is not None:
+        span.end()
+        context._trace_span = None
+
+
+@event.listens_for(Engine, "handle_error")
+def _query_failed(exception_context) -> None:
+    span = getattr(exception_context.execution_context, "_trace_span", None)
+    if span is not None:
+        span.set_status(Status(StatusCode.ERROR, str(exception_context.original_exception)))
+        span.end()
+        exception_context.execution_context._trace_span = None
+
+
+@event.listens_for(Session, "before_commit")
+def _commit_started(session: Session) -> None:
+    if trace.get_current_span().is_recording():
+        span = tracer.start_span("db.commit")
+        session.info["trace_commit"] = (span, otel_context.attach(trace.set_span_in_context(span)))
+
+
+def _end_commit_span(session: Session) -> None:
+    entry = session.info.pop("trace_commit", None)
+    if entry is not None:
+        span, token = entry
+        otel_context.detach(token)
+        span.end()
+
+
+@event.listens_for(Session, "after_commit")
+def _commit_finished(session: Session) -> None:
+    _end_commit_span(session)
+
+
+@event.listens_for(Session, "after_rollback")
+def _commit_abandoned(session: Session) -> None:
+    _end_commit_span(session)
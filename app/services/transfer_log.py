@@ -0,0 +1,62 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from app.config import settings
+from app.db import TransferLog, get_session, get_transfer_log
+
+
+def transfer_log_entry(log: TransferLog) -> dict:
+    return {
+        "call_sid": log.call_sid,
+        "incident_id": log.incident_id,
+        "action": log.action,
+        "transferred": log.transferred,
+        "sms_sent": log.sms_sent,
+        "to_number": log.to_number,
+        "message_sid": log.message_sid,
+        "timestamp": log.created_at.isoformat(),
+    }
+
+
+class TransferLogStore:
+    """
+    Bounded LRU in front of the TransferLog table.
+
+    The table is the source of truth, so records survive restarts and are
+    visible to every worker; misses are not cached because another worker
+    may write the record a moment later.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+
+    def remember(self, entry: dict) -> None:
+        with self._lock:
+            self._entries[entry["call_sid"]] = entry
+            self._entries.move_to_end(entry["call_sid"])
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, call_sid: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(call_sid)
+            if entry is not None:
+                self._entries.move_to_end(call_sid)
+                return entry
+        with get_session() as session:
+            log = get_transfer_log(session, call_sid)
+            if log is None:
+                return None
+            entry = transfer_log_entry(log)
+        self.remember(entry)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+transfer_log_store = TransferLogStore(max_entries=settings.transfer_log_cache_size)
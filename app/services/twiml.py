@@ -0,0 +1,143 @@
+import html
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import quote
+
+from app.config import settings
+from app.db import get_session, get_incident, on_data_change
+from app.services.metrics import TWIML_RENDER
+
+# 템플릿을 바꾸면 올려서 이전 렌더링 결과를 캐시에서 밀어냄
+TEMPLATE_VERSION = 1
+
+_XML_HEADER = "<?xml version='1.0' encoding='UTF-8'?>"
+_KO = 'language="ko-KR" voice="Polly.Seoyeon"'
+_MENU_PROMPT = html.escape("상황근무자 연결은 1번, 장애 문자 전송은 2번을 눌러주세요.")
+
+# 고정 문구는 미리 이스케이프해 둔 채로 조립하고, 자리표시자에는 이스케이프된 값만 넣음
+VOICE_TEMPLATE = (
+    f"{_XML_HEADER}<Response>"
+    f"<Say {_KO}>{{message}}</Say><Pause length=\"1\"/>"
+    f"<Say {_KO}>{{message}}</Say><Pause length=\"1\"/>"
+    f"<Say {_KO}>{html.escape('메시지 전달이 완료되었습니다. 감사합니다.')}</Say>"
+    "<Hangup/></Response>"
+)
+
+GATHER_TEMPLATE = (
+    '<?xml version="1.0" encoding="UTF-8"?><Response>'
+    '<Say language="ko-KR">{message}</Say><Pause length="1"/>'
+    f'<Say language="ko-KR">{_MENU_PROMPT}</Say><Pause length="1"/>'
+    '<Gather action="{action_url}" method="POST" numDigits="1" timeout="10">'
+    '<Say language="ko-KR">{message}</Say><Pause length="1"/>'
+    f'<Say language="ko-KR">{_MENU_PROMPT}</Say>'
+    "</Gather><Hangup/></Response>"
+)
+
+ACK_TWIML = f'{_XML_HEADER}<Response><Say language="en-US">Confirmation received. Thank you.</Say><Hangup/></Response>'
+INVALID_INPUT_TWIML = f'{_XML_HEADER}<Response><Say language="en-US">Invalid input. Ending call.</Say><Hangup/></Response>'
+
+DEFAULT_VOICE_TEXT = "긴급 알림입니다."
+DEFAULT_GATHER_TEXT = "장애가 발생했습니다."
+
+
+class TwimlRenderer:
+    """
+    Renders call TwiML from precompiled templates with an LRU of finished documents.
+
+    Documents are keyed by (kind, incident_id, contact_name, TEMPLATE_VERSION);
+    incident texts are cached too, so Twilio's refetches on redirects and
+    retries are served without a DB round-trip. Texts arrive with the
+    incident_created change event; remember_text drops stale documents when an
+    incident's text changes.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._documents: "OrderedDict[Tuple, str]" = OrderedDict()
+        self._texts: "OrderedDict[int, str]" = OrderedDict()
+        self._keys_by_incident: Dict[int, Set[Tuple]] = {}
+
+    def remember_text(self, incident_id: int, text: str) -> None:
+        with self._lock:
+            if self._texts.get(incident_id) != text:
+                for key in self._keys_by_incident.pop(incident_id, ()):
+                    self._documents.pop(key, None)
+            self._texts[incident_id] = text
+            self._texts.move_to_end(incident_id)
+            while len(self._texts) > self.max_entries:
+                old_id, _ = self._texts.popitem(last=False)
+                for key in self._keys_by_incident.pop(old_id, ()):
+                    self._documents.pop(key, None)
+
+    def incident_text(self, incident_id: int) -> Optional[str]:
+        """Incident TTS text, from cache or (once) from the DB; None if unknown."""
+        with self._lock:
+            text = self._texts.get(incident_id)
+        if text is not None:
+            return text
+        with get_session() as session:
+            inc = get_incident(session, incident_id)
+            if inc is None:
+                return None
+            text = inc.tts_text
+        self.remember_text(incident_id, text)
+        return text
+
+    def voice(self, incident_id: int, text: Optional[str] = None) -> str:
+        """/twilio/voice: message twice, then a closing line."""
+        if text:
+            # 요청마다 다른 임의 문구는 캐시하지 않음
+            with TWIML_RENDER.labels("voice").time():
+                return VOICE_TEMPLATE.format(message=html.escape(text))
+        return self._cached(
+            ("voice", incident_id, None, TEMPLATE_VERSION),
+            lambda: VOICE_TEMPLATE.format(message=html.escape(self.incident_text(incident_id) or DEFAULT_VOICE_TEXT)),
+        )
+
+    def gather(self, incident_id: int, contact_name: Optional[str] = None) -> str:
+        """Simulator call: message + DTMF menu (1: 호전환, 2: 문자), repeated with Gather."""
+
+        def render() -> str:
+            message = self.incident_text(incident_id) or DEFAULT_GATHER_TEXT
+            if contact_name:
+                message = f"{contact_name} 담당자님, {message}"
+            action_url = f"{settings.public_base_url}/twilio/transfer?incident_id={incident_id}"
+            if contact_name:
+                action_url += f"&contact_name={quote(contact_name)}"
+            return GATHER_TEMPLATE.format(message=html.escape(message), action_url=html.escape(action_url))
+
+        return self._cached(("gather", incident_id, contact_name, TEMPLATE_VERSION), render)
+
+    def _cached(self, key: Tuple, render) -> str:
+        with self._lock:
+            document = self._documents.get(key)
+            if document is not None:
+                self._documents.move_to_end(key)
+                return document
+        with TWIML_RENDER.labels(key[0]).time():
+            document = render()
+        with self._lock:
+            self._documents[key] = document
+            self._keys_by_incident.setdefault(key[1], set()).add(key)
+            while len(self._documents) > self.max_entries:
+                old_key, _ = self._documents.popitem(last=False)
+                keys = self._keys_by_incident.get(old_key[1])
+                if keys is not None:
+                    keys.discard(old_key)
+                    if not keys:
+                        del self._keys_by_incident[old_key[1]]
+        return document
+
+
+twiml_renderer = TwimlRenderer(max_entries=settings.twiml_cache_size)
+
+
+def _remember_new_incidents(events: List[dict]) -> None:
+    for event in events:
+        if event["type"] == "incident_created":
+            twiml_renderer.remember_text(event["incident_id"], event["tts_text"])
+
+
+on_data_change(_remember_new_incidents)
@@ -0,0 +1,187 @@
+"""
+로컬 가짜 전화 프로바이더 (부하 테스트용)
+
+Twilio / SOLAPI REST API 일부를 흉내 내고, 실제 통화처럼 오케스트레이터에
+상태/DTMF 콜백을 보냅니다. 지연, 응답률, API 실패율을 설정할 수 있습니다.
+
+    Twilio  POST /2010-04-01/Accounts/{sid}/Calls.json          발신
+            POST /2010-04-01/Accounts/{sid}/Calls/{call}.json   취소(Status=canceled|completed)
+            GET  /2010-04-01/Accounts/{sid}/Calls/{call}.json   조회
+    SOLAPI  POST /messages/v4/send-many/detail                  음성 메시지 발신
+
+통화 흐름 (Twilio, 실제 StatusCallbackEvent 순서):
+    응답   initiated → ringing → (TwiML 조회) in-progress → completed(CallDuration>0)
+    미응답 initiated → ringing → no-answer | busy (CallDuration=0)
+    취소   울리는 중 취소되면 canceled, 통화 중 끊기면 completed
+/twilio/voice TwiML에는 Gather가 없으므로 승인은 in-progress 상태 콜백으로 이루어짐
+"""
+
+import asyncio
+import random
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+from fastapi import FastAPI, Request, Response
+
+
+@dataclass
+class FakeProviderConfig:
+    api_latency_ms: int = 50  # 발신 API 응답 지연
+    ring_ms: int = 500  # 울림 시작부터 응답/미응답 결정까지
+    callback_latency_ms: int = 20  # 콜백 전송 전 지연 (네트워크)
+    answer_rate: float = 0.7  # 통화 응답 확률
+    busy_rate: float = 0.3  # 미응답 중 busy(나머지는 no-answer) 비율
+    talk_ms: int = 1000  # 응답 후 통화 종료(completed)까지
+    failure_rate: float = 0.0  # 발신 API 503 응답 확률
+    seed: Optional[int] = None
+    orchestrator_url: str = "http://127.0.0.1:8000"  # SOLAPI 웹훅 전송 대상
+
+
+@dataclass
+class FakeProviderStats:
+    """Timestamps are time.monotonic() in the harness process."""
+
+    first_dial_at: Dict[int, float] = field(default_factory=dict)
+    acked_at: Dict[int, float] = field(default_factory=dict)
+    dials: int = 0
+    api_failures: int = 0
+    callbacks: int = 0
+    callback_errors: int = 0
+    callback_latencies: List[float] = field(default_factory=list)
+    last_activity: float = field(default_factory=time.monotonic)
+
+
+def _incident_id(url: str) -> Optional[int]:
+    values = parse_qs(urlparse(url).query).get("incident_id")
+    try:
+        return int(values[0]) if values else None
+    except ValueError:
+        return None
+
+
+def create_fake_provider(config: FakeProviderConfig, stats: FakeProviderStats) -> FastAPI:
+    rng = random.Random(config.seed)
+    canceled: set = set()
+    calls: Dict[str, dict] = {}
+    tasks: set = set()
+    client = httpx.AsyncClient(timeout=30)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        for task in list(tasks):
+            task.cancel()
+        await client.aclose()
+
+    app = FastAPI(title="Fake telephony provider", lifespan=lifespan)
+
+    async def callback(method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        await asyncio.sleep(config.callback_latency_ms / 1000)
+        started = time.monotonic()
+        try:
+            response = await client.request(method, url, **kwargs)
+            response.raise_for_status()
+            return response
+        except httpx.HTTPError:
+            stats.callback_errors += 1
+            return None
+        finally:
+            stats.callbacks += 1
+            stats.callback_latencies.append(time.monotonic() - started)
+            stats.last_activity = time.monotonic()
+
+    def record_dial(incident_id: Optional[int]) -> None:
+        stats.dials += 1
+        stats.last_activity = time.monotonic()
+        if incident_id is not None:
+            stats.first_dial_at.setdefault(incident_id, time.monotonic())
+
+    def spawn(coro) -> None:
+        task = asyncio.create_task(coro)
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    async def api_delay() -> bool:
+        """Simulated API latency; False when this request should fail."""
+        await asyncio.sleep(config.api_latency_ms / 1000)
+        if rng.random() < config.failure_rate:
+            stats.api_failures += 1
+            return False
+        return True
+
+    async def twilio_call(sid: str, twiml_url: str, status_url: str, incident_id: Optional[int]) -> None:
+        for status in ("initiated", "ringing"):
+            await callback("POST", status_url, data={"CallSid": sid, "CallStatus": status})
+        await asyncio.sleep(config.ring_ms / 1000)
+        if sid in canceled:
+            # 울리는 중 오케스트레이터가 취소(다른 담당자 응답)
+            status, duration = "canceled", 0
+        elif rng.random() < config.answer_rate:
+            calls[sid]["status"] = "in-progress"
+            answered_at = time.monotonic()
+            await callback("GET", twiml_url)
+            # 오케스트레이터는 in-progress(받음) 수신 시 승인하고 나머지 통화를 취소
+            if await callback("POST", status_url, data={"CallSid": sid, "CallStatus": "in-progress"}) is not None:
+                if incident_id is not None:
+                    stats.acked_at.setdefault(incident_id, time.monotonic())
+            await asyncio.sleep(config.talk_ms / 1000)
+            status, duration = "completed", max(1, round(time.monotonic() - answered_at))
+        else:
+            # 미응답 종료: 오케스트레이터는 이 상태를 받으면 다음 단계로 넘어감
+            status, duration = ("busy" if rng.random() < config.busy_rate else "no-answer"), 0
+        calls[sid]["status"] = status
+        await callback("POST", status_url, data={"CallSid": sid, "CallStatus": status, "CallDuration": str(duration)})
+
+    @app.post("/2010-04-01/Accounts/{account_sid}/Calls.json")
+    async def twilio_create_call(account_sid: str, request: Request):
+        form = await request.form()
+        if not await api_delay():
+            return Response(status_code=503, content='{"message": "Service Unavailable"}')
+        sid = f"CA{uuid.uuid4().hex}"
+        status_url = form.get("StatusCallback", "")
+        incident_id = _incident_id(status_url)
+        calls[sid] = {"sid": sid, "to": form.get("To"), "from": form.get("From"), "status": "queued"}
+        record_dial(incident_id)
+        spawn(twilio_call(sid, form.get("Url", ""), status_url, incident_id))
+        return {**calls[sid], "account_sid": account_sid}
+
+    @app.post("/2010-04-01/Accounts/{account_sid}/Calls/{sid}.json")
+    async def twilio_update_call(account_sid: str, sid: str, request: Request):
+        form = await request.form()
+        if sid not in calls:
+            return Response(status_code=404, content='{"message": "Not Found"}')
+        if form.get("Status") in ("canceled", "completed"):
+            canceled.add(sid)
+            calls[sid]["status"] = form.get("Status")
+        return {**calls[sid], "account_sid": account_sid}
+
+    @app.get("/2010-04-01/Accounts/{account_sid}/Calls/{sid}.json")
+    async def twilio_fetch_call(account_sid: str, sid: str):
+        if sid not in calls:
+            return Response(status_code=404, content='{"message": "Not Found"}')
+        return {**calls[sid], "account_sid": account_sid}
+
+    async def solapi_message(message_id: str) -> None:
+        webhook_url = f"{config.orchestrator_url}/solapi/webhook"
+        await callback("POST", webhook_url, json={"messageId": message_id, "status": "SENDING"})
+        await asyncio.sleep(config.ring_ms / 1000)
+        await callback("POST", webhook_url, json={"messageId": message_id, "status": "COMPLETE"})
+
+    @app.post("/messages/v4/send-many/detail")
+    async def solapi_send(request: Request):
+        body = await request.json()
+        if not await api_delay():
+            return Response(status_code=503, content='{"errorMessage": "Service Unavailable"}')
+        # SOLAPI 요청에는 incident_id가 없으므로 수신번호 단위로만 집계
+        record_dial(None)
+        message_id = f"M4V{uuid.uuid4().hex[:20].upper()}"
+        to_number = body["messages"][0]["to"]
+        spawn(solapi_message(message_id))
+        return {"messageId": message_id, "to": to_number, "statusCode": "2000"}
+
+    return app
@@ -0,0 +1,267 @@
+"""
+오케스트레이터 부하 테스트
+
+가짜 프로바이더(bench/fake_provider.py)를 띄우고, 그 주소를 바라보는 오케스트레이터를
+별도 프로세스로 실행한 뒤 N건의 알림을 동시에 보내 지연 분포를 측정합니다.
+
+    python -m bench.run --alerts 200 --concurrency 50
+    python -m bench.run --alerts 500 --answer-rate 0.5 --failure-rate 0.05 --json bench/result.json
+    python -m bench.run --budget time_to_dial.p95=500 --budget time_to_ack.p99=5000   # 초과 시 exit 1
+
+측정 항목 (ms, p50/p95/p99)
+  alert_write    /webhook/start 응답 시간 (인시던트 + 발신 작업 DB 커밋)
+  time_to_dial   알림 전송 → 프로바이더 발신 API 수신
+  time_to_ack    알림 전송 → 1번 입력 처리 완료 (응답한 인시던트만)
+  callback       오케스트레이터의 상태/DTMF 콜백 처리 시간
+그 외 callbacks/sec, 발신 수, API 실패 수, 이벤트 루프 최대 지연(/healthz/loop)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import uvicorn
+
+from bench.fake_provider import FakeProviderConfig, FakeProviderStats, create_fake_provider
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile (None for no samples)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(seconds: List[float]) -> dict:
+    ms = [value * 1000 for value in seconds]
+    return {
+        "count": len(ms),
+        "p50": percentile(ms, 50),
+        "p95": percentile(ms, 95),
+        "p99": percentile(ms, 99),
+        "max": max(ms) if ms else None,
+    }
+
+
+def _start_fake_provider(config: FakeProviderConfig, stats: FakeProviderStats, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(
+        uvicorn.Config(create_fake_provider(config, stats), host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def _start_orchestrator(args, provider_url: str) -> subprocess.Popen:
+    db_path = ROOT / "bench" / "bench.db"
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+    env = {
+        **os.environ,
+        "VOICE_PROVIDER": args.provider,
+        "TWILIO_API_BASE_URL": provider_url,
+        "SOLAPI_API_BASE_URL": provider_url,
+        "PUBLIC_BASE_URL": args.app_url,
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "DEDUP_WINDOW_SECONDS": "0",
+        "PRIMARY_CONTACT": "+821000000001",
+        "SECONDARY_CONTACT": "+821000000002",
+    }
+    port = args.app_url.rsplit(":", 1)[-1].rstrip("/")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", port,
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL if args.quiet else None,
+    )
+
+
+async def _wait_ready(client: httpx.AsyncClient, url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(f"{url}/healthz")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"orchestrator did not become ready at {url}")
+
+
+async def _drive(args, stats: FakeProviderStats) -> dict:
+    sent_at: Dict[int, float] = {}
+    write_latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(args.concurrency)
+    limits = httpx.Limits(max_connections=args.concurrency + 10)
+
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        await _wait_ready(client, args.app_url)
+
+        async def send(index: int) -> None:
+            nonlocal errors
+            async with semaphore:
+                started = time.monotonic()
+                try:
+                    response = await client.post(
+                        f"{args.app_url}/webhook/start",
+                        json={"incident_summary": f"부하 테스트 #{index}", "tts_text": f"부하 테스트 알림 {index}"},
+                    )
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    return
+                write_latencies.append(time.monotonic() - started)
+                incident_id = response.json().get("incident_id")
+                if incident_id is not None:
+                    sent_at[incident_id] = started
+
+        run_started = time.monotonic()
+        await asyncio.gather(*(send(index) for index in range(args.alerts)))
+
+        # 모든 인시던트가 승인되거나, 콜백이 args.idle_seconds 동안 멈출 때까지 대기
+        deadline = run_started + args.timeout
+        while time.monotonic() < deadline:
+            if sent_at and all(incident_id in stats.acked_at for incident_id in sent_at):
+                break
+            if time.monotonic() - stats.last_activity > args.idle_seconds:
+                break
+            await asyncio.sleep(0.2)
+        elapsed = time.monotonic() - run_started
+
+        loop_stats = {}
+        try:
+            loop_stats = (await client.get(f"{args.app_url}/healthz/loop")).json()
+        except (httpx.HTTPError, ValueError):
+            pass
+
+    dial = [stats.first_dial_at[i] - t for i, t in sent_at.items() if i in stats.first_dial_at]
+    ack = [stats.acked_at[i] - t for i, t in sent_at.items() if i in stats.acked_at]
+    return {
+        "config": {
+            "alerts": args.alerts,
+            "concurrency": args.concurrency,
+            "workers": args.workers,
+            "provider": args.provider,
+            "answer_rate": args.answer_rate,
+            "failure_rate": args.failure_rate,
+            "api_latency_ms": args.api_latency_ms,
+            "ring_ms": args.ring_ms,
+        },
+        "elapsed_seconds": round(elapsed, 2),
+        "alerts_accepted": len(sent_at),
+        "alert_errors": errors,
+        "incidents_acked": len(ack),
+        "dials": stats.dials,
+        "api_failures": stats.api_failures,
+        "callbacks": stats.callbacks,
+        "callback_errors": stats.callback_errors,
+        "callbacks_per_second": round(stats.callbacks / elapsed, 1) if elapsed else 0.0,
+        "alert_write": summarize(write_latencies),
+        "time_to_dial": summarize(dial),
+        "time_to_ack": summarize(ack),
+        "callback": summarize(stats.callback_latencies),
+        "loop_max_lag_ms": loop_stats.get("max_ms"),
+    }
+
+
+def _print_report(result: dict) -> None:
+    print(f"\n=== 부하 테스트 결과 ({result['elapsed_seconds']}s) ===")
+    print(
+        f"알림 {result['alerts_accepted']}건 (오류 {result['alert_errors']}) / 승인 {result['incidents_acked']}건 / "
+        f"발신 {result['dials']}건 (API 실패 {result['api_failures']}) / "
+        f"콜백 {result['callbacks']}건 (오류 {result['callback_errors']}, {result['callbacks_per_second']}/s)"
+    )
+    print(f"{'metric':<14}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for name in ("alert_write", "time_to_dial", "time_to_ack", "callback"):
+        row = result[name]
+        cells = "".join(f"{row[key]:>10.1f}" if row[key] is not None else f"{'-':>10}" for key in ("p50", "p95", "p99", "max"))
+        print(f"{name:<14}{row['count']:>7}{cells}")
+    if result["loop_max_lag_ms"] is not None:
+        print(f"event loop max lag: {result['loop_max_lag_ms']}ms")
+
+
+def _check_budgets(result: dict, budgets: List[str]) -> List[str]:
+    """Budgets look like time_to_dial.p95=500 (ms); returns the violations."""
+    violations = []
+    for budget in budgets:
+        name, limit = budget.split("=", 1)
+        metric, stat = name.split(".", 1)
+        value = result[metric][stat]
+        if value is None or value > float(limit):
+            violations.append(f"{name}={value} > {limit}")
+    return violations
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Call orchestrator load test with a local fake provider")
+    parser.add_argument("--alerts", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the orchestrator")
+    parser.add_argument("--provider", choices=["twilio", "solapi"], default="twilio")
+    parser.add_argument("--app-url", default="http://127.0.0.1:8100")
+    parser.add_argument("--provider-port", type=int, default=9100)
+    parser.add_argument("--external-app", action="store_true",
+                        help="use an already running orchestrator at --app-url (configure its *_API_BASE_URL yourself)")
+    parser.add_argument("--api-latency-ms", type=int, default=50)
+    parser.add_argument("--ring-ms", type=int, default=500)
+    parser.add_argument("--callback-latency-ms", type=int, default=20)
+    parser.add_argument("--answer-rate", type=float, default=0.7)
+    parser.add_argument("--busy-rate", type=float, default=0.3, help="share of unanswered calls reported as busy")
+    parser.add_argument("--talk-ms", type=int, default=1000)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=120, help="max seconds for the whole run")
+    parser.add_argument("--idle-seconds", type=float, default=5, help="stop once no callback arrived for this long")
+    parser.add_argument("--json", dest="json_path", help="write the result as JSON to this file")
+    parser.add_argument("--budget", action="append", default=[], help="e.g. time_to_dial.p95=500 (ms); exit 1 if exceeded")
+    parser.add_argument("--quiet", action="store_true", help="hide orchestrator output")
+    args = parser.parse_args(argv)
+
+    config = FakeProviderConfig(
+        api_latency_ms=args.api_latency_ms,
+        ring_ms=args.ring_ms,
+        callback_latency_ms=args.callback_latency_ms,
+        answer_rate=args.answer_rate,
+        busy_rate=args.busy_rate,
+        talk_ms=args.talk_ms,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+        orchestrator_url=args.app_url,
+    )
+    stats = FakeProviderStats()
+    provider = _start_fake_provider(config, stats, args.provider_port)
+    orchestrator = None if args.external_app else _start_orchestrator(args, f"http://127.0.0.1:{args.provider_port}")
+    try:
+        result = asyncio.run(_drive(args, stats))
+    finally:
+        if orchestrator is not None:
+            orchestrator.terminate()
+            orchestrator.wait(timeout=30)
+        provider.should_exit = True
+
+    _print_report(result)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(result, ensure_ascii=False, indent=2))
+    violations = _check_budgets(result, args.budget)
+    for violation in violations:
+        print(f"BUDGET EXCEEDED: {violation}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
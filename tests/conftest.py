@@ -0,0 +1,27 @@
+import os
+import tempfile
+
+import pytest
+
+# 테스트 실행마다 새 임시 SQLite DB 사용 (작업 트리의 ./orchestrator.db를 공유하지 않음).
+# app 모듈을 import할 때 엔진이 만들어지므로 테스트 모듈이 수집되기 전에 지정
+_db_dir = tempfile.TemporaryDirectory(prefix="orchestrator-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir.name}/orchestrator.db"
+
+
+class DummyProvider:
+    def place_call(self, **kwargs) -> str:
+        return "dummy-call-id"
+
+    def webhook_path(self) -> str:
+        return "/dummy"
+
+
+@pytest.fixture
+def dummy_provider(monkeypatch) -> DummyProvider:
+    """Escalation dials go to a provider that always succeeds."""
+    from app.services import escalation
+
+    provider = DummyProvider()
+    monkeypatch.setattr(escalation, "_get_provider", lambda: provider)
+    return provider
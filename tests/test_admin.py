@@ -0,0 +1,139 @@
+from fastapi.testclient import TestClient
+
+from app.db import Incident, get_session, create_incident, log_call_attempt, mark_acknowledged
+from app.main import app
+
+
+client = TestClient(app)
+
+
+def test_recent_incidents_keyset_pagination():
+    with get_session() as session:
+        ids = []
+        for i in range(3):
+            incident = create_incident(session, f"페이지 테스트 {i}", "tts")
+            log_call_attempt(session, incident_id=incident.id, callee="+8210", provider="mock", result="initiated")
+            ids.append(incident.id)
+
+    first = client.get("/admin/recent-incidents?limit=2")
+    assert first.status_code == 200
+    cursor = first.headers["X-Next-Cursor"]
+    page1 = first.json()
+    assert [inc["id"] for inc in page1] == [ids[2], ids[1]]
+    assert page1[0]["calls"][0]["result"] == "initiated"
+
+    second = client.get(f"/admin/recent-incidents?limit=2&cursor={cursor}")
+    page2 = second.json()
+    assert page2[0]["id"] == ids[0]
+    assert not {inc["id"] for inc in page1} & {inc["id"] for inc in page2}
+
+    assert client.get("/admin/recent-incidents?cursor=broken").status_code == 400
+
+
+def test_stats_counters_follow_writes_and_match_rebuild():
+    before = client.get("/admin/stats").json()
+    providers_before = client.get("/admin/provider-stats").json().get("counter-test", {"total": 0, "successful": 0})
+    with get_session() as session:
+        incident = create_incident(session, "카운터 테스트", "tts")
+        log_call_attempt(session, incident_id=incident.id, callee="+8210", provider="counter-test", result="no_answer")
+        log_call_attempt(
+            session, incident_id=incident.id, callee="+8210", provider="counter-test", result="ack", dtmf="1", duration_sec=12
+        )
+        mark_acknowledged(session, incident.id)
+        mark_acknowledged(session, incident.id)  # 두 번째 ack은 집계하지 않음
+
+    after = client.get("/admin/stats").json()
+    assert after["total_incidents"] == before["total_incidents"] + 1
+    assert after["today_incidents"] == before["today_incidents"] + 1
+    assert after["acknowledged_incidents"] == before["acknowledged_incidents"] + 1
+    assert after["total_calls"] == before["total_calls"] + 2
+    assert after["successful_calls"] == before["successful_calls"] + 1
+    assert after["dtmf_transfer_count"] == before["dtmf_transfer_count"] + 1
+    providers = client.get("/admin/provider-stats").json()["counter-test"]
+    assert providers["total"] == providers_before["total"] + 2
+    assert providers["successful"] == providers_before["successful"] + 1
+
+    assert client.post("/admin/stats/rebuild").status_code == 200
+    assert client.get("/admin/stats").json() == after
+
+
+def test_concurrent_acks_are_counted_once():
+    from app.db import get_counters
+
+    with get_session() as session:
+        incident_id = create_incident(session, "동시 승인", "tts").id
+        before = get_counters(session, names=["incidents:ack"]).get("incidents:ack", 0)
+
+    # 두 워커가 같은 인시던트를 각자 "new"로 읽은 뒤 거의 동시에 승인
+    with get_session() as first, get_session() as second:
+        assert first.get(Incident, incident_id).status == "new"
+        assert second.get(Incident, incident_id).status == "new"
+        assert mark_acknowledged(first, incident_id)
+        assert not mark_acknowledged(second, incident_id)
+        assert get_counters(second, names=["incidents:ack"])["incidents:ack"] == before + 1
+
+
+def test_rollup_buckets_use_kst_days():
+    from datetime import datetime
+
+    from app.db import rollup_bucket
+
+    # 2025-10-17 14:59 UTC = 23:59 KST → KST 10/17 (UTC 10/16 15:00 시작)
+    assert rollup_bucket("day", datetime(2025, 10, 17, 14, 59)) == datetime(2025, 10, 16, 15, 0)
+    assert rollup_bucket("day", datetime(2025, 10, 17, 15, 0)) == datetime(2025, 10, 17, 15, 0)
+    assert rollup_bucket("hour", datetime(2025, 10, 17, 14, 59, 30)) == datetime(2025, 10, 17, 14, 0)
+
+
+def test_traffic_rollups_follow_writes_and_match_rebuild():
+    from datetime import datetime
+
+    from app.db import KST_OFFSET, rollup_bucket
+
+    # 자정(KST) 무렵이나 이전 데이터가 없어도 되도록 오늘 버킷을 명시적으로 찾음
+    bucket = rollup_bucket("day", datetime.utcnow())
+    day = (bucket + KST_OFFSET).date().isoformat()
+    traffic_url = f"/admin/traffic?granularity=day&start={day}&end={day}"
+
+    def today_bucket(buckets: list) -> dict:
+        found = [item for item in buckets if item["bucket_start"] == bucket.isoformat()]
+        return found[0] if found else {"incidents": 0, "calls": 0, "results": {}}
+
+    before_today = today_bucket(client.get(traffic_url).json())
+    with get_session() as session:
+        incident = create_incident(session, "롤업 테스트", "tts")
+        log_call_attempt(session, incident_id=incident.id, callee="+8210", provider="rollup-test", result="no_answer")
+        mark_acknowledged(session, incident.id)
+        assert rollup_bucket("day", incident.created_at) == bucket
+
+    days = client.get(traffic_url).json()
+    today = today_bucket(days)
+    assert today["incidents"] == before_today["incidents"] + 1
+    assert today["calls"] == before_today["calls"] + 1
+    assert today["results"]["no_answer"] == before_today["results"].get("no_answer", 0) + 1
+    assert today["providers"]["rollup-test"] >= 1
+    assert today["avg_ack_seconds"] is not None
+    hours = client.get(f"/admin/traffic?granularity=hour&start={day}&end={day}").json()
+    assert sum(item["incidents"] for item in hours) == today["incidents"]
+    assert client.get("/admin/hourly-traffic").json()[-1]["count"] >= 1
+
+    assert client.post("/admin/stats/rebuild").status_code == 200
+    assert client.get(traffic_url).json() == days
+    assert client.get("/admin/traffic?granularity=hour&start=2024-01-01&end=2024-12-31").status_code == 400
+
+
+def test_admin_responses_are_cached_with_etag_until_a_write():
+    first = client.get("/admin/stats")
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    again = client.get("/admin/stats", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+
+    with get_session() as session:
+        create_incident(session, "캐시 무효화 테스트", "tts")
+
+    changed = client.get("/admin/stats", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["total_incidents"] == first.json()["total_incidents"] + 1
+    assert changed.headers["ETag"] != etag
@@ -0,0 +1,53 @@
+import asyncio
+
+from app.db import get_session, create_incident, log_call_attempt, mark_acknowledged
+from app.services.admin_events import EventBus, admin_event_bus
+
+
+def _write_incident_flow() -> int:
+    with get_session() as session:
+        incident = create_incident(session, "SSE 테스트", "tts")
+        log_call_attempt(session, incident_id=incident.id, callee="+8210", provider="mock", result="initiated")
+        mark_acknowledged(session, incident.id)
+        return incident.id
+
+
+def test_committed_writes_are_published_to_subscribers():
+    async def scenario():
+        queue = admin_event_bus.subscribe()
+        try:
+            incident_id = await asyncio.to_thread(_write_incident_flow)
+            events = [await asyncio.wait_for(queue.get(), timeout=2) for _ in range(3)]
+        finally:
+            admin_event_bus.unsubscribe(queue)
+        return incident_id, events
+
+    incident_id, events = asyncio.run(scenario())
+    assert [event["type"] for event in events] == ["incident_created", "attempt_logged", "incident_acknowledged"]
+    assert all(event["incident_id"] == incident_id for event in events)
+
+
+def test_rolled_back_writes_are_not_published():
+    async def scenario():
+        queue = admin_event_bus.subscribe()
+        try:
+            with get_session() as session:
+                create_incident(session, "롤백", "tts", commit=False)
+                session.rollback()
+            await asyncio.sleep(0.05)
+            return queue.qsize()
+        finally:
+            admin_event_bus.unsubscribe(queue)
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_slow_subscriber_gets_resync_instead_of_unbounded_backlog():
+    async def scenario():
+        bus = EventBus(max_queue=3)
+        queue = bus.subscribe()
+        bus.publish([{"type": "attempt_logged", "n": n} for n in range(10)])
+        await asyncio.sleep(0.01)
+        return [queue.get_nowait() for _ in range(queue.qsize())]
+
+    assert asyncio.run(scenario()) == [{"type": "resync"}]
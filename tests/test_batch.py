@@ -0,0 +1,89 @@
+import json
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.db import CallJob, Incident, get_session, get_incident
+from app.main import app
+from sqlmodel import select
+
+
+client = TestClient(app)
+
+
+def test_start_batch_array_groups_duplicates(monkeypatch, dummy_provider):
+    monkeypatch.setattr(settings, "dedup_window_seconds", 300)
+    monkeypatch.setattr(settings, "ingest_batch_size", 2)
+    monkeypatch.setattr(settings, "secondary_contact", "+821000000002")
+    tag = uuid.uuid4()
+    alerts = [
+        {"incident_summary": f"디스크 {tag}", "tts_text": "디스크 경고"},
+        {"incident_summary": f"CPU {tag}", "tts_text": "CPU 경고", "strategy": "parallel"},
+        {"incident_summary": f"디스크 {tag}", "tts_text": "디스크 경고"},
+    ]
+
+    resp = client.post("/webhook/start-batch", json=alerts)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["accepted"] == 3
+    disk, cpu, repeat = body["results"]
+    assert disk["status"] == "dialing" and cpu["status"] == "dialing"
+    assert len(cpu["job_ids"]) == 2
+    assert repeat == {"incident_id": disk["incident_id"], "status": "deduplicated", "duplicate_count": 1}
+
+    with get_session() as session:
+        assert get_incident(session, cpu["incident_id"]).attempts == 2
+        jobs = session.exec(select(CallJob).where(CallJob.incident_id == disk["incident_id"])).all()
+        assert len(jobs) == 1
+
+
+def test_start_batch_ndjson_and_validation(dummy_provider):
+    lines = "\n".join(
+        json.dumps({"incident_summary": f"서버 {i}", "tts_text": "경고"}, ensure_ascii=False) for i in range(3)
+    )
+    resp = client.post(
+        "/webhook/start-batch",
+        content=lines.encode("utf-8"),
+        headers={"content-type": "application/x-ndjson"},
+    )
+    assert resp.status_code == 200
+    assert [r["status"] for r in resp.json()["results"]] == ["dialing"] * 3
+
+    # 뒤쪽 알림이 잘못되면 앞쪽 알림도 기록하지 않음 (재시도 시 중복 발신 방지)
+    tag = uuid.uuid4().hex
+    lines = "\n".join(
+        [json.dumps({"incident_summary": f"먼저 {tag}", "tts_text": "x"}, ensure_ascii=False), "{not json"]
+    )
+    bad = client.post(
+        "/webhook/start-batch", content=lines.encode("utf-8"), headers={"content-type": "application/x-ndjson"}
+    )
+    assert bad.status_code == 422 and bad.json()["detail"]["index"] == 1
+    unknown_team = client.post(
+        "/webhook/start-batch",
+        json=[{"incident_summary": f"먼저 {tag}", "tts_text": "x"}, {"incident_summary": "x", "tts_text": "x", "team": "no-such-team"}],
+    )
+    assert unknown_team.status_code == 404
+    with get_session() as session:
+        assert not session.exec(select(Incident).where(Incident.summary == f"먼저 {tag}")).all()
+
+    bad = client.post("/webhook/start-batch", json=[{"incident_summary": "x", "tts_text": "x"}, {"tts_text": "x"}])
+    assert bad.status_code == 422
+    assert bad.json()["detail"]["index"] == 1
+
+
+def test_start_batch_reserves_first_step_in_the_insert(monkeypatch, dummy_provider):
+    from app.services import escalation
+
+    # 새 인시던트는 INSERT에서 attempts를 정하므로 행마다 advance_attempts(UPDATE+SELECT)를 하지 않음
+    def unexpected(*args, **kwargs):
+        raise AssertionError("advance_attempts called for a new incident")
+
+    monkeypatch.setattr(escalation, "advance_attempts", unexpected)
+    tag = uuid.uuid4()
+    alerts = [{"incident_summary": f"INSERT 예약 {tag} {i}", "tts_text": "경고"} for i in range(3)]
+
+    results = client.post("/webhook/start-batch", json=alerts).json()["results"]
+    assert [r["status"] for r in results] == ["dialing"] * 3
+    with get_session() as session:
+        assert [get_incident(session, r["incident_id"]).attempts for r in results] == [1, 1, 1]
@@ -0,0 +1,147 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from app.db import get_session, enqueue_call_job, claim_call_job, init_db, CallJob
+from app.services import escalation
+from app.services.call_queue import CallWorkerPool
+
+
+class FlakyProvider:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def place_call(self, *, to_number: str, tts_text: str, webhook_base: str, incident_id: int) -> str:
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("provider timeout")
+        return "flaky-call-id"
+
+    def webhook_path(self) -> str:
+        return "/flaky"
+
+
+def _enqueue() -> int:
+    init_db()
+    with get_session() as session:
+        return enqueue_call_job(session, incident_id=0, callee="+820000000000", tts_text="테스트").id
+
+
+def test_lease_is_exclusive_until_visibility_timeout():
+    job_id = _enqueue()
+    with get_session() as session:
+        job = claim_call_job(session, "worker-a", visibility_timeout=60, job_id=job_id)
+        assert job is not None and job.status == "leased" and job.tries == 1
+        assert claim_call_job(session, "worker-b", visibility_timeout=60, job_id=job_id) is None
+
+        # Worker A "crashes": once the lease expires another worker gets the job
+        job.leased_until = datetime.utcnow() - timedelta(seconds=1)
+        session.add(job)
+        session.commit()
+        again = claim_call_job(session, "worker-b", visibility_timeout=60, job_id=job_id)
+        assert again is not None and again.lease_owner == "worker-b" and again.tries == 2
+
+
+def test_stale_worker_cannot_overwrite_a_reclaimed_job():
+    from app.db import complete_call_job, extend_call_job_lease, fail_call_job
+
+    job_id = _enqueue()
+    with get_session() as session:
+        stale = claim_call_job(session, "worker-a", visibility_timeout=60, job_id=job_id)
+        stale.leased_until = datetime.utcnow() - timedelta(seconds=1)
+        session.add(stale)
+        session.commit()
+        stale_tries = stale.tries
+        fresh = claim_call_job(session, "worker-b", visibility_timeout=60, job_id=job_id)
+
+        # 임대를 잃은 워커는 발신하지도, 새 워커의 상태를 덮어쓰지도 못함
+        assert not extend_call_job_lease(session, job_id, "worker-a", stale_tries, visibility_timeout=60)
+        assert not fail_call_job(session, job_id, "worker-a", stale_tries, "late", max_tries=1, retry_delay=0)
+        assert not complete_call_job(session, job_id, "worker-a", stale_tries, "stale-call-id")
+        session.refresh(fresh)
+        assert fresh.status == "leased" and fresh.lease_owner == "worker-b" and fresh.call_id is None
+
+        assert extend_call_job_lease(session, job_id, "worker-b", fresh.tries, visibility_timeout=60)
+        assert complete_call_job(session, job_id, "worker-b", fresh.tries, "fresh-call-id")
+        session.refresh(fresh)
+        assert fresh.status == "done" and fresh.call_id == "fresh-call-id"
+
+
+def test_failed_dial_is_retried(monkeypatch):
+    provider = FlakyProvider()
+    monkeypatch.setattr(escalation, "_get_provider", lambda: provider)
+    monkeypatch.setattr(escalation.settings, "queue_retry_delay_seconds", 0)
+    pool = CallWorkerPool(workers=1, poll_interval=0, visibility_timeout=60)
+    job_id = _enqueue()
+
+    asyncio.run(pool.run_job(job_id))
+    with get_session() as session:
+        job = session.get(CallJob, job_id)
+        assert job.status == "pending" and job.last_error == "provider timeout"
+
+    asyncio.run(pool.run_job(job_id))
+    with get_session() as session:
+        job = session.get(CallJob, job_id)
+        assert job.status == "done" and job.call_id == "flaky-call-id"
+
+
+def test_incident_lease_and_attempts_compare_and_set():
+    from app.db import acquire_incident_lease, advance_attempts, create_incident, get_incident, release_incident_lease
+
+    init_db()
+    with get_session() as session:
+        incident_id = create_incident(session, summary="동시성", tts_text="동시성").id
+        assert acquire_incident_lease(session, incident_id, "node-a", lease_seconds=60)
+        assert not acquire_incident_lease(session, incident_id, "node-b", lease_seconds=60)
+        release_incident_lease(session, incident_id, "node-a")
+        assert acquire_incident_lease(session, incident_id, "node-b", lease_seconds=60)
+        release_incident_lease(session, incident_id, "node-b")
+
+        # 같은 attempts를 보고 계획한 두 워커 중 하나만 단계를 확정
+        assert advance_attempts(session, incident_id, expected=0, count=1)
+        assert not advance_attempts(session, incident_id, expected=0, count=1)
+        assert get_incident(session, incident_id).attempts == 1
+
+
+def test_repeated_completed_callbacks_escalate_once(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from uuid import uuid4
+
+    from app.db import complete_call_job, get_incident
+
+    init_db()
+    plan = escalation.start_escalation("중복 콜백", "중복 콜백")
+    call_id = f"CA-{uuid4().hex}"
+    with get_session() as session:
+        job = claim_call_job(session, "worker-a", visibility_timeout=60, job_id=plan["job_id"])
+        assert complete_call_job(session, job.id, "worker-a", job.tries, call_id)
+
+    # 여러 워커에 같은 "completed" 콜백이 동시에 도착 (Twilio 재전송)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: escalation.call_ended(plan["incident_id"], call_id), range(4)))
+
+    assert [r["status"] for r in results].count("dialing") == 1
+    assert [r["status"] for r in results].count("duplicate_callback") == 3
+    with get_session() as session:
+        incident = get_incident(session, plan["incident_id"])
+        assert incident.attempts == 2 and incident.lease_owner is None
+
+
+def test_busy_incident_lease_is_not_waited_on_forever(monkeypatch):
+    import pytest
+
+    from app.db import acquire_incident_lease, release_incident_lease
+
+    init_db()
+    monkeypatch.setattr(escalation.settings, "incident_lease_wait_seconds", 0)
+    plan = escalation.start_escalation("임대 대기", "임대 대기")
+    incident_id = plan["incident_id"]
+    with get_session() as session:
+        assert acquire_incident_lease(session, incident_id, "other-node", lease_seconds=60)
+
+    # 콜백 처리는 스레드 풀을 붙잡고 기다리지 않고 재시도 신호(IncidentBusy, 503)를 냄
+    with pytest.raises(escalation.IncidentBusy):
+        escalation.call_ended(incident_id, "busy-call-id")
+    assert escalation.retry_next(incident_id, "임대 대기")["status"] == "already_advanced"
+
+    with get_session() as session:
+        release_incident_lease(session, incident_id, "other-node")
@@ -0,0 +1,124 @@
+from itertools import count
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import select
+
+from app.db import CallJob, get_session
+from app.main import app
+from app.services import escalation
+
+
+client = TestClient(app)
+
+
+class RecordingProvider:
+    """Returns a distinct call id per dial and records hang-ups."""
+
+    def __init__(self) -> None:
+        self._ids = count(1)
+        self.canceled = []
+
+    def place_call(self, **kwargs) -> str:
+        return f"CA-status-{next(self._ids)}"
+
+    async def cancel_call_async(self, call_id: str) -> None:
+        self.canceled.append(call_id)
+
+    def webhook_path(self) -> str:
+        return "/twilio"
+
+
+@pytest.fixture
+def provider(monkeypatch) -> RecordingProvider:
+    provider = RecordingProvider()
+    monkeypatch.setattr(escalation, "_get_provider", lambda: provider)
+    return provider
+
+
+def _jobs(incident_id: int):
+    with get_session() as session:
+        return session.exec(select(CallJob).where(CallJob.incident_id == incident_id).order_by(CallJob.id)).all()
+
+
+def test_in_progress_acknowledges_and_hangs_up_the_round(monkeypatch, provider):
+    monkeypatch.setattr(escalation.settings, "secondary_contact", "+821000000002")
+    incident_id = client.post(
+        "/webhook/start",
+        json={"incident_summary": "동시 발신 응답", "tts_text": "동시 발신 응답", "strategy": "parallel"},
+    ).json()["incident_id"]
+    answered, other = [job.call_id for job in _jobs(incident_id)]
+
+    # Twilio는 받은 통화를 answered가 아니라 in-progress로 알림
+    client.post(f"/twilio/status?incident_id={incident_id}", data={"CallSid": answered, "CallStatus": "in-progress"})
+
+    assert client.get(f"/webhook/incident/{incident_id}").json()["status"] == "ack"
+    assert provider.canceled == [other]
+
+
+@pytest.mark.parametrize("status", ["no-answer", "busy"])
+def test_unanswered_call_advances_to_the_next_step(provider, status):
+    incident_id = client.post(
+        "/webhook/start", json={"incident_summary": f"미응답 {status}", "tts_text": f"미응답 {status}"}
+    ).json()["incident_id"]
+    [first] = _jobs(incident_id)
+
+    client.post(f"/twilio/status?incident_id={incident_id}", data={"CallSid": first.call_id, "CallStatus": "ringing"})
+    assert len(_jobs(incident_id)) == 1
+    client.post(f"/twilio/status?incident_id={incident_id}", data={"CallSid": first.call_id, "CallStatus": status})
+
+    jobs = _jobs(incident_id)
+    assert [job.status for job in jobs] == ["ended", "done"]
+    assert client.get(f"/webhook/incident/{incident_id}").json()["status"] != "ack"
+
+
+def test_vonage_unanswered_call_advances_and_answered_call_acknowledges(provider):
+    incident_id = client.post(
+        "/webhook/start", json={"incident_summary": "Vonage 상태", "tts_text": "Vonage 상태"}
+    ).json()["incident_id"]
+    [first] = _jobs(incident_id)
+
+    client.post(f"/vonage/status?incident_id={incident_id}", json={"uuid": first.call_id, "status": "unanswered"})
+    second = _jobs(incident_id)[1]
+    assert second.status == "done"
+
+    client.post(f"/vonage/status?incident_id={incident_id}", json={"uuid": second.call_id, "status": "answered"})
+    assert client.get(f"/webhook/incident/{incident_id}").json()["status"] == "ack"
+
+
+def test_solapi_callback_after_failover_enqueues_the_next_step(monkeypatch):
+    from app.providers.routing import ProviderRouter
+
+    class FakeProvider:
+        def __init__(self, name: str, fail: bool = False) -> None:
+            self.name, self.fail, self.placed = name, fail, 0
+
+        async def place_call_async(self, **kwargs) -> str:
+            self.placed += 1
+            if self.fail:
+                raise RuntimeError(f"{self.name} unavailable")
+            return f"{self.name}-failover-{self.placed}"
+
+    class FakeRegistry:
+        def __init__(self, **providers) -> None:
+            self.providers = providers
+
+        def get(self, name: str):
+            return self.providers[name]
+
+    router = ProviderRouter(
+        ["twilio", "solapi"], registry=FakeRegistry(twilio=FakeProvider("twilio", fail=True), solapi=FakeProvider("solapi"))
+    )
+    monkeypatch.setattr(escalation, "_get_provider", lambda: router)
+    incident_id = client.post(
+        "/webhook/start", json={"incident_summary": "페일오버 콜백", "tts_text": "페일오버 콜백"}
+    ).json()["incident_id"]
+    [first] = _jobs(incident_id)
+    assert first.provider == "solapi"
+
+    # SOLAPI 웹훅에는 incident_id가 없으므로 messageId로 인시던트를 찾아 진행
+    resp = client.post("/solapi/webhook", json={"messageId": first.call_id, "status": "COMPLETE", "to": first.callee}).json()
+    assert resp["incident_id"] == incident_id
+
+    jobs = _jobs(incident_id)
+    assert [job.status for job in jobs] == ["ended", "done"] and jobs[1].provider == "solapi"
@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import text
+
+from app.config import settings
+from app.db import engine
+
+
+def test_sqlite_connections_use_wal_and_busy_timeout():
+    if engine.dialect.name != "sqlite":
+        pytest.skip("SQLite pragmas only")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == settings.sqlite_busy_timeout_ms
+
+
+def test_in_memory_database_is_shared_across_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.db import create_db_engine
+
+    memory = create_db_engine("sqlite://")
+    with memory.begin() as conn:
+        conn.execute(text("CREATE TABLE probe (id INTEGER PRIMARY KEY)"))
+        conn.execute(text("INSERT INTO probe (id) VALUES (1)"))
+
+    def count() -> int:
+        with memory.connect() as conn:
+            return conn.execute(text("SELECT COUNT(*) FROM probe")).scalar()
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        assert pool.submit(count).result() == 1
+    with memory.connect() as conn:
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == settings.sqlite_busy_timeout_ms
+
+
+def test_init_db_upgrades_existing_database(tmp_path, monkeypatch):
+    from sqlalchemy import inspect
+
+    from app import db
+
+    old = db.create_db_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with old.begin() as conn:
+        conn.execute(text("CREATE TABLE incident (id INTEGER PRIMARY KEY, summary VARCHAR, tts_text VARCHAR, status VARCHAR, attempts INTEGER, created_at DATETIME, acknowledged_at DATETIME)"))
+        conn.execute(text("CREATE TABLE callattempt (id INTEGER PRIMARY KEY, incident_id INTEGER, callee VARCHAR, provider VARCHAR, result VARCHAR, dtmf VARCHAR, duration_sec INTEGER, created_at DATETIME)"))
+    monkeypatch.setattr(db, "engine", old)
+
+    db.init_db()
+    db.init_db()  # 이미 적용된 마이그레이션은 건너뜀
+
+    inspector = inspect(old)
+    assert "strategy" in {column["name"] for column in inspector.get_columns("incident")}
+    assert "ix_incident_status" in {index["name"] for index in inspector.get_indexes("incident")}
+    assert "ix_callattempt_incident_id_created_at" in {index["name"] for index in inspector.get_indexes("callattempt")}
+    with old.connect() as conn:
+        versions = conn.execute(text("SELECT version FROM schemamigration ORDER BY version")).scalars().all()
+    assert versions == [version for version, _, _ in db.MIGRATIONS]
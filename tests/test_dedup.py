@@ -0,0 +1,71 @@
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.db import get_session, get_alert_group
+from app.main import app
+from app.services.dedup import alert_fingerprint, dedup_index
+
+
+client = TestClient(app)
+
+
+def test_fingerprint_prefers_dedup_key():
+    assert alert_fingerprint("CPU 95%", None) == alert_fingerprint("  cpu   95% ", None)
+    assert alert_fingerprint("CPU 95%", "host-a") == alert_fingerprint("CPU 97%", "host-a")
+    assert alert_fingerprint("CPU 95%", None, team="dba") != alert_fingerprint("CPU 95%", None)
+
+
+def test_duplicate_alerts_attach_to_open_incident(monkeypatch, dummy_provider):
+    monkeypatch.setattr(settings, "dedup_window_seconds", 300)
+    body = {"incident_summary": f"서버 E 디스크 {uuid.uuid4()}", "tts_text": "디스크 경고"}
+
+    first = client.post("/webhook/start", json=body).json()
+    assert first["status"] == "dialing"
+    incident_id = first["incident_id"]
+
+    second = client.post("/webhook/start", json=body).json()
+    assert second == {"incident_id": incident_id, "status": "deduplicated", "duplicate_count": 1}
+
+    # 메모리 인덱스가 비어도 DB 그룹으로 판단
+    dedup_index.clear()
+    third = client.post("/webhook/start", json=body).json()
+    assert third["incident_id"] == incident_id
+    assert third["duplicate_count"] == 2
+    with get_session() as session:
+        group = get_alert_group(session, alert_fingerprint(body["incident_summary"]))
+        assert group.incident_id == incident_id
+        assert group.duplicate_count == 2
+
+    # ack 이후 같은 알림은 새 인시던트로 에스컬레이션
+    client.post(f"/webhook/ack/{incident_id}")
+    fresh = client.post("/webhook/start", json=body).json()
+    assert fresh["status"] == "dialing"
+    assert fresh["incident_id"] != incident_id
+
+
+def test_repeating_alert_reopens_after_exhausted_escalation(monkeypatch, dummy_provider):
+    from datetime import datetime, timedelta
+
+    from app.db import Incident
+
+    monkeypatch.setattr(settings, "dedup_window_seconds", 300)
+    body = {"incident_summary": f"서버 F 반복 경고 {uuid.uuid4()}", "tts_text": "반복 경고"}
+    incident_id = client.post("/webhook/start", json=body).json()["incident_id"]
+
+    # 에스컬레이션을 모두 소진했지만 알림은 창보다 짧은 간격으로 계속 들어오는 상황
+    with get_session() as session:
+        incident = session.get(Incident, incident_id)
+        incident.attempts = settings.max_attempts
+        group = get_alert_group(session, alert_fingerprint(body["incident_summary"]))
+        group.first_seen_at = datetime.utcnow() - timedelta(seconds=301)
+        group.last_seen_at = datetime.utcnow() - timedelta(seconds=10)
+        session.add_all([incident, group])
+        session.commit()
+    dedup_index.clear()
+
+    # 첫 알림 기준 창이 지났으므로 승인되지 않았어도 새 인시던트로 다시 발신
+    fresh = client.post("/webhook/start", json=body).json()
+    assert fresh["status"] == "dialing"
+    assert fresh["incident_id"] != incident_id
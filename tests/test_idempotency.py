@@ -0,0 +1,76 @@
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+from sqlmodel import select
+
+from app.db import CallAttempt, get_session
+from app.main import app
+from app.services.idempotency import idempotency_store
+
+
+client = TestClient(app)
+
+
+def _attempt_count(incident_id: int) -> int:
+    with get_session() as session:
+        return len(session.exec(select(CallAttempt).where(CallAttempt.incident_id == incident_id)).all())
+
+
+def test_start_with_idempotency_key_pages_once(dummy_provider):
+    headers = {"Idempotency-Key": uuid4().hex}
+    body = {"incident_summary": "멱등 시작", "tts_text": "멱등 시작"}
+
+    first = client.post("/webhook/start", json=body, headers=headers).json()
+    retried = client.post("/webhook/start", json=body, headers=headers).json()
+    assert retried == first
+    # 키 없이 보낸 요청은 재생되지 않고 새로 처리됨 (중복 제거에 묶이지 않도록 다른 dedup_key)
+    fresh = client.post("/webhook/start", json={**body, "dedup_key": uuid4().hex}).json()
+    assert fresh["incident_id"] != first["incident_id"]
+
+
+def test_retried_status_callback_is_processed_once(dummy_provider):
+    incident_id = client.post(
+        "/webhook/start", json={"incident_summary": "콜백 재전송", "tts_text": "콜백 재전송"}
+    ).json()["incident_id"]
+    form = {"CallSid": f"CA-{uuid4().hex}", "CallStatus": "ringing"}
+
+    first = client.post(f"/twilio/status?incident_id={incident_id}", data=form).json()
+    before = _attempt_count(incident_id)
+    # 메모리 캐시가 비어도(다른 워커/재시작) DB 고유 키로 중복 판단
+    idempotency_store.clear()
+    retried = client.post(f"/twilio/status?incident_id={incident_id}", data=form).json()
+
+    assert "duplicate" not in first and retried["duplicate"] is True
+    assert _attempt_count(incident_id) == before
+
+
+def test_abandoned_claim_is_taken_over_after_its_lease():
+    from datetime import datetime, timedelta
+
+    from app.db import IdempotencyKey
+
+    key = f"start:{uuid4().hex}"
+    assert idempotency_store.claim(key)
+    # 처리 중(응답 없음)인 동안의 재시도는 중복
+    assert not idempotency_store.claim(key)
+
+    # 처리하던 프로세스가 죽어 finish/save_response 없이 리스가 지난 상황
+    with get_session() as session:
+        entry = session.get(IdempotencyKey, key)
+        entry.leased_until = datetime.utcnow() - timedelta(seconds=1)
+        session.add(entry)
+        session.commit()
+    assert idempotency_store.claim(key)
+
+    idempotency_store.finish(key)
+    idempotency_store.clear()
+    assert not idempotency_store.claim(key)
+
+
+def test_malformed_call_duration_does_not_break_the_callback(dummy_provider):
+    incident_id = client.post(
+        "/webhook/start", json={"incident_summary": "통화 시간 오류", "tts_text": "통화 시간 오류"}
+    ).json()["incident_id"]
+    form = {"CallSid": f"CA-{uuid4().hex}", "CallStatus": "ringing", "CallDuration": "12s"}
+    resp = client.post(f"/twilio/status?incident_id={incident_id}", data=form)
+    assert resp.status_code == 200 and resp.json()["ok"] is True
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import logging
+import queue
+
+from app.log import ContextFilter, DebugSampler, DroppingQueueHandler, JsonFormatter, log_context
+
+
+def _capture(*filters: logging.Filter):
+    records: "queue.Queue[logging.LogRecord]" = queue.Queue()
+    handler = DroppingQueueHandler(records)
+    for item in filters:
+        handler.addFilter(item)
+    logger = logging.getLogger("tests.logging")
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    return logger, records
+
+
+def _drain(records) -> list:
+    formatter = JsonFormatter()
+    lines = []
+    while not records.empty():
+        lines.append(json.loads(formatter.format(records.get_nowait())))
+    return lines
+
+
+def test_records_carry_correlation_fields_into_threads():
+    logger, records = _capture(ContextFilter())
+
+    async def scenario():
+        with log_context(incident_id=7, call_sid="CA1"):
+            await asyncio.to_thread(logger.info, "dialed %s", "+8210")
+        logger.info("outside")
+        logger.warning("explicit", extra={"incident_id": 9})
+
+    asyncio.run(scenario())
+    lines = _drain(records)
+    assert lines[0]["msg"] == "dialed +8210"
+    assert (lines[0]["incident_id"], lines[0]["call_sid"]) == (7, "CA1")
+    assert "incident_id" not in lines[1]
+    assert lines[2]["incident_id"] == 9 and lines[2]["level"] == "WARNING"
+
+
+def test_debug_lines_are_sampled_and_full_queue_drops():
+    logger, records = _capture(DebugSampler(every=5))
+    for index in range(20):
+        logger.debug("poll %s", index)
+    logger.info("kept")
+    lines = _drain(records)
+    assert [line["msg"] for line in lines] == ["poll 0", "poll 5", "poll 10", "poll 15", "kept"]
+
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    logger.handlers = [handler]
+    dropped = DroppingQueueHandler.dropped
+    logger.info("first")
+    logger.info("second")
+    assert DroppingQueueHandler.dropped == dropped + 1
+
+
+def test_exception_text_survives_the_queue():
+    logger, records = _capture()
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("failed")
+    (line,) = _drain(records)
+    assert line["msg"] == "failed"
+    assert "ValueError: boom" in line["exc"]
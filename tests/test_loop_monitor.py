@@ -0,0 +1,31 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.loop_monitor import LoopLagMonitor
+
+
+def test_monitor_detects_blocking_call():
+    async def scenario():
+        monitor = LoopLagMonitor(interval=0.01, warn_threshold=0.05)
+        await monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.1)  # 루프를 막는 동기 호출
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["running"] is False
+    assert stats["max_ms"] >= 80
+    assert stats["warnings"] >= 1
+
+
+def test_healthz_loop_reports_lag_stats():
+    with TestClient(app) as client:
+        data = client.get("/healthz/loop").json()
+    assert data["ok"] is True
+    assert data["running"] is True
+    assert data["blocking_workers"] > 0
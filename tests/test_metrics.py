@@ -0,0 +1,42 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.metrics import observe_provider
+
+
+client = TestClient(app)
+
+
+def _sample(text: str, prefix: str) -> float:
+    return sum(float(line.rsplit(" ", 1)[1]) for line in text.splitlines() if line.startswith(prefix))
+
+
+def test_metrics_cover_escalation_and_ack(dummy_provider):
+    before = client.get("/metrics").text
+
+    incident_id = client.post(
+        "/webhook/start", json={"incident_summary": "메트릭", "tts_text": "메트릭"}
+    ).json()["incident_id"]
+    client.get(f"/twilio/voice?incident_id={incident_id}")
+    client.post(f"/webhook/ack/{incident_id}")
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200 and resp.headers["content-type"].startswith("text/plain")
+    after = resp.text
+    for prefix in (
+        "db_commit_seconds_count",
+        'escalation_step_seconds_count{stage="enqueue"}',
+        "time_to_acknowledge_seconds_count",
+        'call_attempts_total{provider="mock",result="ack"}',
+    ):
+        assert _sample(after, prefix) > _sample(before, prefix), prefix
+    assert 'twiml_render_seconds_count{kind="voice"}' in after
+
+
+def test_provider_errors_are_labelled():
+    with pytest.raises(RuntimeError):
+        with observe_provider("twilio", "place_call"):
+            raise RuntimeError("boom")
+    text = client.get("/metrics").text
+    assert _sample(text, 'provider_api_seconds_count{operation="place_call",outcome="error",provider="twilio"}') >= 1
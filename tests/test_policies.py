@@ -0,0 +1,98 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import EscalationPolicyIn
+from app.services.policies import compile_policy
+
+
+client = TestClient(app)
+
+POLICY = {
+    "name": "dba-team",
+    "repeat": 2,
+    "tiers": [
+        {
+            "contacts": [
+                {"name": "김DBA", "phone": "+821011110001"},
+                {"name": "이DBA", "phone": "+821011110002"},
+            ],
+            "timeout_seconds": 20,
+        },
+        {
+            "contacts": [{"name": "팀장", "phone": "+821011110003", "role": "manager"}],
+            "repeat": 2,
+            "delay_seconds": 30,
+        },
+    ],
+}
+
+
+def test_compiled_policy_steps_and_rounds():
+    payload = EscalationPolicyIn(**POLICY)
+    policy = compile_policy(1, payload.name, payload.repeat, [tier.model_dump() for tier in payload.tiers])
+    assert policy.total_steps == 8
+    assert [s.phone[-1] for s in policy.steps] == ["1", "2", "3", "3"]
+    assert policy.step(5).name == "이DBA"  # second pass over the policy
+    assert [s.name for s in policy.round_steps(4)] == ["김DBA", "이DBA"]
+    assert policy.step(2).delay_seconds == 30 and policy.step(2).role == "manager"
+    assert policy.step(8) is None
+
+
+def test_start_escalation_with_team_policy(dummy_provider):
+    assert client.put("/policies/dba-team", json=POLICY).status_code == 200
+
+    start = client.post(
+        "/webhook/start",
+        json={"incident_summary": "DB 복제 지연", "tts_text": "복제 지연입니다.", "team": "dba-team", "strategy": "parallel"},
+    )
+    data = start.json()
+    assert data["to"] == "+821011110001" and data["tier"] == 0
+    assert len(data["job_ids"]) == 2
+
+    # 티어의 timeout_seconds가 프로바이더까지 전달되어 실제로 발신됨
+    from app.db import CallJob, get_session
+
+    with get_session() as session:
+        jobs = [session.get(CallJob, job_id) for job_id in data["job_ids"]]
+    assert [(job.status, job.ring_timeout_seconds) for job in jobs] == [("done", 20), ("done", 20)]
+
+    missing = client.post(
+        "/webhook/start",
+        json={"incident_summary": "x", "tts_text": "x", "team": "no-such-team"},
+    )
+    assert missing.status_code == 404
+
+
+def test_recreated_policy_is_resolved_again_by_name():
+    from app.db import delete_policy, get_session, save_policy
+    from app.services.policies import policy_cache
+
+    tiers = [{"contacts": [{"name": "A", "phone": "+821022220001"}], "timeout_seconds": None, "repeat": 1, "delay_seconds": 0}]
+    with get_session() as session:
+        old_id = save_policy(session, name="recreated-team", repeat=1, tiers=tiers).id
+    assert policy_cache.get_by_name("recreated-team").id == old_id
+
+    # 다른 워커가 정책을 지우고 같은 이름으로 다시 만든 상황 (이 워커의 캐시는 무효화되지 않음)
+    with get_session() as session:
+        delete_policy(session, old_id)
+        new_id = save_policy(session, name="recreated-team", repeat=1, tiers=tiers).id
+    policy_cache._by_id.pop(old_id)  # 캐시 TTL 만료
+    assert policy_cache.get_by_name("recreated-team").id == new_id
+
+
+def test_open_incident_falls_back_to_default_policy_after_delete(monkeypatch, dummy_provider):
+    from app.db import CallJob, get_session
+    from app.services import escalation
+
+    monkeypatch.setattr(escalation.settings, "secondary_contact", "+821000000002")
+    client.put("/policies/deleted-team", json={**POLICY, "name": "deleted-team"})
+    start = client.post(
+        "/webhook/start", json={"incident_summary": "정책 삭제", "tts_text": "정책 삭제", "team": "deleted-team"}
+    ).json()
+    assert client.delete("/policies/deleted-team").status_code == 200
+
+    # 다음 단계(2번째 발신)는 멈추지 않고 기본 정책(정/부 교대)의 부담당자로 발신
+    plan = escalation.retry_next(start["incident_id"], "정책 삭제")
+    assert plan["status"] == "dialing" and plan["to"] == "+821000000002"
+    with get_session() as session:
+        assert session.get(CallJob, plan["job_id"]).callee == "+821000000002"
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.providers.routing import NoProviderAvailable, ProviderRouter
+
+
+class FakeProvider:
+    def __init__(self, name: str, fail: bool = False) -> None:
+        self.name = name
+        self.fail = fail
+        self.placed = 0
+        self.canceled = []
+
+    async def place_call_async(self, **kwargs) -> str:
+        self.placed += 1
+        if self.fail:
+            raise RuntimeError(f"{self.name} unavailable")
+        return f"{self.name}-{self.placed}"
+
+    async def cancel_call_async(self, call_id: str) -> None:
+        self.canceled.append(call_id)
+
+
+class FakeRegistry:
+    def __init__(self, **providers) -> None:
+        self.providers = providers
+
+    def get(self, name: str):
+        provider = self.providers[name]
+        if provider is None:
+            raise RuntimeError(f"{name} credentials missing")
+        return provider
+
+
+CALL = dict(to_number="+821000000000", tts_text="장애", webhook_base="http://test", incident_id=1)
+
+
+def test_fails_over_and_demotes_the_failing_provider():
+    twilio, solapi = FakeProvider("twilio", fail=True), FakeProvider("solapi")
+    router = ProviderRouter(["twilio", "solapi", "vonage"], registry=FakeRegistry(twilio=twilio, solapi=solapi, vonage=None))
+
+    async def scenario(count: int):
+        return [await router.place_call_routed(**CALL) for _ in range(count)]
+
+    placed = asyncio.run(scenario(1))
+    assert placed[0][0] == "solapi"
+    # 일시적 오류 한 번(min_calls 미만)으로는 밀려나지 않음
+    twilio.fail = False
+    assert [name for name, _ in asyncio.run(scenario(2))] == ["twilio", "twilio"]
+    # min_calls 이상에서 나쁜 비율이 임계치 절반을 넘으면 정상 프로바이더 뒤로 밀림
+    assert router.stats()["twilio"]["calls"] == settings.provider_breaker_min_calls
+    assert asyncio.run(scenario(1))[0][0] == "solapi"
+
+    # 취소는 실제로 발신한 프로바이더로
+    asyncio.run(router.cancel_call_async(placed[0][1]))
+    assert solapi.canceled == [placed[0][1]]
+
+
+def test_cancelled_trial_call_is_released():
+    class HangingProvider(FakeProvider):
+        async def place_call_async(self, **kwargs) -> str:
+            self.placed += 1
+            await asyncio.sleep(60)
+
+    twilio = HangingProvider("twilio")
+    router = ProviderRouter(["twilio"], registry=FakeRegistry(twilio=twilio))
+    health = router.health("twilio")
+    health.cooldown_seconds = 0
+    health._open()
+
+    async def scenario():
+        task = asyncio.create_task(router.place_call_routed(**CALL))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    # 취소된 시험 발신이 권한을 반납하므로 다음 발신이 다시 시험 호출이 됨
+    assert health.allow()
+
+
+def test_breaker_opens_and_half_open_trial_closes_it(monkeypatch):
+    monkeypatch.setattr(settings, "provider_breaker_min_calls", 2)
+    twilio = FakeProvider("twilio", fail=True)
+    router = ProviderRouter(["twilio"], registry=FakeRegistry(twilio=twilio))
+    health = router.health("twilio")
+    health.cooldown_seconds = 60
+
+    for _ in range(2):
+        with pytest.raises(NoProviderAvailable):
+            asyncio.run(router.place_call_routed(**CALL))
+    assert router.stats()["twilio"]["state"] == "open"
+    # 회로가 열린 동안은 호출하지 않음
+    with pytest.raises(NoProviderAvailable, match="circuits are open"):
+        asyncio.run(router.place_call_routed(**CALL))
+    assert twilio.placed == 2
+
+    # 쿨다운이 지나면 시험 발신 1건이 가고, 성공하면 다시 닫힘
+    health.cooldown_seconds = 0
+    twilio.fail = False
+    assert asyncio.run(router.place_call_routed(**CALL))[0] == "twilio"
+    assert router.stats()["twilio"]["state"] == "closed"
+
+
+def test_no_silent_mock_fallback_when_every_provider_fails():
+    router = ProviderRouter(["twilio", "vonage"], registry=FakeRegistry(twilio=FakeProvider("twilio", fail=True), vonage=None))
+    with pytest.raises(NoProviderAvailable) as raised:
+        asyncio.run(router.place_call_routed(**CALL))
+    assert "twilio unavailable" in str(raised.value)
+    assert "vonage credentials missing" in str(raised.value)
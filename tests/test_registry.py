@@ -0,0 +1,35 @@
+import asyncio
+
+from app.providers.registry import ProviderRegistry
+
+
+def test_providers_share_the_pooled_client_until_aclose():
+    registry = ProviderRegistry()
+
+    async def scenario():
+        await registry.start()
+        pooled = registry.http
+        twilio, solapi = registry.get("twilio"), registry.get("solapi")
+        assert twilio.registry.http is pooled and solapi.registry.http is pooled
+        assert registry.get("twilio") is twilio
+
+        await registry.aclose()
+        assert pooled.is_closed
+        # 닫은 뒤에는 프로바이더와 클라이언트를 새로 만듦
+        assert registry.get("twilio") is not twilio
+        assert registry.http is not pooled
+        await registry.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_start_replaces_a_client_created_lazily_elsewhere():
+    registry = ProviderRegistry()
+    lazy = registry.http
+
+    async def scenario():
+        await registry.start()
+        assert registry.http is not lazy and lazy.is_closed
+        await registry.aclose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,130 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import simulator
+from app.services.call_events import call_status_hub
+
+
+client = TestClient(app)
+
+
+class NoPollClient:
+    """Twilio client stand-in that fails if the simulator falls back to polling."""
+
+    def calls(self, call_sid):
+        raise AssertionError("status should come from callbacks")
+
+
+def _post_status(call_sid: str, **fields) -> None:
+    client.post(
+        "/twilio/status?incident_id=0&source=simulator",
+        data={"CallSid": call_sid, **fields},
+    )
+
+
+def test_check_call_status_uses_status_callbacks():
+    async def scenario():
+        # A callback that lands before the simulator subscribes is not lost
+        call_status_hub.publish("CA-sim-1", {"status": "ringing", "source": "callback"})
+        waiter = asyncio.create_task(simulator.check_call_status(NoPollClient(), "CA-sim-1", max_wait=5))
+        await asyncio.sleep(0.05)
+        await asyncio.to_thread(_post_status, "CA-sim-1", CallStatus="in-progress")
+        await asyncio.to_thread(_post_status, "CA-sim-1", CallStatus="completed", CallDuration="12")
+        return await waiter
+
+    assert asyncio.run(scenario()) == {"status": "answered", "duration": 12}
+
+
+def test_check_call_status_busy_is_immediate():
+    async def scenario():
+        waiter = asyncio.create_task(simulator.check_call_status(NoPollClient(), "CA-sim-2", max_wait=5))
+        await asyncio.sleep(0.05)
+        await asyncio.to_thread(_post_status, "CA-sim-2", CallStatus="busy")
+        return await waiter
+
+    assert asyncio.run(scenario()) == {"status": "busy", "duration": 0}
+
+
+class FakeCalls:
+    def __init__(self) -> None:
+        self.created = []
+
+    def create(self, **kwargs):
+        self.created.append(kwargs["to"])
+        return type("Call", (), {"sid": f"CA-ring-{kwargs['to']}"})()
+
+
+class FakeTwilio:
+    def __init__(self) -> None:
+        self.calls = FakeCalls()
+
+
+def test_ring_all_cancels_other_calls(monkeypatch):
+    canceled = []
+
+    async def fake_cancel(call_sid):
+        canceled.append(call_sid)
+
+    monkeypatch.setattr(simulator, "_cancel_simulator_call", fake_cancel)
+    request = simulator.SimulatorCallRequest(
+        primary_name="정",
+        primary_phone="+8201011111111",
+        secondary_name="부",
+        secondary_phone="+8201022222222",
+        incident_summary="DB 장애",
+        tts_text="DB 장애가 발생했습니다.",
+        strategy="parallel",
+    )
+    contacts = [
+        {"name": "정", "phone": "+8201011111111", "role": "정담당자"},
+        {"name": "부", "phone": "+8201022222222", "role": "부담당자"},
+    ]
+    twilio = FakeTwilio()
+
+    async def scenario():
+        events = []
+
+        async def answer_secondary():
+            await asyncio.sleep(0.1)
+            call_status_hub.publish("CA-ring-+8201022222222", {"status": "completed", "duration": 9})
+
+        answerer = asyncio.create_task(answer_secondary())
+        async for event in simulator.escalate_concurrently(request, twilio, contacts, None):
+            events.append(event)
+        await answerer
+        return events
+
+    events = asyncio.run(scenario())
+    assert twilio.calls.created == ["+8201011111111", "+8201022222222"]
+    assert canceled == ["CA-ring-+8201011111111"]
+    assert '"escalation_complete"' in events[-1] and '"부"' in events[-1]
+
+
+def test_transfer_log_persists_beyond_cache(dummy_provider):
+    from uuid import uuid4
+
+    from app.services.transfer_log import TransferLogStore, transfer_log_store
+
+    incident_id = client.post(
+        "/webhook/start", json={"incident_summary": "호전환 테스트", "tts_text": "호전환 테스트"}
+    ).json()["incident_id"]
+
+    call_sid = f"CA-transfer-{uuid4().hex}"
+    resp = client.post(f"/twilio/transfer?incident_id={incident_id}", data={"Digits": "1", "CallSid": call_sid})
+    assert resp.status_code == 200
+
+    # 다른 워커/재시작 후와 같은 상황: 캐시가 비어 있어도 DB에서 조회
+    transfer_log_store.clear()
+    log = client.get(f"/simulator/transfer-log/{call_sid}").json()
+    assert log["found"] is True and log["transferred"] is True and log["sms_sent"] is False
+    assert client.get("/simulator/transfer-log/CA-unknown").json()["found"] is False
+
+    incidents = client.get("/admin/recent-incidents").json()
+    assert next(i for i in incidents if i["id"] == incident_id)["status"] == "ack"
+
+    store = TransferLogStore(max_entries=2)
+    for sid in ("a", "b", "c"):
+        store.remember({"call_sid": sid})
+    assert list(store._entries) == ["b", "c"]
@@ -4,14 +4,6 @@ from app.main import app
 from app.services import escalation
 
 
-class DummyProvider:
-    def place_call(self, *, to_number: str, tts_text: str, webhook_base: str, incident_id: int) -> str:
-        return "dummy-call-id"
-
-    def webhook_path(self) -> str:
-        return "/dummy"
-
-
 client = TestClient(app)
 
 
@@ -21,9 +13,7 @@ def test_healthz():
     assert resp.json().get("ok") is True
 
 
-def test_start_and_ack_flow(monkeypatch):
-    monkeypatch.setattr(escalation, "_get_provider", lambda: DummyProvider())
-
+def test_start_and_ack_flow(dummy_provider):
     # Start escalation -> creates incident and logs attempt
     start = client.post(
         "/webhook/start",
@@ -48,9 +38,7 @@ def test_start_and_ack_flow(monkeypatch):
     assert status.json().get("status") == "ack"
 
 
-def test_twilio_voice_returns_twiml(monkeypatch):
-    monkeypatch.setattr(escalation, "_get_provider", lambda: DummyProvider())
-
+def test_twilio_voice_returns_twiml(dummy_provider):
     # Create an incident to reference
     start = client.post(
         "/webhook/start",
@@ -66,3 +54,50 @@ def test_twilio_voice_returns_twiml(monkeypatch):
     assert twiml.status_code == 200
     assert "application/xml" in twiml.headers.get("content-type", "")
 
+
+def test_start_dials_in_background(dummy_provider):
+    start = client.post(
+        "/webhook/start",
+        json={
+            "incident_summary": "서버 C 디스크 경고",
+            "tts_text": "디스크 사용량 경고입니다.",
+        },
+    )
+    assert start.status_code == 200
+    data = start.json()
+    assert data["status"] == "dialing"
+
+    # The dial runs as a background task after the response; it logs the attempt
+    from sqlmodel import select
+    from app.db import get_session, CallAttempt
+
+    with get_session() as session:
+        attempts = session.exec(
+            select(CallAttempt).where(CallAttempt.incident_id == data["incident_id"])
+        ).all()
+    assert [a.result for a in attempts] == ["initiated"]
+
+
+def test_parallel_start_enqueues_round_and_ack_cancels(monkeypatch, dummy_provider):
+    monkeypatch.setattr(escalation.settings, "secondary_contact", "+821000000002")
+
+    start = client.post(
+        "/webhook/start",
+        json={
+            "incident_summary": "서버 D 응답 없음",
+            "tts_text": "서버 응답이 없습니다.",
+            "strategy": "staggered",
+            "stagger_seconds": 600,
+        },
+    )
+    data = start.json()
+    assert data["strategy"] == "staggered"
+    assert len(data["job_ids"]) == 2
+
+    from app.db import get_session, CallJob
+
+    # Secondary is still waiting for its stagger offset; acknowledging drops it
+    client.post(f"/webhook/ack/{data['incident_id']}")
+    with get_session() as session:
+        statuses = [session.get(CallJob, job_id).status for job_id in data["job_ids"]]
+    assert statuses == ["done", "canceled"]
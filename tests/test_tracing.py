@@ -0,0 +1,58 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from app.main import app
+from app.services import tracing
+
+
+client = TestClient(app)
+exporter = InMemorySpanExporter()
+
+
+@pytest.fixture(autouse=True, scope="module")
+def recorded_spans():
+    # 이 모듈 동안만 span을 기록 (다른 테스트에는 SQL/커밋 span이 남지 않음)
+    with tracing.recording(exporter):
+        yield
+
+
+def test_callback_spans_join_the_incident_trace(dummy_provider):
+    exporter.clear()
+
+    incident_id = client.post(
+        "/webhook/start", json={"incident_summary": "트레이스", "tts_text": "트레이스"}
+    ).json()["incident_id"]
+    call_sid = f"CA{uuid.uuid4().hex}"
+    client.post(
+        f"/twilio/status?incident_id={incident_id}", data={"CallSid": call_sid, "CallStatus": "completed"}
+    )
+    tracing.force_flush()
+
+    trace_id, root_span_id = tracing.incident_trace_ids(incident_id)
+    spans = {}
+    for span in exporter.get_finished_spans():
+        if span.context.trace_id == trace_id or span.name == "escalation.start":
+            spans.setdefault(span.name, span)
+
+    root = spans["incident"]
+    assert (root.context.trace_id, root.context.span_id) == (trace_id, root_span_id)
+    assert root.parent is None
+    assert root.links[0].context.span_id == spans["escalation.start"].context.span_id
+
+    # 다른 요청(콜백)에서 생긴 span도 incident_id만으로 같은 trace의 루트 아래에 붙음
+    status = spans["twilio.status"]
+    assert status.context.trace_id == trace_id
+    assert status.parent.span_id == root_span_id
+    assert spans["escalation.call_ended"].parent.span_id == status.context.span_id
+    assert spans["escalation.dial"].context.trace_id == trace_id
+    assert spans["escalation.dial"].attributes["call.sid"] == "dummy-call-id"
+
+    # DB 작업과 프로바이더 호출이 하위 span으로 기록됨
+    assert any(
+        span.name.startswith("db.") and span.context.trace_id == trace_id for span in exporter.get_finished_spans()
+    )
+    place_call = [span for span in exporter.get_finished_spans() if span.name.endswith(".place_call")]
+    assert place_call and place_call[0].parent.span_id == spans["escalation.dial"].context.span_id
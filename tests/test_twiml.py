@@ -0,0 +1,45 @@
+from fastapi.testclient import TestClient
+
+from app.db import get_session, create_incident
+from app.main import app
+from app.services import twiml
+from app.services.twiml import TwimlRenderer
+
+
+client = TestClient(app)
+
+
+def test_twiml_is_served_from_cache_without_db(monkeypatch):
+    with get_session() as session:
+        incident = create_incident(session, "TwiML", "CPU <95%> & 메모리 경고")
+
+    def no_db():
+        raise AssertionError("TwiML should not hit the DB")
+
+    monkeypatch.setattr(twiml, "get_session", no_db)
+    voice = client.get(f"/twilio/voice?incident_id={incident.id}")
+    assert voice.status_code == 200
+    assert "CPU &lt;95%&gt; &amp; 메모리 경고" in voice.text
+
+    gather = client.get(f"/simulator/twiml/{incident.id}?contact_name=홍길동")
+    assert "홍길동 담당자님, CPU &lt;95%&gt;" in gather.text
+    assert f"incident_id={incident.id}&amp;contact_name=" in gather.text
+    assert client.get(f"/simulator/twiml/{incident.id}?contact_name=홍길동").text == gather.text
+
+
+def test_text_change_invalidates_rendered_twiml():
+    renderer = TwimlRenderer(max_entries=10)
+    renderer.remember_text(1, "첫 번째 문구")
+    assert "첫 번째 문구" in renderer.voice(1)
+    renderer.remember_text(1, "바뀐 문구")
+    assert "바뀐 문구" in renderer.voice(1)
+    assert "임의 문구" in renderer.voice(1, text="임의 문구")
+
+
+def test_renderer_is_bounded():
+    renderer = TwimlRenderer(max_entries=2)
+    for incident_id in range(5):
+        renderer.remember_text(incident_id, f"문구 {incident_id}")
+        renderer.gather(incident_id, "담당자")
+    assert len(renderer._documents) <= 2
+    assert len(renderer._texts) <= 2